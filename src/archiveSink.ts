@@ -0,0 +1,305 @@
+/************************************************************************************
+ *
+ * archiveSink.ts
+ *
+ * OutputSinks that write generated files straight into a zip or tar archive
+ * rather than into a folder tree.
+ *
+ * Each file is streamed into the archive as it is produced. The entry's header
+ * is written first with placeholder values (size, CRC) and patched in place once
+ * the content has been written, so no file ever needs to be held in memory.
+ * Every entry gets the same timestamp so that regenerating an unchanged quiz
+ * produces an identical archive. (Callers are responsible for writing entries
+ * in a deterministic order.)
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+import * as zlib from "zlib";
+
+import { OutputSink } from "./outputSink";
+
+// The earliest time a zip file can represent. Used for every entry.
+const archiveTime = Date.UTC(1980, 0, 1) / 1000;
+const dosTime = 0;
+const dosDate = (0 << 9) | (1 << 5) | 1; // 1980-01-01
+
+function chunksOf(content: string | Iterable<string>): Iterable<string> {
+  return typeof content === "string" ? [content] : content;
+}
+
+/////////////////////////////////////////////////////////////
+//
+// CRC-32 (as used by zip)
+//
+/////////////////////////////////////////////////////////////
+
+const crcTable = Array.from({ length: 256 }, (_, n) => {
+  let c = n;
+  for (let k = 0; k < 8; k++) {
+    c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+  }
+  return c >>> 0;
+});
+
+export function crc32(data: Buffer, previous = 0) {
+  let crc = previous ^ 0xffffffff;
+  for (const byte of data) {
+    crc = crcTable[(crc ^ byte) & 0xff] ^ (crc >>> 8);
+  }
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Common
+//
+/////////////////////////////////////////////////////////////
+
+abstract class ArchiveSink implements OutputSink {
+  readonly written: string[] = [];
+  protected offset = 0;
+
+  protected constructor(
+    readonly archivePath: string,
+    private readonly handle: fs.promises.FileHandle
+  ) {}
+
+  abstract writeFile(
+    relativePath: string,
+    content: string | Iterable<string>
+  ): Promise<void>;
+
+  abstract close(): Promise<void>;
+
+  protected async append(data: Buffer) {
+    await this.handle.write(data, 0, data.length, this.offset);
+    this.offset += data.length;
+  }
+
+  // Overwrite data written earlier (e.g., a header whose values
+  // were not known until after the content was written).
+  protected async patch(data: Buffer, position: number) {
+    await this.handle.write(data, 0, data.length, position);
+  }
+
+  protected async finish() {
+    await this.handle.truncate(this.offset);
+    await this.handle.close();
+  }
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Zip
+//
+/////////////////////////////////////////////////////////////
+
+type ZipEntry = {
+  name: Buffer;
+  crc: number;
+  compressedSize: number;
+  size: number;
+  offset: number;
+};
+
+// General purpose flag: file names are UTF-8
+const utf8Flag = 0x0800;
+const deflateMethod = 8;
+const zipVersion = 20;
+
+export class ZipSink extends ArchiveSink {
+  private readonly entries: ZipEntry[] = [];
+
+  static async open(archivePath: string) {
+    return new ZipSink(archivePath, await fs.promises.open(archivePath, "w"));
+  }
+
+  private localHeader(entry: ZipEntry) {
+    const header = Buffer.alloc(30);
+    header.writeUInt32LE(0x04034b50, 0);
+    header.writeUInt16LE(zipVersion, 4);
+    header.writeUInt16LE(utf8Flag, 6);
+    header.writeUInt16LE(deflateMethod, 8);
+    header.writeUInt16LE(dosTime, 10);
+    header.writeUInt16LE(dosDate, 12);
+    header.writeUInt32LE(entry.crc, 14);
+    header.writeUInt32LE(entry.compressedSize, 18);
+    header.writeUInt32LE(entry.size, 22);
+    header.writeUInt16LE(entry.name.length, 26);
+    header.writeUInt16LE(0, 28); // extra field length
+    return Buffer.concat([header, entry.name]);
+  }
+
+  private centralHeader(entry: ZipEntry) {
+    const header = Buffer.alloc(46);
+    header.writeUInt32LE(0x02014b50, 0);
+    header.writeUInt16LE(zipVersion, 4); // version made by
+    header.writeUInt16LE(zipVersion, 6); // version needed
+    header.writeUInt16LE(utf8Flag, 8);
+    header.writeUInt16LE(deflateMethod, 10);
+    header.writeUInt16LE(dosTime, 12);
+    header.writeUInt16LE(dosDate, 14);
+    header.writeUInt32LE(entry.crc, 16);
+    header.writeUInt32LE(entry.compressedSize, 20);
+    header.writeUInt32LE(entry.size, 24);
+    header.writeUInt16LE(entry.name.length, 28);
+    // Extra field length, comment length, disk number,
+    // and attributes are all 0.
+    header.writeUInt32LE(entry.offset, 42);
+    return Buffer.concat([header, entry.name]);
+  }
+
+  async writeFile(relativePath: string, content: string | Iterable<string>) {
+    const entry: ZipEntry = {
+      name: Buffer.from(relativePath, "utf8"),
+      crc: 0,
+      compressedSize: 0,
+      size: 0,
+      offset: this.offset,
+    };
+    await this.append(this.localHeader(entry));
+
+    const deflate = zlib.createDeflateRaw();
+    const output = (async () => {
+      for await (const piece of deflate) {
+        await this.append(piece);
+        entry.compressedSize += piece.length;
+      }
+    })();
+    for (const chunk of chunksOf(content)) {
+      const data = Buffer.from(chunk, "utf8");
+      entry.crc = crc32(data, entry.crc);
+      entry.size += data.length;
+      if (!deflate.write(data)) {
+        await new Promise((resolve) => deflate.once("drain", resolve));
+      }
+    }
+    deflate.end();
+    await output;
+
+    await this.patch(this.localHeader(entry), entry.offset);
+    this.entries.push(entry);
+    this.written.push(relativePath);
+  }
+
+  async close() {
+    const centralDirectoryOffset = this.offset;
+    for (const entry of this.entries) {
+      await this.append(this.centralHeader(entry));
+    }
+    const end = Buffer.alloc(22);
+    end.writeUInt32LE(0x06054b50, 0);
+    end.writeUInt16LE(this.entries.length, 8);
+    end.writeUInt16LE(this.entries.length, 10);
+    end.writeUInt32LE(this.offset - centralDirectoryOffset, 12);
+    end.writeUInt32LE(centralDirectoryOffset, 16);
+    await this.append(end);
+    await this.finish();
+  }
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Tar (POSIX ustar)
+//
+/////////////////////////////////////////////////////////////
+
+const tarBlockSize = 512;
+
+function octal(value: number, width: number) {
+  return value.toString(8).padStart(width - 1, "0") + "\0";
+}
+
+// ustar splits long names into a prefix (up to 155 bytes) and
+// a name (up to 100 bytes) at a '/'.
+function splitTarName(relativePath: string): [string, string] {
+  if (Buffer.byteLength(relativePath) <= 100) {
+    return ["", relativePath];
+  }
+  for (
+    let slash = relativePath.indexOf("/");
+    slash >= 0;
+    slash = relativePath.indexOf("/", slash + 1)
+  ) {
+    const prefix = relativePath.slice(0, slash);
+    const name = relativePath.slice(slash + 1);
+    if (Buffer.byteLength(prefix) <= 155 && Buffer.byteLength(name) <= 100) {
+      return [prefix, name];
+    }
+  }
+  throw new Error(`Path is too long to store in a tar archive: ${relativePath}`);
+}
+
+function tarHeader(relativePath: string, size: number) {
+  const [prefix, name] = splitTarName(relativePath);
+  const header = Buffer.alloc(tarBlockSize);
+  header.write(name, 0, 100, "utf8");
+  header.write(octal(0o644, 8), 100, "ascii"); // mode
+  header.write(octal(0, 8), 108, "ascii"); // uid
+  header.write(octal(0, 8), 116, "ascii"); // gid
+  header.write(octal(size, 12), 124, "ascii");
+  header.write(octal(archiveTime, 12), 136, "ascii");
+  header.write("        ", 148, "ascii"); // checksum is computed with spaces here
+  header.write("0", 156, "ascii"); // regular file
+  header.write("ustar\0", 257, "ascii");
+  header.write("00", 263, "ascii");
+  header.write(prefix, 345, 155, "utf8");
+
+  let checksum = 0;
+  for (const byte of header) {
+    checksum += byte;
+  }
+  header.write(octal(checksum, 7) + " ", 148, "ascii");
+  return header;
+}
+
+export class TarSink extends ArchiveSink {
+  static async open(archivePath: string) {
+    return new TarSink(archivePath, await fs.promises.open(archivePath, "w"));
+  }
+
+  async writeFile(relativePath: string, content: string | Iterable<string>) {
+    const headerOffset = this.offset;
+    await this.append(tarHeader(relativePath, 0));
+
+    let size = 0;
+    for (const chunk of chunksOf(content)) {
+      const data = Buffer.from(chunk, "utf8");
+      await this.append(data);
+      size += data.length;
+    }
+    const padding = (tarBlockSize - (size % tarBlockSize)) % tarBlockSize;
+    await this.append(Buffer.alloc(padding));
+
+    await this.patch(tarHeader(relativePath, size), headerOffset);
+    this.written.push(relativePath);
+  }
+
+  async close() {
+    // The end of the archive is marked by two empty blocks.
+    await this.append(Buffer.alloc(2 * tarBlockSize));
+    await this.finish();
+  }
+}
+
+// Open a sink for the archive at archivePath. The type of archive
+// is determined by the file's extension (.zip or .tar).
+export async function openArchiveSink(archivePath: string) {
+  await fs.promises.mkdir(path.dirname(archivePath), { recursive: true });
+  switch (path.extname(archivePath).toLowerCase()) {
+    case ".zip":
+      return ZipSink.open(archivePath);
+    case ".tar":
+      return TarSink.open(archivePath);
+    default:
+      throw new Error(
+        `Unsupported archive type: ${archivePath} (expected .zip or .tar)`
+      );
+  }
+}
@@ -0,0 +1,104 @@
+/************************************************************************************
+ *
+ * codeStructure.ts
+ *
+ * A lightweight, language-independent view of the structure of a source
+ * file, based on indentation: A line followed by more-indented lines
+ * begins a block (a Python def/if/for, or a brace-style block formatted
+ * in the usual way), and the block ends at the next line indented no
+ * more than its first line (or at the closing brace, if it has one).
+ *
+ * Used to snap a selection to whole statements and blocks when no language
+ * extension provides selection ranges (see selectionSnapper.ts).
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+export type LineRange = {
+  startLine: number;
+  startCharacter: number;
+  endLine: number;
+  endCharacter: number;
+};
+
+export type CodeStructure = {
+  lineLengths: number[];
+  // Column of the first non-whitespace character (-1 for blank lines)
+  indents: number[];
+  // For each line that begins a block, the last line of the block
+  // (otherwise, the line itself)
+  blockEnds: number[];
+};
+
+export function analyzeStructure(text: string): CodeStructure {
+  const lines = text.split(/\r?\n/);
+  const lineLengths = lines.map((line) => line.length);
+  const indents = lines.map((line) => line.search(/\S/));
+
+  // One pass from the bottom: the block that starts on line i ends just
+  // before the next non-blank line indented no more than line i.
+  const blockEnds = new Array<number>(lines.length);
+  // Stack of [indent, line] for the non-blank lines below the current one
+  const below: [number, number][] = [];
+  let lastNonBlank = lines.length - 1;
+  for (let line = lines.length - 1; line >= 0; line--) {
+    const indent = indents[line];
+    if (indent < 0) {
+      blockEnds[line] = line;
+      continue;
+    }
+    while (below.length > 0 && below[below.length - 1][0] > indent) {
+      below.pop();
+    }
+    if (below.length > 0) {
+      // The line before the next line at this indent (skipping blank lines)
+      let end = below[below.length - 1][1] - 1;
+      while (end > line && indents[end] < 0) {
+        end--;
+      }
+      // Brace-style blocks end with the line that closes them.
+      const next = below[below.length - 1][1];
+      if (end > line && indents[next] === indent && /^[}\])]/.test(lines[next].trim())) {
+        end = next;
+      }
+      blockEnds[line] = end;
+    } else {
+      let end = lastNonBlank;
+      while (end > line && indents[end] < 0) {
+        end--;
+      }
+      blockEnds[line] = end;
+    }
+    below.push([indent, line]);
+  }
+  return { lineLengths, indents, blockEnds };
+}
+
+// Expand the selection to whole lines (without leading indentation), and
+// to the end of any block begun by a selected line.
+export function snapToBlock(
+  structure: CodeStructure,
+  startLine: number,
+  endLine: number
+): LineRange {
+  const { indents, blockEnds, lineLengths } = structure;
+  while (startLine < endLine && indents[startLine] < 0) {
+    startLine++;
+  }
+  while (endLine > startLine && indents[endLine] < 0) {
+    endLine--;
+  }
+  let end = endLine;
+  for (let line = startLine; line <= end; line++) {
+    end = Math.max(end, blockEnds[line]);
+  }
+  return {
+    startLine,
+    startCharacter: Math.max(0, indents[startLine]),
+    endLine: end,
+    endCharacter: lineLengths[end],
+  };
+}
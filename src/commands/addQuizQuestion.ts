@@ -14,11 +14,13 @@ import { state, config } from '../gvQLC';
 import { quizQuestionsFileName } from '../sharedConstants';
 
 import * as Util from '../utilities';
+import { snapSelection, snapSelectionOnAdd } from '../selectionSnapper';
+import { tracedSync, tracedCommand } from '../tracing';
 
-export const addQuizQuestionCommand = vscode.commands.registerCommand('gvqlc.addQuizQuestion', async () => {
+export const addQuizQuestion = tracedCommand('gvqlc.addQuizQuestion', async () => {
     console.log('Begin addQuizQuestion.');
 
-    if (!Util.loadPersistedData()) {
+    if (!tracedSync('load', () => Util.loadPersistedData())) {
         return;
     }
 
@@ -38,7 +40,10 @@ export const addQuizQuestionCommand = vscode.commands.registerCommand('gvqlc.add
         return;
     }
 
-    const range = new vscode.Range(selection.start, selection.end);
+    // Optionally expand the selection to the enclosing statement or block.
+    const range = snapSelectionOnAdd()
+        ? await snapSelection(editor.document, selection)
+        : new vscode.Range(selection.start, selection.end);
     let selectedText = editor.document.getText(range);
 
     // Get workspace root and calculate relative path
@@ -281,8 +286,8 @@ export const addQuizQuestionCommand = vscode.commands.registerCommand('gvqlc.add
             const questionData = {
                 filePath: relativePath, // Using relative path here
                 range: {
-                    start: { line: selection.start.line, character: selection.start.character },
-                    end: { line: selection.end.line, character: selection.end.character },
+                    start: { line: range.start.line, character: range.start.character },
+                    end: { line: range.end.line, character: range.end.character },
                 },
                 text: message.question,
                 highlightedCode: message.editedCode,
@@ -291,8 +296,7 @@ export const addQuizQuestionCommand = vscode.commands.registerCommand('gvqlc.add
             };
 
             // Save to personalizedQuestions.json
-            state.personalizedQuestionsData.push(questionData);
-            await Util.saveDataToFile(quizQuestionsFileName, state.personalizedQuestionsData);
+            await state.questionQueue.add([questionData]);
 
             //
             // Why is this here?  I think this is old code we can deprecate.
@@ -303,7 +307,7 @@ export const addQuizQuestionCommand = vscode.commands.registerCommand('gvqlc.add
                 try {
                     let answersData = await loadExistingAnswers();
                     answersData.push({
-                        questionId: state.personalizedQuestionsData.length - 1,
+                        questionId: state.questions.size - 1,
                         questionText: message.question,
                         answer: message.answer.trim(),
                         studentName: studentName,
@@ -0,0 +1,189 @@
+/************************************************************************************
+ *
+ * applyQuestionToSimilar.ts
+ *
+ * The applyQuestionToSimilarSnippets command: Copy an existing question to
+ * the matching code in other students' submissions (e.g., ask every student
+ * about their version of the same loop).
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+import * as fs from "fs";
+import * as path from "path";
+
+import { state, config as getConfig } from "../gvQLC";
+
+import * as Util from "../utilities";
+import { PersonalizedQuestionsData } from "../types";
+import { submissionIndex } from "../submissionIndexer";
+import { SubmissionIndex } from "../submissionIndex";
+import { Fingerprint, SimilarityIndex, fingerprint } from "../similarity";
+import { traced, tracedSync, tracedCommand } from "../tracing";
+import { fieldBytes, mapEntryBytes, objectHeaderBytes, registerMemoryReporter } from "../memoryReport";
+
+// Larger files are not source code a question could be about.
+const maxFileSize = 1024 * 1024;
+
+// Fingerprints by content hash, so unchanged files are not re-read.
+const fingerprintCache = new Map<string, Fingerprint[]>();
+registerMemoryReporter("Similar snippets", () => {
+  let fingerprints = 0;
+  for (const list of fingerprintCache.values()) {
+    fingerprints += list.length;
+  }
+  return [{
+    structure: "fingerprint cache",
+    items: fingerprints,
+    // A 40-character hash per file, and a three-field object per fingerprint
+    bytes: fingerprintCache.size * (mapEntryBytes + objectHeaderBytes + 40) +
+      fingerprints * (objectHeaderBytes + 4 * fieldBytes),
+  }];
+});
+
+// Index every submitted file with the given extension.
+async function buildSimilarityIndex(index: SubmissionIndex, extension: string) {
+  const similarity = new SimilarityIndex();
+  const live = new Set<string>();
+  for (const [student, files] of Object.entries(index.students)) {
+    for (const [relativePath, file] of Object.entries(files)) {
+      if (path.extname(relativePath) !== extension || file.size > maxFileSize) {
+        continue;
+      }
+      live.add(file.hash);
+      let fingerprints = fingerprintCache.get(file.hash);
+      if (!fingerprints) {
+        const filePath = path.join(index.root, student, ...relativePath.split("/"));
+        try {
+          fingerprints = fingerprint(await fs.promises.readFile(filePath, "utf-8"));
+        } catch {
+          continue;
+        }
+        fingerprintCache.set(file.hash, fingerprints);
+      }
+      similarity.addFile(path.join(index.root, student, ...relativePath.split("/")), fingerprints);
+    }
+  }
+  // Forget files that have since been changed or removed.
+  for (const hash of fingerprintCache.keys()) {
+    if (!live.has(hash)) {
+      fingerprintCache.delete(hash);
+    }
+  }
+  return similarity;
+}
+
+// The question under the cursor (if any); otherwise, the one the user picks.
+async function chooseQuestion(workspaceRoot: string) {
+  const editor = vscode.window.activeTextEditor;
+  if (editor) {
+    const relativePath = path.relative(workspaceRoot, editor.document.uri.fsPath);
+    const active = editor.selection.active;
+    const underCursor = state.questions.ids().find((id) => {
+      if (state.questions.filePath(id) !== relativePath) {
+        return false;
+      }
+      const { start, end } = state.questions.range(id);
+      return new vscode.Range(start.line, start.character, end.line, end.character).contains(active);
+    });
+    if (underCursor !== undefined) {
+      return state.questions.get(underCursor);
+    }
+  }
+  const picked = await vscode.window.showQuickPick(
+    state.questions.all().map((question) => ({
+      label: question.text,
+      description: `${question.filePath}:${question.range.start.line + 1}`,
+      question,
+    })),
+    { placeHolder: "Choose the question to apply to similar code" }
+  );
+  return picked?.question;
+}
+
+export const applyQuestionToSimilarSnippets = tracedCommand(
+  "gvqlc.applyQuestionToSimilarSnippets",
+  async () => {
+    if (!tracedSync("load", () => Util.loadPersistedData())) {
+      return;
+    }
+    if (state.questions.size === 0) {
+      vscode.window.showErrorMessage("There are no questions to apply.");
+      return;
+    }
+
+    const workspaceRoot = Util.getWorkspaceDirectory();
+    const question = await chooseQuestion(workspaceRoot);
+    if (!question) {
+      return;
+    }
+
+    const config = await getConfig();
+    const student = Util.extractStudentName(question.filePath, config.submissionRoot);
+    const index = await traced("submissionIndex", () => submissionIndex(config));
+    const similarity = await traced("fingerprint", () =>
+      buildSimilarityIndex(index, path.extname(question.filePath))
+    );
+    const matches = tracedSync("query", () =>
+      similarity.query(question.highlightedCode, {
+        exclude: (filePath) =>
+          Util.extractStudentName(path.relative(workspaceRoot, filePath), config.submissionRoot) === student,
+      })
+    );
+    if (matches.length === 0) {
+      vscode.window.showInformationMessage("No similar code found in other submissions.");
+      return;
+    }
+
+    const items = await Promise.all(
+      matches.map(async (match) => {
+        const lines = (await fs.promises.readFile(match.fileId, "utf-8"))
+          .split(/\r?\n/)
+          .slice(match.startLine, match.endLine + 1);
+        const startCharacter = lines[0].length - lines[0].trimStart().length;
+        const filePath = path.relative(workspaceRoot, match.fileId);
+        return {
+          label: Util.extractStudentName(filePath, config.submissionRoot),
+          description: `${filePath}:${match.startLine + 1}  (${Math.round(match.score * 100)}% match)`,
+          detail: lines[0].trim(),
+          picked: true,
+          question: {
+            filePath,
+            range: {
+              start: { line: match.startLine, character: startCharacter },
+              end: { line: match.endLine, character: lines[lines.length - 1].length },
+            },
+            text: question.text,
+            highlightedCode: lines.join("\n").slice(startCharacter),
+            excludeFromQuiz: false,
+          } as PersonalizedQuestionsData,
+        };
+      })
+    );
+    const picked = await vscode.window.showQuickPick(items, {
+      canPickMany: true,
+      placeHolder: `Apply "${question.text}" to the selected code`,
+    });
+    if (!picked || picked.length === 0) {
+      return;
+    }
+
+    // Don't add the same question twice to the same code.
+    const added = picked
+      .map((item) => item.question)
+      .filter(
+        (candidate) =>
+          !state.questions.ids().some(
+            (existing) =>
+              state.questions.filePath(existing) === candidate.filePath &&
+              state.questions.text(existing) === candidate.text &&
+              state.questions.startLine(existing) === candidate.range.start.line
+          )
+      );
+    await traced("write", () => state.questionQueue.add(added));
+    vscode.window.showInformationMessage(
+      `Added the question to ${added.length} submission(s).`
+    );
+  }
+);
@@ -2,378 +2,346 @@
  *
  * generatePLQuiz.ts
  *
- * The generatePLQuiz command.
+ * The generatePLQuiz and previewPLQuiz commands.
  *
  * (C) 2025 Benedict Osei Sefa and Zachary Kurmas
  * *********************************************************************************/
 
-import * as path from "path";
 import * as vscode from "vscode";
-import * as fs from "fs";
-
-import { randomUUID } from "crypto";
+import * as path from "path";
 
-import { state, config as getConfig } from "../gvQLC";
-import { quizQuestionsFileName } from "../sharedConstants";
+import { state, config as getConfig, templates } from "../gvQLC";
+import { plManifestFileName, plCourseIndexFileName, exportFolderName } from "../sharedConstants";
 
 import * as Util from "../utilities";
-import { PersonalizedQuestionsData } from "../types";
+import { ConfigData, PersonalizedQuestionsData } from "../types";
 import { openConfigFileEditTab } from "../configFile";
 import { logToFile } from "../fileLogger";
+import { PLManifest } from "../plManifest";
+import {
+  PLCourseIndex,
+  scanPLCourse,
+  existingUuid,
+} from "../plCourseIndex";
+import {
+  PLPlanAnalysis,
+  selectQuizQuestions,
+  planPLQuiz,
+  planManifestEntries,
+  analyzePLPlan,
+  describePLPlan,
+  executePLPlan,
+  writePLPlanToSink,
+} from "../plGenerator";
+import { QuizIR, buildQuizIR } from "../quizExport";
+import { FolderSink } from "../outputSink";
+import { openArchiveSink } from "../archiveSink";
+import { exporterFor, exporterFormats } from "../exporters/exporterRegistry";
+import { traced, tracedSync, tracedCommand, startSpan } from "../tracing";
+
+// Everything needed to generate a quiz in every configured format.
+type QuizRun = {
+  config: ConfigData;
+  quiz: QuizIR;
+  analysis: PLPlanAnalysis;
+};
+
+function loadManifest(): PLManifest {
+  const storedManifest = Util.loadDataFromFile(plManifestFileName);
+  return Array.isArray(storedManifest) ? {} : storedManifest;
+}
+
+// Verify that a quiz can be generated, then compute (but do not carry out)
+// the plan for generating it. Returns undefined (after notifying the user)
+// if the quiz can't be generated. If pickStudents is true, the user chooses
+// which students' quizzes to (re)generate.
+async function planQuiz(pickStudents = false): Promise<QuizRun | undefined> {
+  // This should verify that a workspace is open and return if not.
+  if (!tracedSync("load", () => Util.loadPersistedData())) {
+    return undefined;
+  }
+  // It is important that the question length be tested before
+  // accessing the config file. That way we don't create a config
+  // file unless there are existing questions.
+  if (state.questions.size === 0) {
+    vscode.window.showErrorMessage(
+      "No personalized questions available to generate the quiz!"
+    );
+    return undefined;
+  }
 
+  // Calling getConfig() and openConfigFile()
+  // here is safe because we have already verified that
+  // there is a workspace open.
+  const config = await traced("config", () => getConfig(true));
+  if (!config.pl_ready) {
+    vscode.window.showErrorMessage("Config file has not been customized.");
 
-export const generatePLQuizCommand = vscode.commands.registerCommand(
-  "gvqlc.generatePLQuiz",
-  async () => {
-    // This should verify that a workspace is open and return if not.
-    if (!Util.loadPersistedData()) {
-      return false;
-    }
-    // It is important that the question length be tested before
-    // accessing the config file. That way we don't create a config
-    // file unless there are existing questions.
-    if (state.personalizedQuestionsData.length === 0) {
+    // TODO: Add test to verify that window is opened in a different column
+    openConfigFileEditTab();
+    return undefined;
+  }
+
+  // TODO: Add test to verify that missing fields are detected
+  // Validate required fields in config
+  const requiredFields = [
+    "title",
+    "topic",
+    "pl_root",
+    "pl_question_root",
+    "pl_assessment_root",
+    "pl_quiz_folder",
+    "set",
+    "number",
+    "points_per_question",
+    "startDate",
+    "endDate",
+    "timeLimitMin",
+    "daysForGrading",
+    "reviewEndDate",
+    "language",
+  ];
+  for (const field of requiredFields) {
+    if (!config[field]) {
       vscode.window.showErrorMessage(
-        "No personalized questions available to generate the quiz!"
+        `Missing required field in config: ${field}`
       );
-      return;
+      return undefined;
     }
+  }
 
-    // Calling getConfig() and openConfigFile()
-    // here is safe because we have already verified that
-    // there is a workspace open.
-    const config = await getConfig(true);
-    if (!config.pl_ready) {
-      vscode.window.showErrorMessage("Config file has not been customized.");
+  // TODO: What's going on here?
+  console.log("(cl) SubmissionRoot is ", config.submissionRoot);
+  if (!config.submissionRoot) {
+    vscode.window.showErrorMessage(
+      `(window) submissionRoot is =>${config.submissionRoot}<=.`
+    );
+  }
 
-      // TODO: Add test to verify that window is opened in a different column
-      openConfigFileEditTab();
-      return;
-    }
+  const endGroup = startSpan("group");
+  const quizQuestions = selectQuizQuestions(
+    state.questions.all(),
+    config.pl_include_files
+  );
+  if (quizQuestions.length === 0) {
+    vscode.window.showErrorMessage(
+      "All questions are excluded from the quiz."
+    );
+    return undefined;
+  }
 
-    // TODO: Add test to verify that missing fields are detected
-    // Validate required fields in config
-    const requiredFields = [
-      "title",
-      "topic",
-      "pl_root",
-      "pl_question_root",
-      "pl_assessment_root",
-      "pl_quiz_folder",
-      "set",
-      "number",
-      "points_per_question",
-      "startDate",
-      "endDate",
-      "timeLimitMin",
-      "daysForGrading",
-      "reviewEndDate",
-      "language",
-    ];
-    for (const field of requiredFields) {
-      if (!config[field]) {
-        vscode.window.showErrorMessage(
-          `Missing required field in config: ${field}`
-        );
-        return;
+  // Group questions by student
+  const questionsByStudent: Record<string, PersonalizedQuestionsData[]> = {};
+  for (const question of quizQuestions) {
+    const studentName = Util.extractStudentName(
+      question.filePath,
+      config.submissionRoot
+    );
+    if (!questionsByStudent[studentName]) {
+      questionsByStudent[studentName] = [];
+    }
+    questionsByStudent[studentName].push(question);
+  }
+  endGroup();
+
+  let onlyStudents: Set<string> | undefined;
+  if (pickStudents) {
+    const picked = await vscode.window.showQuickPick(
+      Object.keys(questionsByStudent)
+        .sort()
+        .map((studentName) => ({
+          label: studentName,
+          description: `${questionsByStudent[studentName].length} question(s)`,
+        })),
+      {
+        canPickMany: true,
+        placeHolder: "Choose the students whose quizzes should be generated",
       }
+    );
+    if (!picked || picked.length === 0) {
+      return undefined;
     }
+    onlyStudents = new Set(picked.map((item) => item.label));
+  }
 
-    // Construct paths
-    const questionsFolderPath = path.join(
-      config.pl_root,
-      "questions",
-      config.pl_question_root,
-      config.pl_quiz_folder
-    );
-    const assessmentFolderPath = path.join(
+  // Index what is already in the PL course (re-reading only what has
+  // changed since the last run) so that existing UUIDs can be reused and
+  // collisions detected.
+  const courseIndex = await traced("scanCourse", async () => {
+    const index = await scanPLCourse(
       config.pl_root,
-      config.pl_assessment_root,
-      config.pl_quiz_folder
-    );
-    const instructorFolderPath = path.join(questionsFolderPath, "instructor");
-    const instructorAssessmentPath = path.join(
-      assessmentFolderPath,
-      "instructor"
+      Util.loadCache<PLCourseIndex>(plCourseIndexFileName)
     );
-
-    // Ensure directories exist
-    [
-      questionsFolderPath,
-      assessmentFolderPath,
-      instructorFolderPath,
-      instructorAssessmentPath,
-    ].forEach((folder) => {
-      if (!fs.existsSync(folder)) {
-        fs.mkdirSync(folder, { recursive: true });
-      }
-    });
-
-    // TODO: What's going on here?
-    console.log("(cl) SubmissionRoot is ", config.submissionRoot);
-    if (!config.submissionRoot) {
+    await Util.saveCache(plCourseIndexFileName, index);
+    return index;
+  });
+
+  // Group and label the questions once. Every output format is
+  // generated from this same representation.
+  const quiz = tracedSync("label", () =>
+    buildQuizIR(config, Object.entries(questionsByStudent))
+  );
+  const plan = tracedSync("render", () =>
+    planPLQuiz(config, quiz, {
+      previousManifest: loadManifest(),
+      existingUuid: (filePath) => existingUuid(courseIndex, filePath),
+      // An archive is written from scratch each time, so the plan must be
+      // the same every time for an unchanged quiz to give the same archive.
+      reproducible: Boolean(config.pl_archive),
+      onlyStudents,
+      templates: templates(),
+    })
+  );
+  const analysis = tracedSync("analyze", () => analyzePLPlan(plan, courseIndex));
+  return { config, quiz, analysis };
+}
+
+// Write the quiz in each of the other formats listed in export_formats.
+// Each format gets its own folder under export_root.
+async function exportQuiz(config: ConfigData, quiz: QuizIR) {
+  const formats = Array.isArray(config.export_formats)
+    ? config.export_formats
+    : [];
+  const exportRoot = path.resolve(
+    Util.getWorkspaceDirectory(),
+    String(config.export_root || exportFolderName)
+  );
+  for (const format of formats) {
+    const exporter = exporterFor(format);
+    if (!exporter) {
       vscode.window.showErrorMessage(
-        `(window) submissionRoot is =>${config.submissionRoot}<=.`
+        `Unknown export format "${format}". (Available formats: ${exporterFormats().join(", ")})`
       );
+      continue;
     }
+    const sink = new FolderSink(
+      path.join(exportRoot, `${config.pl_quiz_folder}-${exporter.format}`)
+    );
+    await traced(`export ${exporter.format}`, async () => {
+      await exporter.export(quiz, sink);
+      await sink.close();
+    });
+    logToFile(`Exported ${sink.written.length} ${exporter.format} file(s) to ${sink.root}`);
+  }
+}
+
+// Write the whole quiz into the archive named by pl_archive (instead of
+// into pl_root). The archive's paths are relative to pl_root, so it can
+// be unpacked into the root of the PL course.
+async function archivePlan({ config, quiz, analysis }: QuizRun) {
+  const archivePath = path.resolve(
+    Util.getWorkspaceDirectory(),
+    String(config.pl_archive)
+  );
+  let sink;
+  try {
+    sink = await openArchiveSink(archivePath);
+  } catch (e) {
+    vscode.window.showErrorMessage((e as Error).message);
+    return;
+  }
+  const written = await traced("write", async () => {
+    const count = await writePLPlanToSink(analysis.plan, sink);
+    await sink.close();
+    return count;
+  });
+  logToFile(`Wrote ${written} file(s) to ${archivePath}`);
+
+  await exportQuiz(config, quiz);
+
+  vscode.window.showInformationMessage(
+    "Successfully generated PrairieLearn Quiz."
+  );
+}
+
+// Carry out the plan and record what was emitted so that the
+// next run can prune anything that is no longer generated.
+async function applyPlan(run: QuizRun) {
+  const { config, quiz, analysis } = run;
+  if (config.pl_archive) {
+    return archivePlan(run);
+  }
+  const result = await traced("write", () => executePLPlan(analysis));
+  logToFile(
+    `Wrote ${result.written} of ${analysis.files.length} file(s) to ${analysis.plan.plRoot}`
+  );
+  if (result.pruned.length > 0) {
+    logToFile(
+      `Pruned ${result.pruned.length} stale file(s) from ${analysis.plan.plRoot}`
+    );
+  }
 
-    // Group questions by student
-    const questionsByStudent: Record<string, PersonalizedQuestionsData[]> = {};
-    for (const question of state.personalizedQuestionsData) {
-      const studentName = Util.extractStudentName(
-        question.filePath,
-        config.submissionRoot
-      );
-      if (!questionsByStudent[studentName]) {
-        questionsByStudent[studentName] = [];
-      }
-      questionsByStudent[studentName].push(question);
-    }
-
-    // Generate questions and info.json files for each student
-    for (const [studentName, questions] of Object.entries(questionsByStudent)) {
-      // Create the student's question folder
-      const studentQuestionFolderPath = path.join(
-        questionsFolderPath,
-        studentName
-      );
-      if (!fs.existsSync(studentQuestionFolderPath)) {
-        fs.mkdirSync(studentQuestionFolderPath, { recursive: true });
-      }
-
-      // Generate question.html and info.json for each question
-      for (const [index, question] of questions.entries()) {
-        const questionFolderPath = path.join(
-          studentQuestionFolderPath,
-          `question${index + 1}`
-        );
-        if (!fs.existsSync(questionFolderPath)) {
-          fs.mkdirSync(questionFolderPath, { recursive: true });
-        }
-
-        // Create question.html with proper PL structure
-        const questionHTMLContent = `
-<pl-question-panel>
-<markdown>
-${question.text || "No question text provided"}
-</markdown>
-    ${
-      question.highlightedCode
-        ? `<pl-code language="${config.language}">\n${Util.escapeHtmlAttr(
-            question.highlightedCode
-          )}\n</pl-code>`
-        : ""
-    }
-</pl-question-panel>`;
-
-        fs.writeFileSync(
-          path.join(questionFolderPath, "question.html"),
-          questionHTMLContent
-        );
-
-        // Create info.json
-        fs.writeFileSync(
-          path.join(questionFolderPath, "info.json"),
-          JSON.stringify(
-            {
-              uuid: randomUUID(),
-              type: "v3",
-              gradingMethod: "Manual",
-              title: `${config.title} Q${index + 1}`,
-              topic: config.topic,
-            },
-            null,
-            2
-          )
-        );
-      }
-
-      // Create the student's assessment folder
-      const studentAssessmentFolderPath = path.join(
-        assessmentFolderPath,
-        studentName
-      );
-      if (!fs.existsSync(studentAssessmentFolderPath)) {
-        fs.mkdirSync(studentAssessmentFolderPath, { recursive: true });
-      }
-
-      // toISOString will add a time zone (UTC by default).
-      const startOfReviewUTC = new Date(
-        new Date(config.startDate).getTime() + config.daysForGrading * 86400000
-      ).toISOString();
-
-      // Remove teh time zone component so that PL
-      // will interpret the value in local time (as defined
-      // by the course).
-      const startOfReview = startOfReviewUTC.endsWith('Z') ? startOfReviewUTC.slice(0, -1) : startOfReviewUTC;
+  await traced("writeManifest", () => {
+    const manifest = loadManifest();
+    manifest[analysis.plan.manifestKey] = planManifestEntries(analysis.plan);
+    return Util.saveDataToFile(plManifestFileName, manifest);
+  });
 
+  await exportQuiz(config, quiz);
 
-      // Generate infoAssessment.json for student
-      const infoAssessmentContent = {
-        uuid: randomUUID(),
-        type: "Exam",
-        title: config.title,
-        set: config.set,
-        number: config.number,
-        allowAccess: [
-          {
-            mode: "Public",
-            uids: [studentName],
-            credit: 100,
-            timeLimitMin: config.timeLimitMin,
-            startDate: config.startDate,
-            endDate: config.endDate,
-            ...(config.password && { password: config.password }),
-          },
-          {
-            mode: "Public",
-            uids: [studentName],
-            credit: 0,
-            startDate: startOfReview,
-            endDate: config.reviewEndDate,
-            active: false,
-          },
-        ],
-        zones: [
-          {
-            questions: questions.map((q, index) => ({
-              id: `${config.pl_question_root}/${
-                config.pl_quiz_folder
-              }/${studentName}/question${index + 1}`,
-              points: config.points_per_question,
-            })),
-          },
-        ],
-      };
+  vscode.window.showInformationMessage(
+    "Successfully generated PrairieLearn Quiz."
+  );
+}
 
-      fs.writeFileSync(
-        path.join(studentAssessmentFolderPath, "infoAssessment.json"),
-        JSON.stringify(infoAssessmentContent, null, 2)
-      );
+async function generate(pickStudents: boolean) {
+  const run = await planQuiz(pickStudents);
+  if (!run) {
+    return;
+  }
+  const { analysis } = run;
+  if (analysis.collisions.length > 0) {
+    for (const collision of analysis.collisions) {
+      logToFile(collision.message);
     }
-
-    // Generate combined question file for instructor
-    const instructorQuestionFolderPath = path.join(
-      instructorFolderPath,
-      "combined_questions"
+    const choice = await Util.showModalWarning(
+      `The quiz collides with ${analysis.collisions.length} existing item(s) in the PrairieLearn course. (Run "Preview PrairieLearn Quiz" for details.)`,
+      "Generate Anyway"
     );
-    if (!fs.existsSync(instructorQuestionFolderPath)) {
-      fs.mkdirSync(instructorQuestionFolderPath, { recursive: true });
+    if (choice !== "Generate Anyway") {
+      return;
     }
+  }
+  await applyPlan(run);
+}
 
-    // Create combined question.html with proper PL structure
-    let combinedHTMLContent = `<pl-question-panel>
-<markdown>
-# ${config.title} - All Student Questions
-<hr><br>
-</markdown>
-</pl-question-panel>`;
-
-    // Add each student's questions
-    for (const [studentName, questions] of Object.entries(questionsByStudent)) {
-      combinedHTMLContent += `
-<pl-question-panel>
-<markdown>
-## Student: ${studentName}
-</markdown>
-</pl-question-panel>`;
+export const generatePLQuiz = tracedCommand("gvqlc.generatePLQuiz", async () =>
+  generate(false)
+);
 
-      questions.forEach((question, index) => {
-        // Extract the code blocks and question text
-        const questionText = question.text || "No question text provided";
-        const codeBlock = question.highlightedCode
-          ? `<pl-code language="${config.language}">\n${Util.escapeHtmlAttr(
-              question.highlightedCode
-            )}\n</pl-code>`
-          : "";
+// Regenerate only the chosen students' questions and assessments
+// (e.g., after adding a late question for one student).
+export const generatePLQuizForStudents = tracedCommand(
+  "gvqlc.generatePLQuizForStudents",
+  async () => generate(true)
+);
 
-        combinedHTMLContent += `
-<pl-question-panel>
-<markdown>
-### Question ${index + 1}
-${questionText}
-</markdown>
-    ${codeBlock}
-</pl-question-panel>
-<br><hr><br>
-`;
-      });
+// Show what generatePLQuiz would do to the PL course (without
+// touching it), then generate the quiz only if the user approves.
+export const previewPLQuiz = tracedCommand(
+  "gvqlc.previewPLQuiz",
+  async () => {
+    const run = await planQuiz();
+    if (!run) {
+      return;
     }
+    const { analysis } = run;
 
-    // Write the combined question file
-    fs.writeFileSync(
-      path.join(instructorQuestionFolderPath, "question.html"),
-      combinedHTMLContent
-    );
-
-    // Write instructor info.json
-    fs.writeFileSync(
-      path.join(instructorQuestionFolderPath, "info.json"),
-      JSON.stringify(
-        {
-          uuid: randomUUID(),
-          gradingMethod: "Manual",
-          type: "v3",
-          title: `${config.title} - All Questions`,
-          topic: config.topic,
-        },
-        null,
-        2
-      )
-    );
-
-    // Generate instructor assessment file
-    const instructorInfoAssessmentContent = {
-      uuid: randomUUID(),
-      type: "Exam",
-      title: `${config.title} (Instructor View)`,
-      set: config.set,
-      number: config.number,
-      allowAccess: [
-        {
-          mode: "Public",
-          uids: ["instructor"],
-          credit: 100,
-          timeLimitMin: config.timeLimitMin * 3,
-          startDate: new Date(Date.now() - 86400000).toISOString(),
-          endDate: new Date(
-            new Date(Date.now()).getTime() + 86_400_000_1000 // 1000 days
-          ).toISOString(),
-          active: true,
-        },
-      ],
-      zones: [
-        {
-          title: "Combined Questions",
-          questions: [
-            {
-              id: `${config.pl_question_root}/${config.pl_quiz_folder}/instructor/combined_questions`,
-              points: 0,
-              description: "All student questions combined",
-            },
-          ],
-        },
-      ],
-    };
-
-    fs.writeFileSync(
-      path.join(instructorAssessmentPath, "infoAssessment.json"),
-      JSON.stringify(instructorInfoAssessmentContent, null, 2)
-    );
-
-    vscode.window.showInformationMessage(
-      "Successfully generated PrairieLearn Quiz."
-    );
+    const doc = await vscode.workspace.openTextDocument({
+      language: "markdown",
+      content: describePLPlan(analysis),
+    });
+    await vscode.window.showTextDocument(doc, {
+      preview: false,
+      viewColumn: vscode.ViewColumn.Beside,
+    });
 
-    /*
-    vscode.window.showInformationMessage(
-      `Successfully generated personalized quiz!\n\n` +
-        `Student questions: ${questionsFolderPath}\n` +
-        `Student assessments: ${assessmentFolderPath}\n` +
-        `Instructor combined view: ${instructorQuestionFolderPath}\n` +
-        `Instructor assessment: ${instructorAssessmentPath}`,
-      { modal: true }
+    const choice = await Util.showModalInformation(
+      `Apply this plan to ${analysis.plan.plRoot}?`,
+      "Generate"
     );
-    */
+    if (choice === "Generate") {
+      await applyPlan(run);
+    }
   }
 );
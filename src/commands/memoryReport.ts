@@ -0,0 +1,24 @@
+/************************************************************************************
+ *
+ * memoryReport.ts
+ *
+ * The showMemoryReport command, which estimates how much memory the
+ * extension's data structures use (see ../memoryReport.ts).
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+
+import { describeMemory } from "../memoryReport";
+
+export async function showMemoryReport() {
+  const doc = await vscode.workspace.openTextDocument({
+    language: "markdown",
+    content: describeMemory(),
+  });
+  await vscode.window.showTextDocument(doc, {
+    preview: false,
+    viewColumn: vscode.ViewColumn.Beside,
+  });
+}
@@ -0,0 +1,43 @@
+/************************************************************************************
+ *
+ * performanceReport.ts
+ *
+ * The showPerformanceReport and exportPerformanceTrace commands, which
+ * report the timing of recent runs of the other commands (see tracing.ts).
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+
+import { chromeTrace, describeRuns } from "../tracing";
+
+export async function showPerformanceReport() {
+  const doc = await vscode.workspace.openTextDocument({
+    language: "markdown",
+    content: describeRuns(),
+  });
+  await vscode.window.showTextDocument(doc, {
+    preview: false,
+    viewColumn: vscode.ViewColumn.Beside,
+  });
+}
+
+// Save the recent runs as a Chrome trace-event file.
+export async function exportPerformanceTrace() {
+  const folder = vscode.workspace.workspaceFolders?.[0]?.uri;
+  const uri = await vscode.window.showSaveDialog({
+    defaultUri: folder ? vscode.Uri.joinPath(folder, "gvQLC-trace.json") : undefined,
+    filters: { "Trace Event JSON": ["json"] },
+  });
+  if (!uri) {
+    return;
+  }
+  await vscode.workspace.fs.writeFile(
+    uri,
+    Buffer.from(JSON.stringify(chromeTrace()))
+  );
+  vscode.window.showInformationMessage(
+    `Performance trace saved to ${uri.fsPath}. (Open it in chrome://tracing or https://ui.perfetto.dev.)`
+  );
+}
@@ -0,0 +1,23 @@
+/************************************************************************************
+ *
+ * snapSelection.ts
+ *
+ * The snapSelection command: Expand the selection to the nearest enclosing
+ * statement, block, or function (see selectionSnapper.ts).
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+
+import { snapSelection } from "../selectionSnapper";
+
+export async function snapEditorSelection() {
+  const editor = vscode.window.activeTextEditor;
+  if (!editor) {
+    vscode.window.showErrorMessage("gvQLC: No active editor tab found.");
+    return;
+  }
+  const range = await snapSelection(editor.document, editor.selection);
+  editor.selection = new vscode.Selection(range.start, range.end);
+}
@@ -0,0 +1,230 @@
+/************************************************************************************
+ *
+ * suggestHotspots.ts
+ *
+ * The suggestHotspots command: Rank the regions of each student's code
+ * most worth asking about (see hotspots.ts) and list them in the gvQLC
+ * Hotspots view, where one click turns a hotspot into a question.
+ *
+ * Each file's analysis is cached by content hash (in the extension's
+ * storage), so only submissions that have changed are re-analyzed.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+import * as fs from "fs";
+import * as path from "path";
+
+import { context, config as getConfig } from "../gvQLC";
+import { hotspotCacheFileName } from "../sharedConstants";
+
+import * as Util from "../utilities";
+import { logToFile } from "../fileLogger";
+import { submissionIndex } from "../submissionIndexer";
+import {
+  FileAnalysis,
+  Hotspot,
+  analyzeSource,
+  languageOfFile,
+  rankHotspots,
+  sourceExtensions,
+  uniqueRegions,
+} from "../hotspots";
+import { traced, tracedCommand } from "../tracing";
+
+type HotspotCache = {
+  language: string;
+  // content hash -> analysis
+  files: Record<string, FileAnalysis>;
+};
+
+// Show at most this many hotspots per student.
+const maxHotspotsPerStudent = 10;
+
+type StudentNode = {
+  student: string;
+  hotspots: HotspotNode[];
+};
+
+type HotspotNode = {
+  filePath: string;
+  hotspot: Hotspot;
+};
+
+type Node = StudentNode | HotspotNode;
+
+class HotspotTreeProvider implements vscode.TreeDataProvider<Node> {
+  private students: StudentNode[] = [];
+  private readonly changed = new vscode.EventEmitter<Node | undefined>();
+  readonly onDidChangeTreeData = this.changed.event;
+
+  setStudents(students: StudentNode[]) {
+    this.students = students;
+    this.changed.fire(undefined);
+  }
+
+  getChildren(node?: Node): Node[] {
+    if (!node) {
+      return this.students;
+    }
+    return "student" in node ? node.hotspots : [];
+  }
+
+  getTreeItem(node: Node): vscode.TreeItem {
+    if ("student" in node) {
+      const item = new vscode.TreeItem(
+        node.student,
+        vscode.TreeItemCollapsibleState.Collapsed
+      );
+      item.description = `${node.hotspots.length} hotspot(s)`;
+      return item;
+    }
+    const { hotspot, filePath } = node;
+    const item = new vscode.TreeItem(hotspot.reason);
+    item.description = `${path.relative(Util.getWorkspaceDirectory(), filePath)}:${hotspot.startLine + 1}`;
+    item.tooltip = `Score ${hotspot.score.toFixed(1)}`;
+    item.contextValue = "gvqlcHotspot";
+    item.command = {
+      command: "gvqlc.revealHotspot",
+      title: "Show Hotspot",
+      arguments: [node],
+    };
+    return item;
+  }
+}
+
+let provider: HotspotTreeProvider | undefined;
+
+function hotspotTree() {
+  if (!provider) {
+    provider = new HotspotTreeProvider();
+    context().subscriptions.push(
+      vscode.window.registerTreeDataProvider("gvqlc.hotspots", provider)
+    );
+  }
+  return provider;
+}
+
+async function analyzeSubmissions(): Promise<StudentNode[]> {
+  const config = await getConfig();
+  const language = String(config.language || "python");
+  const extensions = sourceExtensions(language);
+  const index = await submissionIndex(config);
+
+  const submissions = Object.entries(index.students).flatMap(([student, studentFiles]) =>
+    Object.entries(studentFiles).map(([relativePath, file]) => ({ student, relativePath, file }))
+  );
+  // If no submission is in the configured language (e.g., the config was copied
+  // from another course), choose each file's language from its extension.
+  const matchesConfig = submissions.some(({ relativePath }) =>
+    extensions.includes(path.extname(relativePath))
+  );
+  if (!matchesConfig) {
+    logToFile(`No ${language} files found; choosing each file's language from its extension`);
+  }
+  const languageOf = (relativePath: string) =>
+    matchesConfig
+      ? extensions.includes(path.extname(relativePath)) ? language : undefined
+      : languageOfFile(relativePath);
+
+  const stored = Util.loadCache<HotspotCache>(hotspotCacheFileName);
+  const cached = stored?.language === language ? stored.files : {};
+  const analyses: Record<string, FileAnalysis> = {};
+  const files: { student: string; filePath: string; analysis: FileAnalysis }[] = [];
+  let analyzed = 0;
+  for (const { student, relativePath, file } of submissions) {
+    const fileLanguage = languageOf(relativePath);
+    if (!fileLanguage) {
+      continue;
+    }
+    const filePath = path.join(index.root, student, ...relativePath.split("/"));
+    let analysis = analyses[file.hash] ?? cached[file.hash];
+    if (!analysis) {
+      try {
+        analysis = analyzeSource(await fs.promises.readFile(filePath, "utf-8"), fileLanguage);
+      } catch {
+        continue;
+      }
+      analyzed++;
+    }
+    analyses[file.hash] = analysis;
+    files.push({ student, filePath, analysis });
+  }
+  // Only the analyses of current files are kept.
+  await Util.saveCache(hotspotCacheFileName, { language, files: analyses });
+  logToFile(`Analyzed ${analyzed} of ${files.length} file(s) for hotspots`);
+
+  // The number of students whose files contain each fingerprint
+  const studentsWith = new Map<number, Set<string>>();
+  for (const { student, analysis } of files) {
+    for (const { hash } of analysis.fingerprints) {
+      let students = studentsWith.get(hash);
+      if (!students) {
+        students = new Set();
+        studentsWith.set(hash, students);
+      }
+      students.add(student);
+    }
+  }
+
+  const byStudent = new Map<string, HotspotNode[]>();
+  for (const { student, filePath, analysis } of files) {
+    const unique = uniqueRegions(analysis, (hash) => studentsWith.get(hash)?.size ?? 0);
+    const nodes = byStudent.get(student) ?? [];
+    for (const hotspot of rankHotspots([...analysis.hotspots, ...unique])) {
+      nodes.push({ filePath, hotspot });
+    }
+    byStudent.set(student, nodes);
+  }
+  return Array.from(byStudent.entries())
+    .map(([student, nodes]) => ({
+      student,
+      hotspots: nodes
+        .sort((a, b) => b.hotspot.score - a.hotspot.score)
+        .slice(0, maxHotspotsPerStudent),
+    }))
+    .filter((node) => node.hotspots.length > 0)
+    .sort((a, b) => a.student.localeCompare(b.student));
+}
+
+// Open the hotspot's file with the hotspot selected.
+export async function revealHotspot({ filePath, hotspot }: HotspotNode) {
+  const document = await vscode.workspace.openTextDocument(filePath);
+  const editor = await vscode.window.showTextDocument(document, { preview: false });
+  const range = new vscode.Range(
+    hotspot.startLine,
+    hotspot.startCharacter,
+    hotspot.endLine,
+    hotspot.endCharacter
+  );
+  editor.selection = new vscode.Selection(range.start, range.end);
+  editor.revealRange(range, vscode.TextEditorRevealType.InCenterIfOutsideViewport);
+  return editor;
+}
+
+export const suggestHotspots = tracedCommand(
+  "gvqlc.suggestHotspots",
+  async () => {
+    if (!Util.loadPersistedData()) {
+      return;
+    }
+    const students = await vscode.window.withProgress(
+      { location: vscode.ProgressLocation.Window, title: "gvQLC: Finding hotspots" },
+      () => traced("analyze", analyzeSubmissions)
+    );
+    if (students.length === 0) {
+      vscode.window.showInformationMessage("No hotspots found in the submissions.");
+      return;
+    }
+    hotspotTree().setStudents(students);
+    await vscode.commands.executeCommand("setContext", "gvqlc.hotspotsAvailable", true);
+    await vscode.commands.executeCommand("gvqlc.hotspots.focus");
+  }
+);
+
+// Select the hotspot and open the Add Quiz Question panel for it.
+export async function createQuestionFromHotspot(node: HotspotNode) {
+  await revealHotspot(node);
+  await vscode.commands.executeCommand("gvqlc.addQuizQuestion");
+}
@@ -11,10 +11,10 @@ import * as vscode from "vscode";
 import * as fs from "fs";
 import * as path from 'path';
 
-import { configFileName } from "./sharedConstants";
+import { configFileName, exportFolderName } from "./sharedConstants";
 import { ConfigData } from "./types";
 import * as gvQLC from "./gvQLC";
-import { logToFile } from './fileLogger';
+import { logToFile, log } from './fileLogger';
 
 const defaultConfig : ConfigData = {
     submissionRoot: '.',
@@ -25,6 +25,12 @@ const defaultConfig : ConfigData = {
     pl_question_root: "PersonalQuiz",
     pl_assessment_root: "courseInstances/TemplateCourseInstance/assessments",
     pl_quiz_folder: "qlcQuiz0",
+    pl_instructor_page_size: 0,
+    pl_include_files: [],
+    pl_archive: "",
+    pl_code_files: "inline",
+    export_formats: [],
+    export_root: exportFolderName,
     set: "Custom Quiz",
     number: "0",
     points_per_question: 10,
@@ -91,8 +97,8 @@ export async function createConfigFile(
   try {
     fs.writeFileSync(configPath, JSON.stringify(defaultConfig, null, 2));
   } catch (err) {
-    logToFile(`Writing of config file ${path.join(configPath)} failed:`);
-    logToFile(err);
+    log.error(`Writing of config file ${path.join(configPath)} failed:`);
+    log.error(err);
     throw err;
   }
 
@@ -102,7 +108,7 @@ export async function createConfigFile(
     vscode.window.showInformationMessage(`Config file created: ${configPath}`);
   }
   logToFile('Creation of config file successful');
-  logToFile(defaultConfig);
+  log.debug(defaultConfig);
   return defaultConfig;
 }
 
@@ -0,0 +1,28 @@
+/************************************************************************************
+ *
+ * exporterRegistry.ts
+ *
+ * The exporters that can be selected with the config's export_formats.
+ * To add a format, implement QuizExporter and list it here.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { QuizExporter } from "../quizExport";
+import { qtiExporter } from "./qtiExporter";
+import { moodleExporter } from "./moodleExporter";
+
+const exporters: Record<string, QuizExporter> = Object.fromEntries(
+  [qtiExporter, moodleExporter].map((exporter) => [exporter.format, exporter])
+);
+
+export function exporterFor(format: string): QuizExporter | undefined {
+  return exporters[format.toLowerCase()];
+}
+
+export function exporterFormats(): string[] {
+  return Object.keys(exporters);
+}
@@ -0,0 +1,63 @@
+/************************************************************************************
+ *
+ * moodleExporter.ts
+ *
+ * Export a quiz as a single Moodle XML file. Each student's questions are
+ * placed in their own question bank category and exported as essay questions.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { QuizExporter, QuizIR, escapeXml, itemHTML } from "../quizExport";
+import { OutputSink } from "../outputSink";
+
+// "]]>" can't appear inside a CDATA section, so split it across two sections.
+function cdata(str: string) {
+  return `<![CDATA[${str.replace(/]]>/g, "]]]]><![CDATA[>")}]]>`;
+}
+
+function* moodleXML(quiz: QuizIR) {
+  yield `<?xml version="1.0" encoding="UTF-8"?>
+<quiz>
+`;
+  for (const studentQuiz of quiz.students) {
+    yield `  <question type="category">
+    <category><text>${escapeXml(`$course$/${quiz.title}/${studentQuiz.student}`)}</text></category>
+  </question>
+`;
+    for (const item of studentQuiz.items) {
+      yield `  <question type="essay">
+    <name><text>${escapeXml(`${quiz.title} ${studentQuiz.student} Q${item.number}`)}</text></name>
+    <questiontext format="html">
+      <text>${cdata(itemHTML(item))}</text>
+    </questiontext>
+    <generalfeedback format="html"><text></text></generalfeedback>
+    <defaultgrade>${quiz.pointsPerQuestion}</defaultgrade>
+    <penalty>0</penalty>
+    <hidden>0</hidden>
+    <idnumber>${escapeXml(item.label)}</idnumber>
+    <responseformat>editor</responseformat>
+    <responserequired>1</responserequired>
+    <responsefieldlines>15</responsefieldlines>
+    <attachments>0</attachments>
+    <attachmentsrequired>0</attachmentsrequired>
+    <graderinfo format="html"><text></text></graderinfo>
+    <responsetemplate format="html"><text></text></responsetemplate>
+    <tags><tag><text>${escapeXml(quiz.topic)}</text></tag></tags>
+  </question>
+`;
+    }
+  }
+  yield `</quiz>
+`;
+}
+
+export const moodleExporter: QuizExporter = {
+  format: "moodle",
+  async export(quiz: QuizIR, sink: OutputSink) {
+    await sink.writeFile("quiz.moodle.xml", moodleXML(quiz));
+  },
+};
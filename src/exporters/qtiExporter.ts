@@ -0,0 +1,123 @@
+/************************************************************************************
+ *
+ * qtiExporter.ts
+ *
+ * Export a quiz as an IMS QTI 2.1 content package: one essay-style
+ * assessmentItem per question, one assessmentTest per student, and an
+ * imsmanifest.xml describing them all.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { QuizExporter, QuizIR, StudentQuiz, escapeXml, itemHTML } from "../quizExport";
+import { OutputSink } from "../outputSink";
+
+const qtiNamespace = `xmlns="http://www.imsglobal.org/xsd/imsqti_v2p1"
+  xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+  xsi:schemaLocation="http://www.imsglobal.org/xsd/imsqti_v2p1 http://www.imsglobal.org/xsd/qti/qtiv2p1/imsqti_v2p1.xsd"`;
+
+// QTI identifiers must be valid XML names.
+function identifier(...parts: string[]) {
+  return parts.join("-").replace(/[^A-Za-z0-9_.-]/g, "_");
+}
+
+function itemPath(student: string, num: number) {
+  return `items/${identifier(student)}/question${num}.xml`;
+}
+
+function testPath(student: string) {
+  return `tests/${identifier(student)}.xml`;
+}
+
+function* itemXML(quiz: QuizIR, studentQuiz: StudentQuiz, index: number) {
+  const item = studentQuiz.items[index];
+  yield `<?xml version="1.0" encoding="UTF-8"?>
+<assessmentItem ${qtiNamespace}
+  identifier="${identifier("item", studentQuiz.student, String(item.number))}"
+  title="${escapeXml(`${quiz.title} Q${item.number}`)}" adaptive="false" timeDependent="false">
+  <responseDeclaration identifier="RESPONSE" cardinality="single" baseType="string"/>
+  <outcomeDeclaration identifier="SCORE" cardinality="single" baseType="float" normalMaximum="${quiz.pointsPerQuestion}"/>
+  <itemBody>
+    <div>
+${itemHTML(item)}
+    </div>
+    <extendedTextInteraction responseIdentifier="RESPONSE"/>
+  </itemBody>
+</assessmentItem>
+`;
+}
+
+function* testXML(quiz: QuizIR, studentQuiz: StudentQuiz) {
+  yield `<?xml version="1.0" encoding="UTF-8"?>
+<assessmentTest ${qtiNamespace}
+  identifier="${identifier("test", studentQuiz.student)}"
+  title="${escapeXml(`${quiz.title} (${studentQuiz.student})`)}">
+  <testPart identifier="part1" navigationMode="nonlinear" submissionMode="simultaneous">
+    <assessmentSection identifier="section1" title="${escapeXml(quiz.topic)}" visible="true">
+`;
+  for (const item of studentQuiz.items) {
+    // Tests live in tests/, so item references are relative to that folder.
+    yield `      <assessmentItemRef identifier="${identifier("item", studentQuiz.student, String(item.number))}" href="../${itemPath(studentQuiz.student, item.number)}"/>
+`;
+  }
+  yield `    </assessmentSection>
+  </testPart>
+</assessmentTest>
+`;
+}
+
+function* manifestXML(quiz: QuizIR) {
+  yield `<?xml version="1.0" encoding="UTF-8"?>
+<manifest xmlns="http://www.imsglobal.org/xsd/imscp_v1p1"
+  xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+  xsi:schemaLocation="http://www.imsglobal.org/xsd/imscp_v1p1 http://www.imsglobal.org/xsd/qti/qtiv2p1/qtiv2p1_imscpv1p2_v1p0.xsd"
+  identifier="${identifier("manifest", quiz.title)}">
+  <metadata>
+    <schema>QTIv2.1 Package</schema>
+    <schemaversion>1.0.0</schemaversion>
+  </metadata>
+  <organizations/>
+  <resources>
+`;
+  for (const studentQuiz of quiz.students) {
+    const testId = identifier("test", studentQuiz.student);
+    yield `    <resource identifier="${testId}" type="imsqti_test_xmlv2p1" href="${testPath(studentQuiz.student)}">
+      <file href="${testPath(studentQuiz.student)}"/>
+`;
+    for (const item of studentQuiz.items) {
+      yield `      <dependency identifierref="${identifier("item", studentQuiz.student, String(item.number))}"/>
+`;
+    }
+    yield `    </resource>
+`;
+    for (const item of studentQuiz.items) {
+      const href = itemPath(studentQuiz.student, item.number);
+      yield `    <resource identifier="${identifier("item", studentQuiz.student, String(item.number))}" type="imsqti_item_xmlv2p1" href="${href}">
+      <file href="${href}"/>
+    </resource>
+`;
+    }
+  }
+  yield `  </resources>
+</manifest>
+`;
+}
+
+export const qtiExporter: QuizExporter = {
+  format: "qti",
+  async export(quiz: QuizIR, sink: OutputSink) {
+    for (const studentQuiz of quiz.students) {
+      for (const [index, item] of studentQuiz.items.entries()) {
+        await sink.writeFile(
+          itemPath(studentQuiz.student, item.number),
+          itemXML(quiz, studentQuiz, index)
+        );
+      }
+      await sink.writeFile(testPath(studentQuiz.student), testXML(quiz, studentQuiz));
+    }
+    await sink.writeFile("imsmanifest.xml", manifestXML(quiz));
+  },
+};
@@ -1,20 +1,58 @@
 // The module 'vscode' contains the VS Code extensibility API
 // Import the module and reference it with the alias vscode in your code below
 import * as vscode from "vscode";
-import { setContext } from "./gvQLC";
+import { performance } from "perf_hooks";
 
-import { viewQuizQuestionsCommand } from "./commands/viewQuizQuestions";
-import { createConfigFile } from "./configFile";
-import { addQuizQuestionCommand } from "./commands/addQuizQuestion";
-import { generatePLQuizCommand } from "./commands/generatePLQuiz";
+import { logToFile, flushLog } from "./fileLogger";
+
+type CommandHandler = (...args: any[]) => unknown;
+
+// The handler for each command. Activation registers only a stub for each
+// command; the module implementing the command (and everything it imports,
+// such as Mustache and the view code) is loaded the first time the command
+// is run.
+const commandHandlers: Record<string, () => CommandHandler> = {
+  "gvqlc.addQuizQuestion": () =>
+    require("./commands/addQuizQuestion").addQuizQuestion,
+  "gvqlc.viewQuizQuestions": () =>
+    require("./commands/viewQuizQuestions").viewQuizQuestions,
+  "gvqlc.createConfig": () => () =>
+    // TODO: Test what happens if this is run without a workspace open.
+    require("./configFile").createConfigFile(),
+  "gvqlc.generatePLQuiz": () =>
+    require("./commands/generatePLQuiz").generatePLQuiz,
+  "gvqlc.generatePLQuizForStudents": () =>
+    require("./commands/generatePLQuiz").generatePLQuizForStudents,
+  "gvqlc.previewPLQuiz": () =>
+    require("./commands/generatePLQuiz").previewPLQuiz,
+  "gvqlc.applyQuestionToSimilarSnippets": () =>
+    require("./commands/applyQuestionToSimilar").applyQuestionToSimilarSnippets,
+  "gvqlc.snapSelection": () =>
+    require("./commands/snapSelection").snapEditorSelection,
+  "gvqlc.suggestHotspots": () =>
+    require("./commands/suggestHotspots").suggestHotspots,
+  "gvqlc.revealHotspot": () =>
+    require("./commands/suggestHotspots").revealHotspot,
+  "gvqlc.createQuestionFromHotspot": () =>
+    require("./commands/suggestHotspots").createQuestionFromHotspot,
+  "gvqlc.showPerformanceReport": () =>
+    require("./commands/performanceReport").showPerformanceReport,
+  "gvqlc.exportPerformanceTrace": () =>
+    require("./commands/performanceReport").exportPerformanceTrace,
+  "gvqlc.showMemoryReport": () =>
+    require("./commands/memoryReport").showMemoryReport,
+};
+
+// Wait this long after activation before warming up (see warmup.ts).
+const warmupDelayMs = 2000;
 
 // This method is called when your extension is activated
 // Your extension is activated the very first time the command is executed
 export function activate(context: vscode.ExtensionContext) {
+  const start = performance.now();
   // Use the console to output diagnostic information (console.log) and errors (console.error)
   // This line of code will only be executed once when your extension is activated
   console.log('Congratulations, your extension "gvqlc" is now active!');
-  setContext(context);
 
   /* 
 	Object.entries(process.env).forEach(([key, value]) => {
@@ -22,21 +60,40 @@ export function activate(context: vscode.ExtensionContext) {
 	});
 	*/
 
-  const createConfigCommand = vscode.commands.registerCommand(
-    "gvQLC.createConfig",
-    async () => {
-      // TODO: Test what happens if this is run without a workspace open.
-      await createConfigFile();
+  // The rest of the extension is loaded when the first command is run.
+  let initialized = false;
+  const initialize = () => {
+    if (!initialized) {
+      require("./gvQLC").setContext(context);
+      initialized = true;
     }
-  );
-
-  context.subscriptions.push(
-    viewQuizQuestionsCommand,
-    addQuizQuestionCommand,
-    createConfigCommand,
-    generatePLQuizCommand
-  );
+  };
+
+  for (const [command, loadHandler] of Object.entries(commandHandlers)) {
+    let handler: CommandHandler | undefined;
+    context.subscriptions.push(
+      vscode.commands.registerCommand(command, (...args: unknown[]) => {
+        initialize();
+        handler ??= loadHandler();
+        return handler(...args);
+      })
+    );
+  }
+
+  // Optionally, load what the first command will need once the editor
+  // has finished starting up.
+  if (vscode.workspace.getConfiguration("gvqlc").get<boolean>("warmup", false)) {
+    const timer = setTimeout(() => {
+      initialize();
+      require("./warmup").warmUp();
+    }, warmupDelayMs);
+    context.subscriptions.push({ dispose: () => clearTimeout(timer) });
+  }
+
+  logToFile(`Activated in ${(performance.now() - start).toFixed(2)} ms`);
 }
 
 // This method is called when your extension is deactivated
-export function deactivate() {}
+export function deactivate() {
+  return flushLog();
+}
@@ -5,6 +5,14 @@
  * Log to a file (because seeing the output of console.log statements in the extension
  * during automated tests is difficult).
  *
+ * Messages below the current level (GVQLC_LOG_LEVEL, or setLogLevel) cost
+ * almost nothing: a message may be given as a function, which is only called
+ * (and its result only formatted) when the message will be logged. Logged
+ * lines are appended to the file in batches, asynchronously, so callers
+ * never wait for the disk. When the file grows
+ * past maxLogBytes, it is rotated (gvQLC_log.txt -> gvQLC_log.1.txt -> ...).
+ * The most recent lines are also kept in memory, in a ring buffer.
+ *
  * This code is also used by the tests, so don't include any packages that require
  * the vscode framework (e.g., vscode)
  *
@@ -15,35 +23,202 @@ import * as path from 'path';
 import * as fs from 'fs';
 
 export const logFileName = path.join(require('os').tmpdir(), 'gvQLC_log.txt');
-export function logToFile(msg: unknown): void {
-  let output: string;
 
-  if (typeof msg === 'string'|| typeof msg === 'number') {
-    output = String(msg);
-  } else {
-    try {
-      output = JSON.stringify(msg, null, 2); // pretty-print objects
-    } catch {
-      output = String(msg); // fallback if JSON.stringify fails (e.g., circular refs)
-    }
+export enum LogLevel {
+  DEBUG = 10,
+  INFO = 20,
+  WARN = 30,
+  ERROR = 40,
+  OFF = 100,
+}
+
+// A message, or a function that returns the message (so that building
+// it can be skipped when the message won't be logged).
+export type LogMessage = unknown | (() => unknown);
+
+// Keep this many of the most recent lines in memory (see recentLog).
+const recentCapacity = 1000;
+// Write as soon as this many lines are waiting ...
+const flushBatchSize = 512;
+// ... or after this long.
+const flushDelayMs = 200;
+// Rotate the log file when it would grow past this size ...
+const maxLogBytes = 4 * 1024 * 1024;
+// ... keeping this many old log files.
+const maxBackups = 3;
+
+// The most recent items (older items are overwritten).
+class RingBuffer<T> {
+  private readonly items: T[] = [];
+  private next = 0;
+
+  constructor(readonly capacity: number) {}
+
+  push(item: T) {
+    this.items[this.next] = item;
+    this.next = (this.next + 1) % this.capacity;
+  }
+
+  // Oldest first
+  toArray(): T[] {
+    return [...this.items.slice(this.next), ...this.items.slice(0, this.next)];
+  }
+}
+
+function levelFromName(name: string | undefined) {
+  switch (name?.toLowerCase()) {
+    case 'debug':
+      return LogLevel.DEBUG;
+    case 'warn':
+      return LogLevel.WARN;
+    case 'error':
+      return LogLevel.ERROR;
+    case 'off':
+      return LogLevel.OFF;
+    default:
+      return LogLevel.INFO;
+  }
+}
+
+let currentLevel = levelFromName(process.env.GVQLC_LOG_LEVEL);
+const recent = new RingBuffer<string>(recentCapacity);
+let pending: string[] = [];
+let flushTimer: NodeJS.Timeout | undefined;
+let flushing: Promise<void> = Promise.resolve();
+// Size of the log file (unknown until the first write)
+let logSize: number | undefined;
+
+export function setLogLevel(level: LogLevel) {
+  currentLevel = level;
+}
+
+export function isLogEnabled(level: LogLevel) {
+  return level >= currentLevel;
+}
+
+function format(msg: unknown): string {
+  if (typeof msg === 'string' || typeof msg === 'number') {
+    return String(msg);
+  }
+  if (msg instanceof Error) {
+    return msg.stack ?? String(msg);
+  }
+  try {
+    return JSON.stringify(msg) ?? String(msg);
+  } catch {
+    return String(msg); // fallback if JSON.stringify fails (e.g., circular refs)
   }
+}
+
+function takePending() {
+  const lines = pending;
+  pending = [];
+  return lines.length > 0 ? `${lines.join('\n')}\n` : '';
+}
 
-  fs.appendFileSync(logFileName, `${output}\n`);
+function backupName(n: number) {
+  const { dir, name, ext } = path.parse(logFileName);
+  return path.join(dir, `${name}.${n}${ext}`);
+}
+
+async function rotate() {
+  for (let n = maxBackups - 1; n >= 1; n--) {
+    await fs.promises.rename(backupName(n), backupName(n + 1)).catch(() => {});
+  }
+  await fs.promises.rename(logFileName, backupName(1)).catch(() => {});
+  logSize = 0;
+}
+
+async function write(text: string) {
+  if (logSize === undefined) {
+    logSize = await fs.promises.stat(logFileName).then((stats) => stats.size, () => 0);
+  }
+  const bytes = Buffer.byteLength(text);
+  if (logSize > 0 && logSize + bytes > maxLogBytes) {
+    await rotate();
+  }
+  await fs.promises.appendFile(logFileName, text);
+  logSize += bytes;
+}
+
+// Write everything logged so far. The returned promise resolves once it
+// is on disk.
+export function flushLog(): Promise<void> {
+  clearTimeout(flushTimer);
+  flushTimer = undefined;
+  // The lines are taken now, but written one batch at a time, in order.
+  const text = takePending();
+  if (!text) {
+    return flushing;
+  }
+  flushing = flushing.then(() => write(text)).catch((e) => {
+    console.error(`Unable to write to ${logFileName}: ${e}`);
+  });
+  return flushing;
+}
+
+function scheduleFlush() {
+  if (pending.length >= flushBatchSize) {
+    flushLog();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushLog, flushDelayMs);
+    // Don't keep the process alive just to write the log.
+    flushTimer.unref();
+  }
 }
 
 const logFlags = {
   logFileInitialized: false,
 };
 
+// Start each session's log with a banner (written with the first message,
+// rather than when this module is loaded).
 function initLogFile() {
+  logFlags.logFileInitialized = true;
   console.log(`*** The log file: ${logFileName}`);
   logToFile("**********************************************************");
   logToFile("**********************************************************");
   logToFile(new Date().toLocaleString());
   logToFile("\n");
-  logFlags.logFileInitialized = true;
 }
 
-if (!logFlags.logFileInitialized) {
-  initLogFile();
+export function logToFile(msg: LogMessage, level = LogLevel.INFO): void {
+  if (level < currentLevel) {
+    return;
+  }
+  if (!logFlags.logFileInitialized) {
+    initLogFile();
+  }
+  const output = format(typeof msg === 'function' ? msg() : msg);
+  const line = level === LogLevel.INFO ? output : `[${LogLevel[level].toLowerCase()}] ${output}`;
+  pending.push(line);
+  recent.push(line);
+  scheduleFlush();
 }
+
+// The most recently logged lines (whether or not they have been written yet)
+export function recentLog(): string[] {
+  return recent.toArray();
+}
+
+export const log = {
+  debug: (msg: LogMessage) => logToFile(msg, LogLevel.DEBUG),
+  info: (msg: LogMessage) => logToFile(msg, LogLevel.INFO),
+  warn: (msg: LogMessage) => logToFile(msg, LogLevel.WARN),
+  error: (msg: LogMessage) => logToFile(msg, LogLevel.ERROR),
+};
+
+// Whatever is still buffered when the process exits is written synchronously.
+// (Batches already handed to an asynchronous write are lost if the process
+// exits before the write completes, so call flushLog before exiting.)
+process.on('exit', () => {
+  const text = takePending();
+  if (text) {
+    try {
+      fs.appendFileSync(logFileName, text);
+    } catch {
+      // Nothing more can be done at this point.
+    }
+  }
+});
+
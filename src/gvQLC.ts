@@ -8,10 +8,18 @@
  * *********************************************************************************/
 
 import * as vscode from "vscode";
+import * as path from "path";
 
-import { PersonalizedQuestionsData, ConfigData } from "./types";
+import { ConfigData } from "./types";
 import { loadConfigData } from "./configFile";
 import { logToFile } from './fileLogger';
+import { quizQuestionsFileName, templateOverrideFolderName } from "./sharedConstants";
+import { TemplateRegistry } from "./templateRegistry";
+import { WorkerPool } from "./workerPool";
+import { QuestionStore } from "./questionStore";
+import { QuestionQueue } from "./questionQueue";
+import { registerMemoryReporter } from "./memoryReport";
+import * as Util from "./utilities";
 
 // Thoughts
 // * Store filenames relative to project root.
@@ -19,14 +27,21 @@ import { logToFile } from './fileLogger';
 
 // In-memory storage for comments and questions
 // TODO: Replace any[] with correct type
+const questions = new QuestionStore();
 export const state = {
   commentsData: [] as any[],
   questionsData: [] as any[],
-  personalizedQuestionsData: [] as PersonalizedQuestionsData[],
+  // Read questions here, but (once loaded) change them only through questionQueue.
+  questions,
+  questionQueue: new QuestionQueue(questions, (all) =>
+    Util.saveDataToFile(quizQuestionsFileName, all)
+  ),
   dataLoaded: false as any,
   modalErrorDisplayed: false as any,
 };
 
+registerMemoryReporter("Quiz questions", () => state.questions.memory());
+
 //
 // Extension Context
 //
@@ -54,16 +69,122 @@ export function workspaceRoot(): vscode.WorkspaceFolder {
 }
 
 export function setWorkspaceRoot(root: vscode.WorkspaceFolder) {
+  if (globalWorkspaceRoot?.uri.toString() !== root.uri.toString()) {
+    // The template overrides come from the workspace.
+    resetTemplates();
+  }
   globalWorkspaceRoot = root;
 }
 
+//
+// Templates
+//
+let templateRegistry = null as TemplateRegistry | null;
+let templateWatcher = null as vscode.FileSystemWatcher | null;
+
+function resetTemplates() {
+  templateWatcher?.dispose();
+  templateWatcher = null;
+  templateRegistry = null;
+}
+
+// The Mustache templates (built-in, plus any overrides in the workspace's
+// gvQLC.templates folder). Templates are parsed once and re-read only
+// when the corresponding override changes.
+export function templates(): TemplateRegistry {
+  if (!templateRegistry) {
+    const builtinFolder = path.join(context().extensionPath, "views");
+    if (!globalWorkspaceRoot) {
+      return new TemplateRegistry(builtinFolder);
+    }
+    const overrideFolder = vscode.Uri.joinPath(
+      globalWorkspaceRoot.uri,
+      templateOverrideFolderName
+    ).fsPath;
+    const registry = new TemplateRegistry(builtinFolder, overrideFolder);
+    const templateName = (uri: vscode.Uri) =>
+      path.relative(overrideFolder, uri.fsPath).split(path.sep).join("/");
+
+    templateWatcher = vscode.workspace.createFileSystemWatcher(
+      new vscode.RelativePattern(
+        globalWorkspaceRoot,
+        `${templateOverrideFolderName}/**`
+      )
+    );
+    templateWatcher.onDidCreate((uri) => registry.invalidate(templateName(uri)));
+    templateWatcher.onDidChange((uri) => registry.invalidate(templateName(uri)));
+    // A deleted folder may contain several templates.
+    templateWatcher.onDidDelete(() => registry.invalidate());
+    context().subscriptions.push(templateWatcher);
+    templateRegistry = registry;
+  }
+  return templateRegistry;
+}
+
 //
 // Config
 //
-let configData = null as ConfigData | null;
-export async function config(forceReload = false): Promise<ConfigData> {
-  if (!configData || forceReload) {
-    configData = await loadConfigData();
+let configPromise = null as Promise<ConfigData> | null;
+let configLoading = false;
+// A reload waiting for the load in progress to finish
+let configReload = null as Promise<ConfigData> | null;
+
+function loadConfig(): Promise<ConfigData> {
+  configLoading = true;
+  const promise = loadConfigData().finally(() => {
+    configLoading = false;
+  });
+  configPromise = promise;
+  promise.catch(() => {
+    // Try again next time.
+    if (configPromise === promise) {
+      configPromise = null;
+    }
+  });
+  return promise;
+}
+
+// Callers share a load that is already in progress, so the config file is
+// read (or created) only once. A caller that asks for a reload while a
+// load is in progress gets a new read that starts after it, since the
+// load in progress may have read the file before the caller's edit.
+// (Callers that ask while that read is waiting to start share it.)
+export function config(forceReload = false): Promise<ConfigData> {
+  if (!configPromise) {
+    return loadConfig();
+  }
+  if (!forceReload) {
+    return configPromise;
+  }
+  if (!configLoading) {
+    return loadConfig();
+  }
+  if (!configReload) {
+    const reload = configPromise
+      .catch(() => undefined)
+      .then(() => {
+        configReload = null;
+        return loadConfig();
+      });
+    configReload = reload;
+    configPromise = reload;
+  }
+  return configReload;
+}
+
+//
+// Worker Pool
+//
+let globalWorkerPool = null as WorkerPool | null;
+
+// The pool of worker threads used for jobs that touch every
+// student file. Started when first needed; closed when the
+// extension is deactivated.
+export function workerPool(): WorkerPool {
+  if (!globalWorkerPool) {
+    const pool = new WorkerPool();
+    context().subscriptions.push({ dispose: () => pool.close() });
+    globalWorkerPool = pool;
   }
-  return configData;
+  return globalWorkerPool;
 }
@@ -0,0 +1,61 @@
+/************************************************************************************
+ *
+ * hashWorker.ts
+ *
+ * The worker thread run by WorkerPool (see workerPool.ts): Hash the files in
+ * each task it is given, sending the results back in batches.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { parentPort, workerData } from "worker_threads";
+
+import { makeLimiter } from "./limiter";
+import { FileHash, hashOneFile } from "./submissionIndex";
+import { HashRequest, HashResponse, WorkerData } from "./workerPool";
+
+const { maxReads, batchSize } = workerData as WorkerData;
+const limit = makeLimiter(maxReads);
+const active = new Set<number>();
+const cancelled = new Set<number>();
+
+function send(response: HashResponse) {
+  parentPort!.postMessage(response);
+}
+
+async function hashTask(taskId: number, filePaths: string[]) {
+  active.add(taskId);
+  let batch: FileHash[] = [];
+  await Promise.all(
+    filePaths.map((filePath) =>
+      limit(async () => {
+        // Cancellation is checked between files.
+        if (cancelled.has(taskId)) {
+          return;
+        }
+        const result = await hashOneFile(filePath);
+        batch.push(result);
+        if (batch.length >= batchSize) {
+          send({ taskId, results: batch, done: false });
+          batch = [];
+        }
+      })
+    )
+  );
+  active.delete(taskId);
+  cancelled.delete(taskId);
+  send({ taskId, results: batch, done: true });
+}
+
+parentPort!.on("message", (request: HashRequest) => {
+  if ("cancel" in request) {
+    if (active.has(request.cancel)) {
+      cancelled.add(request.cancel);
+    }
+  } else {
+    hashTask(request.taskId, request.filePaths);
+  }
+});
@@ -0,0 +1,239 @@
+/************************************************************************************
+ *
+ * hotspots.ts
+ *
+ * Find the regions of a student's code most worth asking about
+ * ("hotspots"): unusual constructs (e.g., the walrus operator), deep
+ * nesting, long functions, and code that no other student wrote.
+ *
+ * analyzeSource looks at one file by itself, so its result can be cached
+ * by the file's content hash. uniqueRegions compares a file's fingerprints
+ * (see similarity.ts) with the rest of the cohort, which is cheap once
+ * every file's fingerprints are known.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { CodeStructure, analyzeStructure, snapToBlock } from "./codeStructure";
+import { Fingerprint, fingerprint } from "./similarity";
+
+export type Hotspot = {
+  kind: "construct" | "nesting" | "length" | "unique";
+  reason: string;
+  startLine: number;
+  startCharacter: number;
+  endLine: number;
+  endCharacter: number;
+  score: number;
+};
+
+export type FileAnalysis = {
+  hotspots: Hotspot[];
+  fingerprints: Fingerprint[];
+  structure: CodeStructure;
+};
+
+type Construct = { pattern: RegExp; reason: string; weight: number };
+
+const pythonConstructs: Construct[] = [
+  { pattern: /:=/, reason: "Assignment expression (walrus operator)", weight: 3 },
+  { pattern: /\byield\b/, reason: "Generator (yield)", weight: 3 },
+  { pattern: /\blambda\b/, reason: "Lambda expression", weight: 2 },
+  { pattern: /\[[^\]]*\bfor\b[^\]]*\bin\b/, reason: "List comprehension", weight: 2 },
+  { pattern: /\b(global|nonlocal)\b/, reason: "Global variable", weight: 2 },
+  { pattern: /\bexcept\s*:/, reason: "Bare except", weight: 2 },
+  { pattern: /=.*\bif\b.+\belse\b/, reason: "Conditional expression", weight: 1.5 },
+  { pattern: /^\s*@\w+/, reason: "Decorator", weight: 1.5 },
+];
+
+const cStyleConstructs: Construct[] = [
+  { pattern: /\?[^:?;]+:/, reason: "Conditional (?:) expression", weight: 1.5 },
+  { pattern: /->|=>/, reason: "Lambda expression", weight: 2 },
+  { pattern: /\bgoto\b/, reason: "goto", weight: 3 },
+  { pattern: /\b(do)\s*\{/, reason: "do/while loop", weight: 1.5 },
+  { pattern: /\bswitch\s*\(/, reason: "switch statement", weight: 1 },
+  { pattern: /\bcatch\s*\(\s*(Exception|Throwable|\.\.\.)\b/, reason: "Catch-all exception handler", weight: 2 },
+];
+
+// The file extensions for each supported value of the config's language.
+const languageExtensions: Record<string, string[]> = {
+  python: [".py"],
+  java: [".java"],
+  javascript: [".js", ".mjs", ".cjs"],
+  typescript: [".ts"],
+  c: [".c", ".h"],
+  cpp: [".cpp", ".cc", ".hpp", ".h"],
+  csharp: [".cs"],
+  go: [".go"],
+  kotlin: [".kt"],
+  ruby: [".rb"],
+  rust: [".rs"],
+};
+
+const functionPatterns: Record<string, RegExp> = {
+  python: /^\s*(async\s+)?def\s+\w+/,
+  ruby: /^\s*def\s+\w+/,
+};
+const cStyleFunction =
+  /^\s*(?!(if|for|while|switch|catch|else|return|new)\b)[\w<>[\],.*&\s]+\s+\*?\w+\s*\([^;]*\)\s*(\{|throws\b|$)/;
+
+// Nesting deeper than this is worth a question.
+const maxComfortableDepth = 3;
+// So are functions longer than this (in lines).
+const maxComfortableLength = 25;
+
+export function sourceExtensions(language: string) {
+  const normalized = language.toLowerCase();
+  return languageExtensions[normalized] ?? [`.${normalized}`];
+}
+
+// The supported language a file's extension suggests (if any).
+export function languageOfFile(filePath: string) {
+  const extension = filePath.slice(filePath.lastIndexOf(".")).toLowerCase();
+  return Object.keys(languageExtensions).find((language) =>
+    languageExtensions[language].includes(extension)
+  );
+}
+
+// Remove string literals and comments so they don't look like code.
+function codeOnly(line: string, language: string) {
+  const withoutStrings = line.replace(/"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'/g, '""');
+  const comment = language === "python" || language === "ruby" ? "#" : "//";
+  const index = withoutStrings.indexOf(comment);
+  return index < 0 ? withoutStrings : withoutStrings.slice(0, index);
+}
+
+export function analyzeSource(text: string, language: string): FileAnalysis {
+  const normalized = language.toLowerCase();
+  const lines = text.split(/\r?\n/).map((line) => codeOnly(line, normalized));
+  const structure = analyzeStructure(text);
+  const hotspots: Hotspot[] = [];
+  const blockAround = (
+    startLine: number,
+    endLine: number,
+    kind: Hotspot["kind"],
+    reason: string,
+    score: number
+  ) => hotspots.push({ kind, reason, score, ...snapToBlock(structure, startLine, endLine) });
+
+  // Unusual constructs
+  const constructs = normalized === "python" ? pythonConstructs : cStyleConstructs;
+  for (const [line, code] of lines.entries()) {
+    for (const construct of constructs) {
+      if (construct.pattern.test(code)) {
+        blockAround(line, line, "construct", construct.reason, construct.weight);
+      }
+    }
+  }
+
+  // Deep nesting: Report the block that holds each run of deeply nested lines.
+  const depths: number[] = [];
+  const open: number[] = [];
+  for (const [line, indent] of structure.indents.entries()) {
+    if (indent < 0) {
+      depths.push(open.length);
+      continue;
+    }
+    while (open.length > 0 && open[open.length - 1] >= indent) {
+      open.pop();
+    }
+    depths.push(open.length);
+    open.push(indent);
+  }
+  for (let line = 0; line < depths.length; line++) {
+    if (depths[line] <= maxComfortableDepth || structure.indents[line] < 0) {
+      continue;
+    }
+    let header = line;
+    while (header > 0 && (depths[header] > maxComfortableDepth || structure.indents[header] < 0)) {
+      header--;
+    }
+    const block = snapToBlock(structure, header, header);
+    const deepest = Math.max(...depths.slice(block.startLine, block.endLine + 1));
+    hotspots.push({
+      kind: "nesting",
+      reason: `Nested ${deepest} levels deep`,
+      score: deepest - maxComfortableDepth + 1,
+      ...block,
+    });
+    line = block.endLine;
+  }
+
+  // Long functions
+  const functionPattern = functionPatterns[normalized] ?? cStyleFunction;
+  for (const [line, code] of lines.entries()) {
+    if (!functionPattern.test(code)) {
+      continue;
+    }
+    const length = structure.blockEnds[line] - line + 1;
+    if (length > maxComfortableLength) {
+      blockAround(line, line, "length", `${length}-line function`, length / maxComfortableLength);
+    }
+  }
+
+  return { hotspots, fingerprints: fingerprint(text), structure };
+}
+
+// Regions (of at least minLines lines) made up of fingerprints that no
+// other student's files contain. studentsWith gives the number of students
+// whose files contain a fingerprint.
+export function uniqueRegions(
+  { fingerprints, structure }: FileAnalysis,
+  studentsWith: (hash: number) => number,
+  minLines = 3
+): Hotspot[] {
+  const regions: Hotspot[] = [];
+  const sorted = [...fingerprints].sort((a, b) => a.startLine - b.startLine);
+  let start: Fingerprint | undefined;
+  let endLine = -1;
+  const finish = () => {
+    if (start && endLine - start.startLine + 1 >= minLines) {
+      const length = endLine - start.startLine + 1;
+      regions.push({
+        kind: "unique",
+        reason: `${length} lines unlike any other submission`,
+        startLine: start.startLine,
+        startCharacter: Math.max(0, structure.indents[start.startLine]),
+        endLine,
+        endCharacter: structure.lineLengths[endLine],
+        score: Math.min(4, length / 5),
+      });
+    }
+    start = undefined;
+  };
+  for (const fp of sorted) {
+    if (studentsWith(fp.hash) > 1) {
+      finish();
+    } else if (start && fp.startLine <= endLine + 1) {
+      endLine = Math.max(endLine, fp.endLine);
+    } else {
+      finish();
+      start = fp;
+      endLine = fp.endLine;
+    }
+  }
+  finish();
+  return regions;
+}
+
+// Combine hotspots that cover the same lines (adding their scores), and
+// sort them from most to least interesting.
+export function rankHotspots(hotspots: Hotspot[]): Hotspot[] {
+  const merged = new Map<string, Hotspot>();
+  for (const hotspot of hotspots) {
+    const key = `${hotspot.startLine}-${hotspot.endLine}`;
+    const existing = merged.get(key);
+    if (!existing) {
+      merged.set(key, { ...hotspot });
+    } else if (!existing.reason.split("; ").includes(hotspot.reason)) {
+      existing.reason += `; ${hotspot.reason}`;
+      existing.score += hotspot.score;
+    }
+  }
+  return Array.from(merged.values()).sort(
+    (a, b) => b.score - a.score || a.startLine - b.startLine
+  );
+}
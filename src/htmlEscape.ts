@@ -0,0 +1,20 @@
+/************************************************************************************
+ *
+ * htmlEscape.ts
+ *
+ * HTML escaping helpers.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Benedict Osei Sefa and Zachary Kurmas
+ * *********************************************************************************/
+
+export function escapeHtmlAttr(str: string) {
+  return String(str)
+    .replace(/&/g, "&amp;") // must go first
+    .replace(/"/g, "&quot;") // double quotes
+    .replace(/'/g, "&#39;") // single quotes
+    .replace(/</g, "&lt;") // optional
+    .replace(/>/g, "&gt;"); // optional
+};
@@ -0,0 +1,38 @@
+/************************************************************************************
+ *
+ * limiter.ts
+ *
+ * Limit the number of asynchronous tasks (typically file system operations)
+ * that are in flight at once.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+export type Limiter = <T>(task: () => Promise<T>) => Promise<T>;
+
+export function makeLimiter(max: number): Limiter {
+  let active = 0;
+  const waiting: (() => void)[] = [];
+  return async function limit<T>(task: () => Promise<T>): Promise<T> {
+    if (active >= max) {
+      // The task that finishes first hands its slot straight to this one
+      // (so that a new caller can't take the slot in between).
+      await new Promise<void>((resolve) => waiting.push(resolve));
+    } else {
+      active++;
+    }
+    try {
+      return await task();
+    } finally {
+      const next = waiting.shift();
+      if (next) {
+        next();
+      } else {
+        active--;
+      }
+    }
+  };
+}
@@ -0,0 +1,94 @@
+/************************************************************************************
+ *
+ * memoryReport.ts
+ *
+ * Estimate how much memory the extension's data structures use.
+ *
+ * Each module that holds onto a significant amount of data registers a
+ * reporter (registerMemoryReporter), which is called only when a report is
+ * requested. Modules that have not been loaded yet simply don't appear in
+ * the report. The sizes are estimates (based on typical V8 object sizes),
+ * meant for comparing structures, not for exact accounting.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+export type MemoryEntry = {
+  structure: string;
+  // Number of items (strings, questions, files, ...) held
+  items: number;
+  // Estimated size in bytes
+  bytes: number;
+};
+
+export type MemoryReporter = () => MemoryEntry[];
+
+// Approximate overheads of V8 objects (64-bit, pointer compression)
+export const objectHeaderBytes = 12;
+export const fieldBytes = 4;
+// A key and value in a Map (including the hash table's share)
+export const mapEntryBytes = 28;
+
+const reporters = new Map<string, MemoryReporter>();
+
+// Register (or replace) the named group's reporter.
+export function registerMemoryReporter(group: string, reporter: MemoryReporter) {
+  reporters.set(group, reporter);
+}
+
+// Strings with only Latin-1 characters are stored one byte per character.
+export function stringBytes(str: string) {
+  let oneByte = true;
+  for (let i = 0; i < str.length && oneByte; i++) {
+    oneByte = str.charCodeAt(i) < 256;
+  }
+  return objectHeaderBytes + 4 + (oneByte ? str.length : 2 * str.length);
+}
+
+export function memoryReport(): { group: string; entries: MemoryEntry[] }[] {
+  return Array.from(reporters, ([group, reporter]) => ({
+    group,
+    entries: reporter(),
+  }));
+}
+
+function formatBytes(bytes: number) {
+  if (bytes < 1024) {
+    return `${bytes} B`;
+  } else if (bytes < 1024 * 1024) {
+    return `${(bytes / 1024).toFixed(1)} KiB`;
+  }
+  return `${(bytes / (1024 * 1024)).toFixed(1)} MiB`;
+}
+
+// The report as a Markdown document.
+export function describeMemory(): string {
+  const lines = ["# gvQLC Memory Report", ""];
+  let total = 0;
+  for (const { group, entries } of memoryReport()) {
+    lines.push(`## ${group}`, "", "| structure | items | size |", "| --- | ---: | ---: |");
+    for (const { structure, items, bytes } of entries) {
+      lines.push(`| ${structure} | ${items} | ${formatBytes(bytes)} |`);
+      total += bytes;
+    }
+    lines.push("");
+  }
+  const usage = process.memoryUsage();
+  lines.push(
+    "## Process",
+    "",
+    `Estimated total of the structures above: ${formatBytes(total)}`,
+    "",
+    "| | size |",
+    "| --- | ---: |",
+    `| heap used | ${formatBytes(usage.heapUsed)} |`,
+    `| heap total | ${formatBytes(usage.heapTotal)} |`,
+    `| external | ${formatBytes(usage.external)} |`,
+    `| resident set | ${formatBytes(usage.rss)} |`,
+    ""
+  );
+  return lines.join("\n");
+}
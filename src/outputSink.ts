@@ -0,0 +1,45 @@
+/************************************************************************************
+ *
+ * outputSink.ts
+ *
+ * Destinations for generated files. Generators write files through an
+ * OutputSink using '/'-separated paths relative to the sink's root, so the
+ * same generator can write into a folder or (potentially) somewhere else.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+
+import { writeChunks } from "./streamWriter";
+
+export interface OutputSink {
+  // Large content may be given as an iterable of chunks so that it can
+  // be streamed rather than held in memory.
+  writeFile(relativePath: string, content: string | Iterable<string>): Promise<void>;
+  // Called once all files have been written.
+  close(): Promise<void>;
+}
+
+export class FolderSink implements OutputSink {
+  readonly written: string[] = [];
+
+  constructor(readonly root: string) {}
+
+  async writeFile(relativePath: string, content: string | Iterable<string>) {
+    const filePath = path.join(this.root, ...relativePath.split("/"));
+    await fs.promises.mkdir(path.dirname(filePath), { recursive: true });
+    if (typeof content === "string") {
+      await fs.promises.writeFile(filePath, content);
+    } else {
+      await writeChunks(filePath, content);
+    }
+    this.written.push(filePath);
+  }
+
+  async close() {}
+}
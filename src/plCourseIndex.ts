@@ -0,0 +1,251 @@
+/************************************************************************************
+ *
+ * plCourseIndex.ts
+ *
+ * An index of the questions and assessments that already exist in a
+ * PrairieLearn course, so that quiz generation can reuse existing UUIDs and
+ * detect collisions with content it did not create.
+ *
+ * The scan of questions/ and courseInstances/<instance>/assessments/ runs in
+ * parallel. The index doubles as a cache: Directories whose modification time
+ * has not changed are not re-listed, and info files whose size and modification
+ * time have not changed are not re-read.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+
+import { makeLimiter } from "./limiter";
+
+export type PLCourseEntry = {
+  kind: "question" | "assessment";
+  // The id PL uses to refer to the question or assessment
+  // (e.g., gvQLCQuiz/regression1/jim/question1)
+  id: string;
+  uuid?: string;
+  mtimeMs: number;
+  size: number;
+};
+
+type DirectoryListing = {
+  mtimeMs: number;
+  subdirectories: string[];
+  hasInfoFile: boolean;
+};
+
+export type PLCourseIndex = {
+  plRoot: string;
+  // Keyed by the path of the info file relative to plRoot ('/' separated).
+  entries: Record<string, PLCourseEntry>;
+  // Keyed by the path of the directory relative to plRoot ('/' separated).
+  directories: Record<string, DirectoryListing>;
+};
+
+export type PLCollision = {
+  kind: "uuid" | "folder";
+  path: string;
+  message: string;
+};
+
+// Maximum number of file system operations in flight at once.
+const maxConcurrency = 32;
+
+// The uuid in an info file's content (if it has one).
+export function readUuid(content: string): string | undefined {
+  try {
+    const uuid = JSON.parse(content).uuid;
+    return typeof uuid === "string" ? uuid : undefined;
+  } catch {
+    return undefined;
+  }
+}
+
+export function emptyPLCourseIndex(plRoot: string): PLCourseIndex {
+  return { plRoot, entries: {}, directories: {} };
+}
+
+// Scan the course at plRoot. If previous is an index of the same course, only
+// the parts of the course that have changed since are re-read.
+export async function scanPLCourse(
+  plRoot: string,
+  previous?: PLCourseIndex
+): Promise<PLCourseIndex> {
+  const cache =
+    previous && previous.plRoot === plRoot
+      ? previous
+      : emptyPLCourseIndex(plRoot);
+  const index = emptyPLCourseIndex(plRoot);
+  const limit = makeLimiter(maxConcurrency);
+  const absolute = (relative: string) =>
+    path.join(plRoot, ...relative.split("/"));
+
+  async function indexInfoFile(
+    relative: string,
+    kind: PLCourseEntry["kind"],
+    id: string
+  ) {
+    const stats = await limit(() => fs.promises.stat(absolute(relative)));
+    const cached = cache.entries[relative];
+    if (
+      cached &&
+      cached.kind === kind &&
+      cached.mtimeMs === stats.mtimeMs &&
+      cached.size === stats.size
+    ) {
+      index.entries[relative] = { ...cached, id };
+      return;
+    }
+    const content = await limit(() =>
+      fs.promises.readFile(absolute(relative), "utf8")
+    );
+    index.entries[relative] = {
+      kind,
+      id,
+      uuid: readUuid(content),
+      mtimeMs: stats.mtimeMs,
+      size: stats.size,
+    };
+  }
+
+  async function walk(
+    relative: string,
+    kind: PLCourseEntry["kind"],
+    infoFileName: string,
+    id: string
+  ): Promise<void> {
+    let stats: fs.Stats;
+    try {
+      stats = await limit(() => fs.promises.stat(absolute(relative)));
+    } catch {
+      return;
+    }
+    if (!stats.isDirectory()) {
+      return;
+    }
+
+    let listing = cache.directories[relative];
+    if (!listing || listing.mtimeMs !== stats.mtimeMs) {
+      const dirents = await limit(() =>
+        fs.promises.readdir(absolute(relative), { withFileTypes: true })
+      );
+      listing = {
+        mtimeMs: stats.mtimeMs,
+        subdirectories: dirents
+          .filter((d) => d.isDirectory() && !d.name.startsWith("."))
+          .map((d) => d.name)
+          .sort(),
+        hasInfoFile: dirents.some((d) => d.isFile() && d.name === infoFileName),
+      };
+    }
+    index.directories[relative] = listing;
+
+    // PL does not allow questions (or assessments) to be nested inside one
+    // another, so there is no need to look below a directory with an info file.
+    if (listing.hasInfoFile) {
+      await indexInfoFile(`${relative}/${infoFileName}`, kind, id);
+      return;
+    }
+    await Promise.all(
+      listing.subdirectories.map((name) =>
+        walk(
+          `${relative}/${name}`,
+          kind,
+          infoFileName,
+          id ? `${id}/${name}` : name
+        )
+      )
+    );
+  }
+
+  let courseInstances: string[] = [];
+  try {
+    courseInstances = (
+      await fs.promises.readdir(absolute("courseInstances"), {
+        withFileTypes: true,
+      })
+    )
+      .filter((d) => d.isDirectory() && !d.name.startsWith("."))
+      .map((d) => d.name);
+  } catch {
+    // A course without course instances has no assessments.
+  }
+
+  await Promise.all([
+    walk("questions", "question", "info.json", ""),
+    ...courseInstances.map((instance) =>
+      walk(
+        `courseInstances/${instance}/assessments`,
+        "assessment",
+        "infoAssessment.json",
+        ""
+      )
+    ),
+  ]);
+  return index;
+}
+
+// The UUID currently stored in the info file at filePath (if any).
+export function existingUuid(
+  index: PLCourseIndex,
+  filePath: string
+): string | undefined {
+  const relative = path
+    .relative(index.plRoot, filePath)
+    .split(path.sep)
+    .join("/");
+  return index.entries[relative]?.uuid;
+}
+
+// Look for problems with writing the given info files into the course:
+//   * "folder" collisions: An info file would overwrite one that exists but was
+//     not generated by gvQLC (i.e., is not among the owned entries).
+//   * "uuid" collisions: A UUID would duplicate one used elsewhere in the course.
+export function findCollisions(
+  index: PLCourseIndex,
+  files: readonly { path: string; uuid?: string }[],
+  owned: ReadonlySet<string>
+): PLCollision[] {
+  const pathsByUuid = new Map<string, string[]>();
+  for (const [relative, entry] of Object.entries(index.entries)) {
+    if (entry.uuid) {
+      pathsByUuid.set(entry.uuid, [
+        ...(pathsByUuid.get(entry.uuid) ?? []),
+        relative,
+      ]);
+    }
+  }
+
+  const collisions: PLCollision[] = [];
+  for (const file of files) {
+    if (file.uuid === undefined) {
+      continue;
+    }
+    const relative = path
+      .relative(index.plRoot, file.path)
+      .split(path.sep)
+      .join("/");
+    if (index.entries[relative] && !owned.has(relative)) {
+      collisions.push({
+        kind: "folder",
+        path: relative,
+        message: `${relative} already exists and was not generated by gvQLC`,
+      });
+    }
+    const others = (pathsByUuid.get(file.uuid) ?? []).filter(
+      (other) => other !== relative
+    );
+    if (others.length > 0) {
+      collisions.push({
+        kind: "uuid",
+        path: relative,
+        message: `UUID ${file.uuid} for ${relative} is already used by ${others.join(", ")}`,
+      });
+    }
+  }
+  return collisions;
+}
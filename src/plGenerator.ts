@@ -0,0 +1,839 @@
+/************************************************************************************
+ *
+ * plGenerator.ts
+ *
+ * Generation of PrairieLearn quizzes.
+ *
+ * Generation happens in three steps:
+ *   1. planPLQuiz builds (in memory) the list of directories and files the quiz
+ *      needs, plus the files left over from previous runs that should be pruned.
+ *   2. analyzePLPlan compares the plan against what already exists in the PL
+ *      course (using content hashes) to decide which files are new, which
+ *      change, and which are already up to date.
+ *   3. executePLPlan carries out the analyzed plan.
+ *
+ * Alternately, writePLPlanToSink writes every file in the plan (with paths
+ * relative to pl_root) to an OutputSink such as a zip or tar archive.
+ *
+ * describePLPlan renders an analyzed plan as a Markdown document so that
+ * changes to a production course can be previewed before they are made.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Benedict Osei Sefa and Zachary Kurmas
+ * *********************************************************************************/
+
+import * as path from "path";
+import * as fs from "fs";
+import { createHash, randomUUID } from "crypto";
+
+import { ConfigData, PersonalizedQuestionsData } from "./types";
+import { QuizIR, QuizItem, StudentQuiz } from "./quizExport";
+import { escapeHtmlAttr } from "./htmlEscape";
+import { writeChunks } from "./streamWriter";
+import { OutputSink } from "./outputSink";
+import { TemplateRegistry, builtinTemplates } from "./templateRegistry";
+import {
+  PLManifest,
+  manifestKey,
+  manifestEntry,
+  staleEntries,
+  pruneStaleFiles,
+} from "./plManifest";
+import { PLCollision, PLCourseIndex, findCollisions, readUuid } from "./plCourseIndex";
+
+export type PlannedFile = {
+  path: string;
+  // Small files are held as a string. Large files are produced on demand
+  // (possibly more than once) so they never need to be held in memory.
+  content: string | (() => Iterable<string>);
+  // The UUID embedded in the file (info.json and infoAssessment.json only).
+  uuid?: string;
+};
+
+export type PLPlan = {
+  plRoot: string;
+  questionsFolderPath: string;
+  assessmentFolderPath: string;
+  // Where code snippets shared by the whole quiz are written (pl_code_files: "course").
+  sharedFolderPath: string;
+  manifestKey: string;
+  directories: string[];
+  files: PlannedFile[];
+  // Manifest entries (relative to plRoot) emitted by the previous run.
+  previouslyEmitted: string[];
+  // Previously emitted entries for students outside the scope of this plan.
+  retained: string[];
+  // Previously emitted entries that are not part of this plan.
+  stale: string[];
+};
+
+export type FileAction = "create" | "overwrite" | "unchanged";
+
+export type AnalyzedFile = PlannedFile & {
+  action: FileAction;
+  oldUuid?: string;
+};
+
+export type PLPlanAnalysis = {
+  plan: PLPlan;
+  newDirectories: string[];
+  files: AnalyzedFile[];
+  // Stale entries that actually exist on disk.
+  prune: string[];
+  collisions: PLCollision[];
+};
+
+/////////////////////////////////////////////////////////////
+//
+// Content
+//
+/////////////////////////////////////////////////////////////
+
+// How the code in each question is delivered to PL (config.pl_code_files):
+//   * "inline": An escaped copy of the code is placed inside each pl-code element.
+//   * "question": The code is written to the question's clientFilesQuestion
+//      folder and referenced with pl-code's source-file-name.
+//   * "course": Each distinct snippet in the quiz is written once to
+//      serverFilesCourse and referenced from every question that shows it.
+export type PLCodeFileMode = "inline" | "question" | "course";
+
+function codeFileMode(value: unknown): PLCodeFileMode {
+  return value === "question" || value === "course" ? value : "inline";
+}
+
+// A code snippet written to its own file (values for pl-code's
+// source-file-name and directory attributes).
+type CodeFile = {
+  sourceFile: string;
+  directory: string;
+};
+
+const codeFileExtensions: Record<string, string> = {
+  python: "py",
+  java: "java",
+  javascript: "js",
+  typescript: "ts",
+  c: "c",
+  cpp: "cpp",
+  "c++": "cpp",
+  csharp: "cs",
+  go: "go",
+  kotlin: "kt",
+  ruby: "rb",
+  rust: "rs",
+};
+
+// Snippets are named by a hash of their content,
+// so identical snippets share a file.
+function snippetFileName(code: string, language: unknown) {
+  const hash = createHash("sha1").update(code).digest("hex").slice(0, 12);
+  const extension = codeFileExtensions[String(language).toLowerCase()] ?? "txt";
+  return `snippet-${hash}.${extension}`;
+}
+
+// The data used to render an item with the pl/question and
+// pl/combinedQuestion templates.
+function itemView(item: QuizItem, language: unknown, codeFile?: CodeFile) {
+  return {
+    number: item.number,
+    label: item.label,
+    text: item.text || "No question text provided",
+    language,
+    code: item.code && !codeFile ? escapeHtmlAttr(item.code) : "",
+    sourceFile: codeFile?.sourceFile ?? "",
+    directory: codeFile?.directory ?? "",
+  };
+}
+
+// Split the students into pages of (at most) pageSize students each.
+// A missing or non-positive pageSize places everybody on a single page.
+export function paginateStudents(
+  students: StudentQuiz[],
+  pageSize: unknown
+): StudentQuiz[][] {
+  const size = Number(pageSize);
+  if (!Number.isInteger(size) || size <= 0 || students.length <= size) {
+    return [students];
+  }
+  const pages: StudentQuiz[][] = [];
+  for (let i = 0; i < students.length; i += size) {
+    pages.push(students.slice(i, i + size));
+  }
+  return pages;
+}
+
+// Produce the instructor's combined question.html one piece at a time
+// so that it can be streamed to disk.
+export function* combinedQuestionChunks(
+  quiz: QuizIR,
+  students: StudentQuiz[],
+  templates: TemplateRegistry = builtinTemplates(),
+  codeFiles: ReadonlyMap<QuizItem, CodeFile> = new Map()
+): Generator<string> {
+  yield templates.render("pl/combinedHeader.mustache.html", {
+    title: quiz.title,
+  });
+
+  // Add each student's questions
+  for (const { student, items } of students) {
+    yield templates.render("pl/combinedStudent.mustache.html", { student });
+    for (const item of items) {
+      yield templates.render(
+        "pl/combinedQuestion.mustache.html",
+        itemView(item, quiz.language, codeFiles.get(item))
+      );
+    }
+  }
+}
+
+function jsonFile(
+  filePath: string,
+  data: { uuid: string; [key: string]: unknown }
+): PlannedFile {
+  return {
+    path: filePath,
+    content: JSON.stringify(data, null, 2),
+    uuid: data.uuid,
+  };
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Planning
+//
+/////////////////////////////////////////////////////////////
+
+// The namespace of gvQLC's name-based UUIDs
+const uuidNamespace = Buffer.from("c2e37913f9d94319a387434cadaf3214", "hex");
+
+// A name-based (version 5) UUID for name (e.g., the path of an info file
+// relative to pl_root).
+function nameUuid(name: string) {
+  const hash = createHash("sha1").update(uuidNamespace).update(name).digest();
+  hash[6] = (hash[6] & 0x0f) | 0x50;
+  hash[8] = (hash[8] & 0x3f) | 0x80;
+  const hex = hash.subarray(0, 16).toString("hex");
+  return [
+    hex.slice(0, 8),
+    hex.slice(8, 12),
+    hex.slice(12, 16),
+    hex.slice(16, 20),
+    hex.slice(20),
+  ].join("-");
+}
+
+export type PLPlanOptions = {
+  // The files emitted by previous runs (used to find stale files).
+  previousManifest?: PLManifest;
+  // The UUID of an existing info file (if any), so it can be reused.
+  existingUuid?: (filePath: string) => string | undefined;
+  // Plan the same files each time an unchanged quiz is planned: Info files
+  // that don't have a UUID yet get one derived from their path (instead of
+  // a random one), and the instructor's access is based on the quiz's
+  // startDate (instead of the current time). (Used when writing an archive,
+  // for which there is usually no local copy of the course to reuse UUIDs from.)
+  reproducible?: boolean;
+  // When given, only these students' questions and assessments are
+  // (re)generated. Other students' output is left as is.
+  onlyStudents?: ReadonlySet<string>;
+  // The templates used to render question.html files.
+  // (Defaults to the built-in templates.)
+  templates?: TemplateRegistry;
+};
+
+// The first stage of generation: Drop the questions that are excluded
+// from the quiz and, if includeFiles lists any files, the questions
+// about all other files. (An entry in includeFiles matches a question if
+// it is the question's file path or a trailing part of it, e.g.,
+// "my_http_server.py" or "jim/my_http_server.py".)
+export function selectQuizQuestions(
+  questions: readonly PersonalizedQuestionsData[],
+  includeFiles?: unknown
+): PersonalizedQuestionsData[] {
+  const files = Array.isArray(includeFiles)
+    ? includeFiles.map((file) => String(file).split("\\").join("/"))
+    : [];
+  const matchesFile = (filePath: string) => {
+    const normalized = filePath.split("\\").join("/");
+    return files.some(
+      (file) => normalized === file || normalized.endsWith(`/${file}`)
+    );
+  };
+  return questions.filter(
+    (question) =>
+      !question.excludeFromQuiz &&
+      (files.length === 0 || matchesFile(question.filePath))
+  );
+}
+
+// The student a manifest entry belongs to (undefined for the
+// instructor's output and for entries outside the quiz).
+function entryStudent(entry: string, prefixes: readonly string[]) {
+  const prefix = prefixes.find((p) => entry.startsWith(p));
+  if (!prefix) {
+    return undefined;
+  }
+  const student = entry.slice(prefix.length).split("/")[0];
+  return student === "instructor" ? undefined : student;
+}
+
+// The quiz's text (titles, questions, etc.) comes from the shared
+// QuizIR. The config supplies the PL-specific settings.
+export function planPLQuiz(
+  config: ConfigData,
+  quiz: QuizIR,
+  options: PLPlanOptions = {}
+): PLPlan {
+  const previousManifest = options.previousManifest ?? {};
+  const existingUuid = options.existingUuid ?? (() => undefined);
+  const templates = options.templates ?? builtinTemplates();
+  const inScope = (studentName: string) =>
+    !options.onlyStudents || options.onlyStudents.has(studentName);
+
+  // Construct paths
+  const questionsFolderPath = path.join(
+    config.pl_root,
+    "questions",
+    config.pl_question_root,
+    config.pl_quiz_folder
+  );
+  const assessmentFolderPath = path.join(
+    config.pl_root,
+    config.pl_assessment_root,
+    config.pl_quiz_folder
+  );
+  const instructorFolderPath = path.join(questionsFolderPath, "instructor");
+  const instructorAssessmentPath = path.join(
+    assessmentFolderPath,
+    "instructor"
+  );
+  const sharedFolderPath = path.join(
+    config.pl_root,
+    "serverFilesCourse",
+    config.pl_question_root,
+    config.pl_quiz_folder
+  );
+
+  const directories = [
+    questionsFolderPath,
+    assessmentFolderPath,
+    instructorFolderPath,
+    instructorAssessmentPath,
+  ];
+  const files: PlannedFile[] = [];
+
+  // Keep the UUID of questions and assessments that already exist so that
+  // regenerating a quiz does not look like a brand new quiz to PL.
+  const uuidFor = (filePath: string) =>
+    existingUuid(filePath) ??
+    (options.reproducible
+      ? nameUuid(manifestEntry(config.pl_root, filePath))
+      : randomUUID());
+
+  // Write the item's code to its own file (unless the code is inlined).
+  // questionFolderPath is the folder of the question that displays the code.
+  const codeFiles = codeFileMode(config.pl_code_files);
+  const plannedCodeFiles = new Set<string>();
+  const plannedCodeFolders = new Set<string>();
+  const codeFileFor = (
+    item: QuizItem,
+    questionFolderPath: string
+  ): CodeFile | undefined => {
+    if (codeFiles === "inline" || !item.code) {
+      return undefined;
+    }
+    const name = snippetFileName(item.code, quiz.language);
+    const folder =
+      codeFiles === "course"
+        ? sharedFolderPath
+        : path.join(questionFolderPath, "clientFilesQuestion");
+    const filePath = path.join(folder, name);
+    if (!plannedCodeFiles.has(filePath)) {
+      plannedCodeFiles.add(filePath);
+      if (!plannedCodeFolders.has(folder)) {
+        plannedCodeFolders.add(folder);
+        directories.push(folder);
+      }
+      files.push({ path: filePath, content: item.code });
+    }
+    return codeFiles === "course"
+      ? {
+          sourceFile: `${config.pl_question_root}/${config.pl_quiz_folder}/${name}`,
+          directory: "serverFilesCourse",
+        }
+      : { sourceFile: name, directory: "clientFilesQuestion" };
+  };
+
+  // toISOString will add a time zone (UTC by default).
+  const startOfReviewUTC = new Date(
+    new Date(config.startDate).getTime() + config.daysForGrading * 86400000
+  ).toISOString();
+
+  // Remove the time zone component so that PL
+  // will interpret the value in local time (as defined
+  // by the course).
+  const startOfReview = startOfReviewUTC.endsWith("Z")
+    ? startOfReviewUTC.slice(0, -1)
+    : startOfReviewUTC;
+
+  // Generate questions and info.json files for each student
+  for (const { student: studentName, items } of quiz.students) {
+    if (!inScope(studentName)) {
+      continue;
+    }
+    const studentQuestionFolderPath = path.join(
+      questionsFolderPath,
+      studentName
+    );
+    directories.push(studentQuestionFolderPath);
+
+    // Generate question.html and info.json for each question
+    for (const item of items) {
+      const questionFolderPath = path.join(
+        studentQuestionFolderPath,
+        `question${item.number}`
+      );
+      directories.push(questionFolderPath);
+
+      files.push({
+        path: path.join(questionFolderPath, "question.html"),
+        content: templates.render(
+          "pl/question.mustache.html",
+          itemView(item, quiz.language, codeFileFor(item, questionFolderPath))
+        ),
+      });
+      const infoPath = path.join(questionFolderPath, "info.json");
+      files.push(
+        jsonFile(infoPath, {
+          uuid: uuidFor(infoPath),
+          type: "v3",
+          gradingMethod: "Manual",
+          title: `${quiz.title} Q${item.number}`,
+          topic: quiz.topic,
+        })
+      );
+    }
+
+    const studentAssessmentFolderPath = path.join(
+      assessmentFolderPath,
+      studentName
+    );
+    directories.push(studentAssessmentFolderPath);
+
+    // Generate infoAssessment.json for student
+    const infoAssessmentPath = path.join(
+      studentAssessmentFolderPath,
+      "infoAssessment.json"
+    );
+    const infoAssessmentContent = {
+      uuid: uuidFor(infoAssessmentPath),
+      type: "Exam",
+      title: quiz.title,
+      set: config.set,
+      number: config.number,
+      allowAccess: [
+        {
+          mode: "Public",
+          uids: [studentName],
+          credit: 100,
+          timeLimitMin: config.timeLimitMin,
+          startDate: config.startDate,
+          endDate: config.endDate,
+          ...(config.password && { password: config.password }),
+        },
+        {
+          mode: "Public",
+          uids: [studentName],
+          credit: 0,
+          startDate: startOfReview,
+          endDate: config.reviewEndDate,
+          active: false,
+        },
+      ],
+      zones: [
+        {
+          questions: items.map((item) => ({
+            id: `${config.pl_question_root}/${
+              config.pl_quiz_folder
+            }/${studentName}/question${item.number}`,
+            points: quiz.pointsPerQuestion,
+          })),
+        },
+      ],
+    };
+    files.push(jsonFile(infoAssessmentPath, infoAssessmentContent));
+  }
+
+  // Generate the combined question page(s) for the instructor.
+  // Each page is streamed to disk one student at a time rather than
+  // being assembled as one large string.
+  const instructorPages = paginateStudents(
+    quiz.students,
+    config.pl_instructor_page_size
+  );
+  const instructorQuestionIds: string[] = [];
+  for (const [pageIndex, pageStudents] of instructorPages.entries()) {
+    const pageFolder =
+      instructorPages.length > 1
+        ? `combined_questions_${pageIndex + 1}`
+        : "combined_questions";
+    const pageTitle =
+      instructorPages.length > 1
+        ? `${quiz.title} - All Questions (${pageIndex + 1} of ${instructorPages.length})`
+        : `${quiz.title} - All Questions`;
+    instructorQuestionIds.push(
+      `${config.pl_question_root}/${config.pl_quiz_folder}/instructor/${pageFolder}`
+    );
+
+    const instructorQuestionFolderPath = path.join(
+      instructorFolderPath,
+      pageFolder
+    );
+    directories.push(instructorQuestionFolderPath);
+
+    // Plan the page's code files now. (The page itself is rendered later.)
+    const pageCodeFiles = new Map<QuizItem, CodeFile>();
+    for (const { items } of pageStudents) {
+      for (const item of items) {
+        const codeFile = codeFileFor(item, instructorQuestionFolderPath);
+        if (codeFile) {
+          pageCodeFiles.set(item, codeFile);
+        }
+      }
+    }
+    files.push({
+      path: path.join(instructorQuestionFolderPath, "question.html"),
+      content: () =>
+        combinedQuestionChunks(quiz, pageStudents, templates, pageCodeFiles),
+    });
+    const instructorInfoPath = path.join(
+      instructorQuestionFolderPath,
+      "info.json"
+    );
+    files.push(
+      jsonFile(instructorInfoPath, {
+        uuid: uuidFor(instructorInfoPath),
+        gradingMethod: "Manual",
+        type: "v3",
+        title: pageTitle,
+        topic: quiz.topic,
+      })
+    );
+  }
+
+  // Generate instructor assessment file
+  const instructorInfoAssessmentPath = path.join(
+    instructorAssessmentPath,
+    "infoAssessment.json"
+  );
+  const accessFrom = options.reproducible
+    ? new Date(config.startDate).getTime()
+    : Date.now();
+  const instructorInfoAssessmentContent = {
+    uuid: uuidFor(instructorInfoAssessmentPath),
+    type: "Exam",
+    title: `${quiz.title} (Instructor View)`,
+    set: config.set,
+    number: config.number,
+    allowAccess: [
+      {
+        mode: "Public",
+        uids: ["instructor"],
+        credit: 100,
+        timeLimitMin: config.timeLimitMin * 3,
+        // From a day before now (or before the quiz, for a reproducible
+        // plan) until 1000 days after.
+        startDate: new Date(accessFrom - 86_400_000).toISOString(),
+        endDate: new Date(accessFrom + 1000 * 86_400_000).toISOString(),
+        active: true,
+      },
+    ],
+    zones: [
+      {
+        title: "Combined Questions",
+        questions: instructorQuestionIds.map((id) => ({
+          id: id,
+          points: 0,
+          description: "All student questions combined",
+        })),
+      },
+    ],
+  };
+  files.push(
+    jsonFile(instructorInfoAssessmentPath, instructorInfoAssessmentContent)
+  );
+
+  // Output that belongs to students outside the scope of this run
+  // is neither regenerated nor pruned.
+  const key = manifestKey(config.pl_root, questionsFolderPath);
+  const previouslyEmitted = previousManifest[key] ?? [];
+  const prefixes = [questionsFolderPath, assessmentFolderPath].map(
+    (folder) => `${manifestEntry(config.pl_root, folder)}/`
+  );
+  const retained = previouslyEmitted.filter((entry) => {
+    const student = entryStudent(entry, prefixes);
+    return student !== undefined && !inScope(student);
+  });
+  const emitted = new Set([
+    ...files.map((file) => manifestEntry(config.pl_root, file.path)),
+    ...retained,
+  ]);
+  return {
+    plRoot: config.pl_root,
+    questionsFolderPath,
+    assessmentFolderPath,
+    sharedFolderPath,
+    manifestKey: key,
+    directories,
+    files,
+    previouslyEmitted,
+    retained,
+    stale: staleEntries(previouslyEmitted, emitted),
+  };
+}
+
+// The manifest entries for every file in the plan (plus those
+// retained from previous runs).
+export function planManifestEntries(plan: PLPlan): string[] {
+  return [
+    ...plan.files.map((file) => manifestEntry(plan.plRoot, file.path)),
+    ...plan.retained,
+  ].sort();
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Analysis
+//
+/////////////////////////////////////////////////////////////
+
+function chunksOf(file: PlannedFile): Iterable<string> {
+  return typeof file.content === "string" ? [file.content] : file.content();
+}
+
+function hashChunks(chunks: Iterable<string>) {
+  const hash = createHash("sha1");
+  for (const chunk of chunks) {
+    hash.update(chunk);
+  }
+  return hash.digest("hex");
+}
+
+// The files in the PL course that gvQLC generated (and so may overwrite
+// without reporting a collision): those the manifest says the previous run
+// emitted. A quiz generated before gvQLC kept a manifest has no manifest
+// entry, so, in that case, the files in the quiz's own question and
+// assessment folders are assumed to be gvQLC's.
+function ownedEntries(plan: PLPlan): Set<string> {
+  if (plan.previouslyEmitted.length > 0) {
+    return new Set(plan.previouslyEmitted);
+  }
+  const prefixes = [plan.questionsFolderPath, plan.assessmentFolderPath].map(
+    (folder) => `${manifestEntry(plan.plRoot, folder)}/`
+  );
+  return new Set(
+    plan.files
+      .map((file) => manifestEntry(plan.plRoot, file.path))
+      .filter((entry) => prefixes.some((prefix) => entry.startsWith(prefix)))
+  );
+}
+
+// If given an index of the PL course, the analysis also reports any
+// collisions with content gvQLC did not generate.
+export function analyzePLPlan(
+  plan: PLPlan,
+  courseIndex?: PLCourseIndex
+): PLPlanAnalysis {
+  const newDirectories = plan.directories.filter((dir) => !fs.existsSync(dir));
+
+  const files = plan.files.map((file): AnalyzedFile => {
+    if (!fs.existsSync(file.path)) {
+      return { ...file, action: "create" };
+    }
+    const existing = fs.readFileSync(file.path);
+    const oldHash = createHash("sha1").update(existing).digest("hex");
+    const action = oldHash === hashChunks(chunksOf(file)) ? "unchanged" : "overwrite";
+    const oldUuid =
+      file.uuid !== undefined ? readUuid(existing.toString("utf8")) : undefined;
+    return { ...file, action, oldUuid };
+  });
+
+  const prune = plan.stale.filter((entry) =>
+    fs.existsSync(path.join(plan.plRoot, ...entry.split("/")))
+  );
+  const collisions = courseIndex
+    ? findCollisions(courseIndex, plan.files, ownedEntries(plan))
+    : [];
+  return { plan, newDirectories, files, prune, collisions };
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Preview
+//
+/////////////////////////////////////////////////////////////
+
+// Files larger than this are reported as changed, but not diffed.
+const maxDiffSize = 64 * 1024;
+
+// A compact line diff: the lines shared at the beginning and end of both
+// versions are skipped and whatever remains in between is reported.
+export function lineDiff(oldText: string, newText: string): string {
+  const oldLines = oldText.split("\n");
+  const newLines = newText.split("\n");
+  let start = 0;
+  while (
+    start < oldLines.length &&
+    start < newLines.length &&
+    oldLines[start] === newLines[start]
+  ) {
+    start++;
+  }
+  let oldEnd = oldLines.length;
+  let newEnd = newLines.length;
+  while (
+    oldEnd > start &&
+    newEnd > start &&
+    oldLines[oldEnd - 1] === newLines[newEnd - 1]
+  ) {
+    oldEnd--;
+    newEnd--;
+  }
+  return [
+    `@@ line ${start + 1} @@`,
+    ...oldLines.slice(start, oldEnd).map((line) => `-${line}`),
+    ...newLines.slice(start, newEnd).map((line) => `+${line}`),
+  ].join("\n");
+}
+
+export function describePLPlan(analysis: PLPlanAnalysis): string {
+  const { plan } = analysis;
+  const relative = (filePath: string) =>
+    path.relative(plan.plRoot, filePath).split(path.sep).join("/");
+  const byAction = (action: FileAction) =>
+    analysis.files.filter((file) => file.action === action);
+  const created = byAction("create");
+  const overwritten = byAction("overwrite");
+  const unchanged = byAction("unchanged");
+  const uuidChanges = analysis.files.filter(
+    (file) => file.uuid !== undefined && file.oldUuid !== file.uuid
+  );
+
+  const lines = [
+    `# PrairieLearn quiz plan`,
+    "",
+    `PrairieLearn course: \`${plan.plRoot}\``,
+    "",
+    `* ${analysis.newDirectories.length} directories to create`,
+    `* ${created.length} files to create`,
+    `* ${overwritten.length} files to overwrite`,
+    `* ${unchanged.length} files unchanged`,
+    `* ${analysis.prune.length} stale files to prune`,
+    `* ${uuidChanges.length} UUID changes`,
+    `* ${analysis.collisions.length} collisions with existing content`,
+  ];
+
+  const section = (title: string, items: string[]) => {
+    if (items.length > 0) {
+      lines.push("", `## ${title}`, "", ...items);
+    }
+  };
+
+  section(
+    "Collisions",
+    analysis.collisions.map((collision) => `* ${collision.message}`)
+  );
+  section(
+    "Directories to create",
+    analysis.newDirectories.map((dir) => `* \`${relative(dir)}\``)
+  );
+  section(
+    "Files to create",
+    created.map((file) => `* \`${relative(file.path)}\``)
+  );
+  section(
+    "Files to overwrite",
+    overwritten.flatMap((file) => {
+      const header = `### \`${relative(file.path)}\``;
+      const oldText = fs.readFileSync(file.path, "utf8");
+      if (oldText.length > maxDiffSize) {
+        return [header, "", "(too large to diff)", ""];
+      }
+      const newText = Array.from(chunksOf(file)).join("");
+      return [header, "", "```diff", lineDiff(oldText, newText), "```", ""];
+    })
+  );
+  section(
+    "Files to prune",
+    analysis.prune.map((entry) => `* \`${entry}\``)
+  );
+  section("UUID changes", [
+    ...(uuidChanges.length > 0 ? ["| File | Old UUID | New UUID |", "| --- | --- | --- |"] : []),
+    ...uuidChanges.map(
+      (file) =>
+        `| \`${relative(file.path)}\` | ${file.oldUuid ?? "(none)"} | ${file.uuid} |`
+    ),
+  ]);
+  return lines.join("\n") + "\n";
+}
+
+/////////////////////////////////////////////////////////////
+//
+// Execution
+//
+/////////////////////////////////////////////////////////////
+
+export type PLPlanResult = {
+  written: number;
+  pruned: string[];
+};
+
+export async function executePLPlan(
+  analysis: PLPlanAnalysis
+): Promise<PLPlanResult> {
+  const { plan } = analysis;
+  for (const dir of analysis.newDirectories) {
+    fs.mkdirSync(dir, { recursive: true });
+  }
+
+  let written = 0;
+  for (const file of analysis.files) {
+    if (file.action === "unchanged") {
+      continue;
+    }
+    if (typeof file.content === "string") {
+      fs.writeFileSync(file.path, file.content);
+    } else {
+      await writeChunks(file.path, file.content());
+    }
+    written++;
+  }
+
+  // Remove anything a previous run emitted for this quiz that was not
+  // generated this time (e.g., deleted questions or students who no
+  // longer have any questions).
+  const pruned = pruneStaleFiles(plan.plRoot, analysis.prune, [
+    plan.questionsFolderPath,
+    plan.assessmentFolderPath,
+    plan.sharedFolderPath,
+  ]);
+  return { written, pruned };
+}
+
+// Write every file in the plan to the sink, in order of their path
+// (relative to plRoot) so that the output is deterministic.
+// Returns the number of files written.
+export async function writePLPlanToSink(
+  plan: PLPlan,
+  sink: OutputSink
+): Promise<number> {
+  const files = plan.files
+    .map((file) => ({ entry: manifestEntry(plan.plRoot, file.path), file }))
+    .sort((a, b) => (a.entry < b.entry ? -1 : a.entry > b.entry ? 1 : 0));
+  for (const { entry, file } of files) {
+    await sink.writeFile(entry, chunksOf(file));
+  }
+  return files.length;
+}
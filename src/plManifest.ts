@@ -0,0 +1,92 @@
+/************************************************************************************
+ *
+ * plManifest.ts
+ *
+ * Keep track of the files generatePLQuiz emits so that files emitted by a
+ * previous run (but no longer generated) can be removed from the PL course.
+ *
+ * The manifest maps each quiz's question folder to the list of files that were
+ * written for that quiz (relative to pl_root). Only files listed in the manifest
+ * are ever deleted, so hand-made content in the PL course is never touched.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+
+export type PLManifest = Record<string, string[]>;
+
+// The key under which a quiz's emitted files are stored in the manifest.
+export function manifestKey(plRoot: string, questionsFolderPath: string) {
+  return path.relative(plRoot, questionsFolderPath).split(path.sep).join("/");
+}
+
+// Convert an absolute path into the form stored in the manifest.
+export function manifestEntry(plRoot: string, filePath: string) {
+  return path.relative(plRoot, filePath).split(path.sep).join("/");
+}
+
+function isInside(parent: string, child: string) {
+  const relative = path.relative(parent, child);
+  return (
+    relative.length > 0 &&
+    !relative.startsWith("..") &&
+    !path.isAbsolute(relative)
+  );
+}
+
+// Return the previously emitted entries that are not part of the
+// current generation.
+export function staleEntries(
+  previous: readonly string[],
+  current: ReadonlySet<string>
+): string[] {
+  return previous.filter((entry) => !current.has(entry));
+}
+
+// Delete each stale file (if it still exists), then remove any directories
+// left empty, walking upward until one of the boundary folders is reached.
+// Files that do not lie inside a boundary folder are ignored.
+// Returns the list of files actually deleted.
+export function pruneStaleFiles(
+  plRoot: string,
+  stale: readonly string[],
+  boundaries: readonly string[]
+): string[] {
+  const deleted: string[] = [];
+  const candidateDirs = new Set<string>();
+
+  for (const entry of stale) {
+    const filePath = path.join(plRoot, ...entry.split("/"));
+    const boundary = boundaries.find((b) => isInside(b, filePath));
+    if (!boundary) {
+      continue;
+    }
+    if (fs.existsSync(filePath) && fs.statSync(filePath).isFile()) {
+      fs.unlinkSync(filePath);
+      deleted.push(entry);
+    }
+    for (
+      let dir = path.dirname(filePath);
+      isInside(boundary, dir);
+      dir = path.dirname(dir)
+    ) {
+      candidateDirs.add(dir);
+    }
+  }
+
+  // Deepest directories first so that parents are emptied before they are checked.
+  const sortedDirs = Array.from(candidateDirs).sort(
+    (a, b) => b.length - a.length
+  );
+  for (const dir of sortedDirs) {
+    if (fs.existsSync(dir) && fs.readdirSync(dir).length === 0) {
+      fs.rmdirSync(dir);
+    }
+  }
+  return deleted;
+}
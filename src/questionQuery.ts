@@ -0,0 +1,299 @@
+/************************************************************************************
+ *
+ * questionQuery.ts
+ *
+ * Sort, filter, and page the quiz questions for the quiz question view, so
+ * that the view only ever receives the page of questions it is showing.
+ *
+ * A QuestionTable groups and labels the questions once (see questionView.ts)
+ * and keeps each question's label, student, and shortened file path in
+ * columns indexed by QuestionId. Each sort order is computed when first
+ * needed and kept until the questions change in a way that affects it. A
+ * query then walks the sorted ids, keeping the ones that pass the filter,
+ * and builds rows only for the requested page.
+ *
+ * Labels depend on every question's student, so a table is rebuilt when
+ * questions are added (see isCurrent). Edits don't change labels.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { QuestionId, QuestionStore } from "./questionStore";
+import {
+  QuestionGroups,
+  SortKey,
+  chooseQuestionColor,
+  groupQuestions,
+  labelQuestions,
+  shortenFilePath,
+  sortKeys,
+} from "./questionView";
+import { MemoryEntry, fieldBytes, mapEntryBytes, stringBytes } from "./memoryReport";
+
+export type ExcludedFilter = "all" | "included" | "excluded";
+
+export type QuestionQuery = {
+  sort: SortKey;
+  descending: boolean;
+  // Matches the label, file, code, or question (ignoring case)
+  search: string;
+  // Only this student's questions (all students if empty)
+  student: string;
+  excluded: ExcludedFilter;
+  // 1-based
+  page: number;
+  pageSize: number;
+};
+
+export const defaultQuery: QuestionQuery = {
+  sort: "label",
+  descending: false,
+  search: "",
+  student: "",
+  excluded: "all",
+  page: 1,
+  pageSize: 15,
+};
+
+const maxPageSize = 100;
+
+// A query sent by a view, with anything missing or invalid replaced by the default.
+export function parseQuery(value: unknown): QuestionQuery {
+  const query = (typeof value === "object" && value !== null ? value : {}) as Record<string, unknown>;
+  const integer = (x: unknown, fallback: number, max: number) =>
+    Number.isInteger(x) && (x as number) >= 1 ? Math.min(x as number, max) : fallback;
+  return {
+    sort: sortKeys.includes(query.sort as SortKey) ? (query.sort as SortKey) : defaultQuery.sort,
+    descending: query.descending === true,
+    search: typeof query.search === "string" ? query.search : defaultQuery.search,
+    student: typeof query.student === "string" ? query.student : defaultQuery.student,
+    excluded: ["all", "included", "excluded"].includes(query.excluded as string)
+      ? (query.excluded as ExcludedFilter)
+      : defaultQuery.excluded,
+    page: integer(query.page, defaultQuery.page, Number.MAX_SAFE_INTEGER),
+    pageSize: integer(query.pageSize, defaultQuery.pageSize, maxPageSize),
+  };
+}
+
+// Whether edits to questions can change which questions match the query
+// or the order they are in (as opposed to only the contents of the rows).
+export function editsAffect(query: QuestionQuery) {
+  return (
+    query.search !== "" ||
+    query.excluded !== "all" ||
+    query.sort === "questionLength" ||
+    query.sort === "excluded"
+  );
+}
+
+export type QuestionRow = {
+  id: QuestionId;
+  // Position in label order (the view's row number)
+  position: number;
+  label: string;
+  labelColor: string;
+  student: string;
+  filePath: string;
+  shortFilePath: string;
+  code: string;
+  question: string;
+  excluded: boolean;
+};
+
+export type QuestionPage = {
+  // The store version the rows are current as of
+  version: number;
+  // Number of questions, and number that match the query's filter
+  total: number;
+  matches: number;
+  page: number;
+  pageCount: number;
+  rows: QuestionRow[];
+};
+
+export class QuestionTable {
+  readonly groups: QuestionGroups;
+  private readonly size: number;
+  // Columns, indexed by QuestionId
+  private readonly labels: string[] = [];
+  private readonly positions: Int32Array;
+  private readonly students: string[] = [];
+  // file path -> shortened file path (as shown, and in lower case for searching)
+  private readonly shortFilePaths = new Map<string, { shown: string; lower: string }>();
+  // Ids in ascending order for each sort key, and the store version it was
+  // computed at (for orders that edits can change)
+  private readonly sorted = new Map<SortKey, { version: number; ids: QuestionId[] }>();
+
+  constructor(readonly store: QuestionStore, studentOf: (filePath: string) => string) {
+    this.size = store.size;
+    const ids = store.ids();
+    for (const id of ids) {
+      this.students[id] = studentOf(store.filePath(id));
+    }
+    this.groups = groupQuestions(store, ids, studentOf);
+    const { questionLabels, order } = labelQuestions(this.groups.questionsByStudent);
+    this.positions = new Int32Array(this.size);
+    order.forEach((id, position) => {
+      this.positions[id] = position;
+      this.labels[id] = questionLabels[position];
+    });
+    this.sorted.set("label", { version: store.version, ids: order });
+  }
+
+  // Whether the table still describes every question. (Questions are only
+  // ever added, so a table is current until one is.)
+  isCurrent() {
+    return this.store.size === this.size;
+  }
+
+  private shortFilePath(filePath: string) {
+    let short = this.shortFilePaths.get(filePath);
+    if (!short) {
+      const shown = shortenFilePath(filePath);
+      short = { shown, lower: shown.toLowerCase() };
+      this.shortFilePaths.set(filePath, short);
+    }
+    return short;
+  }
+
+  row(id: QuestionId): QuestionRow {
+    const student = this.students[id];
+    const count = this.groups.studentQuestionCounts.get(student) || 0;
+    const filePath = this.store.filePath(id);
+    return {
+      id,
+      position: this.positions[id],
+      label: this.labels[id],
+      labelColor: chooseQuestionColor(count, this.groups.modeQuestions),
+      student,
+      filePath,
+      shortFilePath: this.shortFilePath(filePath).shown,
+      code: this.store.code(id),
+      question: this.store.text(id),
+      excluded: this.store.isExcluded(id),
+    };
+  }
+
+  // The ids in ascending order of the given key (ties in label order)
+  private sortedIds(sort: SortKey): QuestionId[] {
+    const store = this.store;
+    const changesWithEdits = sort === "questionLength" || sort === "excluded";
+    const cached = this.sorted.get(sort);
+    if (cached && (!changesWithEdits || cached.version === store.version)) {
+      return cached.ids;
+    }
+    const ids = store.ids();
+    const positions = this.positions;
+    const byPosition = (a: QuestionId, b: QuestionId) => positions[a] - positions[b];
+    switch (sort) {
+      case "label":
+      case "student":
+        // Labels are numbered in order of student name.
+        ids.sort(byPosition);
+        break;
+      case "file": {
+        ids.sort((a, b) => {
+          const fileA = store.filePath(a);
+          const fileB = store.filePath(b);
+          return fileA < fileB ? -1 : fileA > fileB ? 1 : byPosition(a, b);
+        });
+        break;
+      }
+      case "questionLength": {
+        const lengths = Int32Array.from(ids, (id) => store.text(id).length);
+        ids.sort((a, b) => lengths[a] - lengths[b] || byPosition(a, b));
+        break;
+      }
+      case "excluded":
+        ids.sort((a, b) => Number(store.isExcluded(a)) - Number(store.isExcluded(b)) || byPosition(a, b));
+        break;
+      case "created":
+        // store.ids() is already in the order added
+        break;
+    }
+    this.sorted.set(sort, { version: store.version, ids });
+    return ids;
+  }
+
+  private filter(query: QuestionQuery): ((id: QuestionId) => boolean) | null {
+    const store = this.store;
+    const tests: ((id: QuestionId) => boolean)[] = [];
+    if (query.student !== "") {
+      tests.push((id) => this.students[id] === query.student);
+    }
+    if (query.excluded !== "all") {
+      const excluded = query.excluded === "excluded";
+      tests.push((id) => store.isExcluded(id) === excluded);
+    }
+    const term = query.search.toLowerCase();
+    if (term !== "") {
+      tests.push(
+        (id) =>
+          this.labels[id].includes(term) ||
+          this.shortFilePath(store.filePath(id)).lower.includes(term) ||
+          store.contains(id, term)
+      );
+    }
+    return tests.length === 0 ? null : (id) => tests.every((test) => test(id));
+  }
+
+  query(query: QuestionQuery): QuestionPage {
+    const ids = this.sortedIds(query.sort);
+    const matches = this.filter(query);
+    const { pageSize } = query;
+
+    // Pass 1: count the matches (so that a page past the end can be clamped).
+    let count = ids.length;
+    if (matches) {
+      count = 0;
+      for (const id of ids) {
+        if (matches(id)) {
+          count++;
+        }
+      }
+    }
+    const pageCount = Math.max(1, Math.ceil(count / pageSize));
+    const page = Math.min(query.page, pageCount);
+
+    // Pass 2: collect the page.
+    const first = (page - 1) * pageSize;
+    const rows: QuestionRow[] = [];
+    let seen = 0;
+    for (let i = 0; i < ids.length && rows.length < pageSize; i++) {
+      const id = ids[query.descending ? ids.length - 1 - i : i];
+      if (matches && !matches(id)) {
+        continue;
+      }
+      if (seen++ >= first) {
+        rows.push(this.row(id));
+      }
+    }
+
+    return { version: this.store.version, total: this.size, matches: count, page, pageCount, rows };
+  }
+
+  memory(): MemoryEntry[] {
+    let sortedIds = 0;
+    for (const { ids } of this.sorted.values()) {
+      sortedIds += ids.length;
+    }
+    let shortPathBytes = 0;
+    for (const { shown, lower } of this.shortFilePaths.values()) {
+      shortPathBytes += mapEntryBytes + stringBytes(shown) + (lower === shown ? 0 : stringBytes(lower));
+    }
+    return [
+      {
+        structure: "question table",
+        items: this.size,
+        // Labels, positions, and students (which are shared with
+        // extractStudentName's cache)
+        bytes: this.labels.reduce((total, label) => total + stringBytes(label), 0) +
+          this.size * 3 * fieldBytes + shortPathBytes,
+      },
+      { structure: "sort orders", items: this.sorted.size, bytes: sortedIds * fieldBytes },
+    ];
+  }
+}
@@ -0,0 +1,188 @@
+/************************************************************************************
+ *
+ * questionQueue.ts
+ *
+ * Every change to the quiz questions (adding a question, editing one in a
+ * view, ...) goes through a single QuestionQueue, which applies the changes
+ * to the QuestionStore one at a time, in the order they were submitted.
+ *
+ * Changes submitted while the previous batch is being saved are applied
+ * together as the next batch: the questions are saved once per batch, and
+ * subscribers receive one change event per batch.
+ *
+ * A writer that edits a question it read some time ago (e.g., a view that
+ * has been open for a while) passes the store version it read at. If none
+ * of the fields it is changing has changed since, the change is applied on
+ * top of the newer data (so, for example, a question added in the meantime
+ * is kept). Otherwise, the change is rejected rather than overwriting
+ * someone else's edit.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { PersonalizedQuestionsData } from "./types";
+import { QuestionChanges, QuestionId, QuestionStore } from "./questionStore";
+
+export type QuestionMutation =
+  | { kind: "add"; questions: PersonalizedQuestionsData[] }
+  | {
+      kind: "update";
+      id: QuestionId;
+      changes: QuestionChanges;
+      // The store version the writer read the question at. Omit to apply
+      // the change regardless.
+      baseVersion?: number;
+    };
+
+export type MutationResult =
+  // ids are the questions added or updated.
+  | { status: "applied"; version: number; ids: QuestionId[] }
+  | { status: "rejected"; version: number; reason: string };
+
+export type QuestionChangeEvent = {
+  // The store's version after the batch
+  version: number;
+  added: QuestionId[];
+  updated: QuestionId[];
+};
+
+export type QuestionChangeListener = (event: QuestionChangeEvent) => void;
+
+type Pending = {
+  mutation: QuestionMutation;
+  resolve: (result: MutationResult) => void;
+  reject: (error: unknown) => void;
+};
+
+export class QuestionQueue {
+  private pending: Pending[] = [];
+  private draining = false;
+  private readonly listeners = new Set<QuestionChangeListener>();
+
+  // persist saves the complete list of questions.
+  constructor(
+    readonly store: QuestionStore,
+    private readonly persist: (questions: PersonalizedQuestionsData[]) => Promise<unknown>
+  ) {}
+
+  get version() {
+    return this.store.version;
+  }
+
+  // Resolves once the mutation has been applied (or rejected) and saved.
+  // Rejects only if the mutation is malformed (e.g., a question without a
+  // range) or the questions could not be saved.
+  submit(mutation: QuestionMutation): Promise<MutationResult> {
+    return new Promise((resolve, reject) => {
+      this.pending.push({ mutation, resolve, reject });
+      if (!this.draining) {
+        this.draining = true;
+        // Wait a tick so that mutations submitted together form one batch.
+        queueMicrotask(() => this.drain());
+      }
+    });
+  }
+
+  add(questions: PersonalizedQuestionsData[]) {
+    return this.submit({ kind: "add", questions });
+  }
+
+  update(id: QuestionId, changes: QuestionChanges, baseVersion?: number) {
+    return this.submit({ kind: "update", id, changes, baseVersion });
+  }
+
+  // The listener is called after each batch that changes the questions.
+  subscribe(listener: QuestionChangeListener) {
+    this.listeners.add(listener);
+    return { dispose: () => this.listeners.delete(listener) };
+  }
+
+  private apply(mutation: QuestionMutation): MutationResult {
+    const store = this.store;
+    if (mutation.kind === "add") {
+      const ids = store.addAll(mutation.questions);
+      return { status: "applied", version: store.version, ids };
+    }
+    const { id, changes, baseVersion } = mutation;
+    if (!store.has(id)) {
+      return { status: "rejected", version: store.version, reason: `There is no question ${id}.` };
+    }
+    if (baseVersion !== undefined && store.changedSince(id, changes, baseVersion)) {
+      return {
+        status: "rejected",
+        version: store.version,
+        reason: "The question was changed elsewhere after it was loaded.",
+      };
+    }
+    store.update(id, changes);
+    return { status: "applied", version: store.version, ids: [id] };
+  }
+
+  private async drain() {
+    try {
+      while (this.pending.length > 0) {
+        const batch = this.pending;
+        this.pending = [];
+        try {
+          await this.applyBatch(batch);
+        } catch (e) {
+          // Only this batch fails; the queue carries on with the next one.
+          batch.forEach(({ reject }) => reject(e));
+        }
+      }
+    } finally {
+      this.draining = false;
+    }
+  }
+
+  private async applyBatch(batch: Pending[]) {
+    // A mutation that throws (e.g., a malformed question) fails on its own.
+    const results = batch.map(({ mutation }) => {
+      try {
+        return this.apply(mutation);
+      } catch (e) {
+        return e instanceof Error ? e : new Error(String(e));
+      }
+    });
+    const event: QuestionChangeEvent = { version: this.store.version, added: [], updated: [] };
+    results.forEach((result, i) => {
+      if (!(result instanceof Error) && result.status === "applied") {
+        (batch[i].mutation.kind === "add" ? event.added : event.updated).push(...result.ids);
+      }
+    });
+    // An update to a question added in the same batch is part of the add.
+    const added = new Set(event.added);
+    event.updated = Array.from(new Set(event.updated)).filter((id) => !added.has(id));
+
+    let saveError: unknown;
+    const changed = event.added.length > 0 || event.updated.length > 0;
+    if (changed) {
+      try {
+        await this.persist(this.store.all());
+      } catch (e) {
+        saveError = e;
+      }
+      // The questions in memory have changed even if they couldn't be saved.
+      for (const listener of this.listeners) {
+        try {
+          listener(event);
+        } catch (e) {
+          console.error("Question change listener failed:", e);
+        }
+      }
+    }
+    batch.forEach(({ resolve, reject }, i) => {
+      const result = results[i];
+      if (result instanceof Error) {
+        reject(result);
+      } else if (saveError !== undefined) {
+        reject(saveError);
+      } else {
+        resolve(result);
+      }
+    });
+  }
+}
@@ -0,0 +1,299 @@
+/************************************************************************************
+ *
+ * questionStore.ts
+ *
+ * The quiz questions held by the extension, stored compactly.
+ *
+ * Each distinct file path, code snippet, and question text is stored once (in
+ * a StringPool) and questions refer to them by number, so copies of a
+ * question (e.g., from applyQuestionToSimilarSnippets) cost only a few
+ * numbers. The other fields are kept in columns rather than one object per
+ * question. A question is turned back into a PersonalizedQuestionsData
+ * object only when someone asks for one (e.g., to save the questions).
+ *
+ * Each question has a QuestionId that doesn't change for the rest of the
+ * session (unlike its index in a list, which changes when the questions are
+ * sorted or grouped), so views can hold onto ids instead of questions.
+ *
+ * The store has a version number that goes up with every change, and each
+ * field that can be changed remembers the version at which it was last
+ * changed. This lets a writer that read the questions at some version find
+ * out whether someone else has changed them since (see questionQueue.ts).
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { PersonalizedQuestionsData } from "./types";
+import {
+  MemoryEntry,
+  fieldBytes,
+  mapEntryBytes,
+  stringBytes,
+} from "./memoryReport";
+
+export type QuestionId = number;
+
+// The parts of a question that can be changed after it is added.
+export type QuestionChanges = Partial<
+  Pick<PersonalizedQuestionsData, "text" | "highlightedCode" | "excludeFromQuiz">
+>;
+
+const changeableFields = ["text", "highlightedCode", "excludeFromQuiz"] as const;
+
+// Each distinct string is stored once and identified by a number. Strings
+// are reference counted, so a string that is no longer used is dropped.
+export class StringPool {
+  private readonly ids = new Map<string, number>();
+  private readonly strings: (string | undefined)[] = [];
+  private readonly counts: number[] = [];
+  private readonly free: number[] = [];
+  // Lower case copies (for searching), made when first needed
+  private readonly lowerCase: (string | undefined)[] = [];
+  private bytes = 0;
+
+  // Each call to intern must eventually be balanced by a call to release.
+  intern(str: string): number {
+    let id = this.ids.get(str);
+    if (id === undefined) {
+      id = this.free.pop() ?? this.strings.length;
+      this.strings[id] = str;
+      this.counts[id] = 0;
+      this.ids.set(str, id);
+      this.bytes += stringBytes(str);
+    }
+    this.counts[id]++;
+    return id;
+  }
+
+  release(id: number) {
+    if (--this.counts[id] === 0) {
+      const str = this.strings[id]!;
+      this.ids.delete(str);
+      this.strings[id] = undefined;
+      this.free.push(id);
+      this.bytes -= stringBytes(str);
+      const lower = this.lowerCase[id];
+      if (lower !== undefined) {
+        this.lowerCase[id] = undefined;
+        this.bytes -= lower === str ? 0 : stringBytes(lower);
+      }
+    }
+  }
+
+  get(id: number): string {
+    return this.strings[id]!;
+  }
+
+  lower(id: number): string {
+    let lower = this.lowerCase[id];
+    if (lower === undefined) {
+      const str = this.strings[id]!;
+      lower = str.toLowerCase();
+      // Strings that are already lower case are not copied.
+      if (lower === str) {
+        lower = str;
+      } else {
+        this.bytes += stringBytes(lower);
+      }
+      this.lowerCase[id] = lower;
+    }
+    return lower;
+  }
+
+  get size() {
+    return this.ids.size;
+  }
+
+  memory(structure: string): MemoryEntry {
+    return {
+      structure,
+      items: this.size,
+      // The strings, the map from string to id, and the id -> string,
+      // reference count, and lower case columns
+      bytes: this.bytes + this.strings.length * (mapEntryBytes + 3 * fieldBytes),
+    };
+  }
+}
+
+// Throw (before the store is changed) if the question can't be stored.
+function checkQuestion(question: PersonalizedQuestionsData) {
+  const { range } = question ?? {};
+  const isPosition = (position: unknown) =>
+    typeof position === "object" &&
+    position !== null &&
+    Number.isInteger((position as { line: unknown }).line) &&
+    Number.isInteger((position as { character: unknown }).character);
+  if (typeof question?.filePath !== "string" || !isPosition(range?.start) || !isPosition(range?.end)) {
+    throw new TypeError(`Malformed question: ${JSON.stringify(question)}`);
+  }
+}
+
+export class QuestionStore {
+  private readonly filePaths = new StringPool();
+  private readonly snippets = new StringPool();
+  private readonly texts = new StringPool();
+
+  // Columns, indexed by QuestionId
+  private readonly filePathIds: number[] = [];
+  private readonly snippetIds: number[] = [];
+  private readonly textIds: number[] = [];
+  // Four per question: start line, start character, end line, end character
+  private readonly ranges: number[] = [];
+  private readonly excluded: boolean[] = [];
+  // Any other properties of the question (e.g., answer), so that they are
+  // saved along with it
+  private readonly extras: (Record<string, unknown> | undefined)[] = [];
+  // One per changeable field (in the order of changeableFields): the
+  // version at which the field was last changed
+  private readonly fieldVersions: number[] = [];
+
+  private currentVersion = 0;
+
+  get size() {
+    return this.filePathIds.length;
+  }
+
+  get version() {
+    return this.currentVersion;
+  }
+
+  add(question: PersonalizedQuestionsData): QuestionId {
+    checkQuestion(question);
+    const { filePath, range, text, highlightedCode, excludeFromQuiz, ...extra } = question;
+    const id = this.filePathIds.length;
+    this.filePathIds.push(this.filePaths.intern(filePath));
+    this.snippetIds.push(this.snippets.intern(highlightedCode ?? ""));
+    this.textIds.push(this.texts.intern(text ?? ""));
+    this.ranges.push(
+      range.start.line,
+      range.start.character,
+      range.end.line,
+      range.end.character
+    );
+    this.excluded.push(Boolean(excludeFromQuiz));
+    this.extras.push(Object.keys(extra).length > 0 ? extra : undefined);
+    const version = ++this.currentVersion;
+    this.fieldVersions.push(version, version, version);
+    return id;
+  }
+
+  // Adds all of the questions or (if any is malformed) none of them.
+  addAll(questions: Iterable<PersonalizedQuestionsData>): QuestionId[] {
+    const all = Array.from(questions);
+    all.forEach(checkQuestion);
+    return all.map((question) => this.add(question));
+  }
+
+  has(id: QuestionId) {
+    return Number.isInteger(id) && id >= 0 && id < this.size;
+  }
+
+  // Every id, in the order the questions were added.
+  ids(): QuestionId[] {
+    return Array.from({ length: this.size }, (_, id) => id);
+  }
+
+  filePath(id: QuestionId) {
+    return this.filePaths.get(this.filePathIds[id]);
+  }
+
+  code(id: QuestionId) {
+    return this.snippets.get(this.snippetIds[id]);
+  }
+
+  text(id: QuestionId) {
+    return this.texts.get(this.textIds[id]);
+  }
+
+  isExcluded(id: QuestionId) {
+    return this.excluded[id];
+  }
+
+  // Whether the question's code or text contains term (which must be
+  // lower case), ignoring case.
+  contains(id: QuestionId, term: string) {
+    return (
+      this.texts.lower(this.textIds[id]).includes(term) ||
+      this.snippets.lower(this.snippetIds[id]).includes(term)
+    );
+  }
+
+  startLine(id: QuestionId) {
+    return this.ranges[4 * id];
+  }
+
+  range(id: QuestionId): PersonalizedQuestionsData["range"] {
+    const at = 4 * id;
+    return {
+      start: { line: this.ranges[at], character: this.ranges[at + 1] },
+      end: { line: this.ranges[at + 2], character: this.ranges[at + 3] },
+    };
+  }
+
+  // The question as a (new) PersonalizedQuestionsData object.
+  get(id: QuestionId): PersonalizedQuestionsData {
+    return {
+      filePath: this.filePath(id),
+      range: this.range(id),
+      text: this.text(id),
+      highlightedCode: this.code(id),
+      excludeFromQuiz: this.excluded[id],
+      ...this.extras[id],
+    };
+  }
+
+  // Every question, in the order added (e.g., for saving).
+  all(): PersonalizedQuestionsData[] {
+    return this.ids().map((id) => this.get(id));
+  }
+
+  // Whether any of the given fields of the question has changed since
+  // the given version.
+  changedSince(id: QuestionId, changes: QuestionChanges, version: number) {
+    return changeableFields.some(
+      (field, i) =>
+        changes[field] !== undefined &&
+        this.fieldVersions[changeableFields.length * id + i] > version
+    );
+  }
+
+  update(id: QuestionId, changes: QuestionChanges) {
+    const version = ++this.currentVersion;
+    changeableFields.forEach((field, i) => {
+      if (changes[field] !== undefined) {
+        this.fieldVersions[changeableFields.length * id + i] = version;
+      }
+    });
+    if (changes.text !== undefined) {
+      const textId = this.texts.intern(changes.text);
+      this.texts.release(this.textIds[id]);
+      this.textIds[id] = textId;
+    }
+    if (changes.highlightedCode !== undefined) {
+      const snippetId = this.snippets.intern(changes.highlightedCode);
+      this.snippets.release(this.snippetIds[id]);
+      this.snippetIds[id] = snippetId;
+    }
+    if (changes.excludeFromQuiz !== undefined) {
+      this.excluded[id] = changes.excludeFromQuiz;
+    }
+  }
+
+  memory(): MemoryEntry[] {
+    return [
+      {
+        structure: "questions",
+        items: this.size,
+        // Three ids, four range values, a flag, an extras slot, and
+        // three field versions each
+        bytes: this.size * 12 * fieldBytes,
+      },
+      this.filePaths.memory("file paths"),
+      this.snippets.memory("code snippets"),
+      this.texts.memory("question texts"),
+    ];
+  }
+}
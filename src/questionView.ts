@@ -0,0 +1,250 @@
+/************************************************************************************
+ *
+ * questionView.ts
+ *
+ * Group, label, and build the HTML tables for the quiz question view. The view
+ * refers to questions by their ids in the QuestionStore.
+ *
+ * This code is also used outside of the extension (e.g., by the benchmarks), so
+ * don't include any packages that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Benedict Osei Sefa and Zachary Kurmas
+ * *********************************************************************************/
+
+import { ViewColors } from "./sharedConstants";
+import { escapeHtmlAttr } from "./htmlEscape";
+import { QuestionId, QuestionStore } from "./questionStore";
+import { QuestionPage, QuestionQuery, QuestionRow } from "./questionQuery";
+
+export type QuestionGroups = {
+  questionsByStudent: Record<string, QuestionId[]>;
+  studentQuestionCounts: Map<string, number>;
+  maxQuestions: number;
+  // The most common number of questions per student
+  modeQuestions: number;
+};
+
+export type LabeledQuestions = {
+  // Labels (e.g., "3b") keyed by position in order
+  questionLabels: Record<string, string>;
+  // The questions sorted by student
+  order: QuestionId[];
+};
+
+// The orders the view can show the questions in (see questionQuery.ts)
+export const sortKeys = [
+  "label",
+  "student",
+  "file",
+  "questionLength",
+  "excluded",
+  "created",
+] as const;
+
+export type SortKey = (typeof sortKeys)[number];
+
+export const sortKeyNames: Record<SortKey, string> = {
+  label: "Label",
+  student: "Student",
+  file: "File",
+  questionLength: "Question length",
+  excluded: "Excluded",
+  // Questions don't record when they were created, but ids are assigned in
+  // the order questions are added.
+  created: "Order added",
+};
+
+export function chooseQuestionColor(
+  numQuestionsForStudent: number,
+  modeQuestionsForStudent: number
+) {
+  if (numQuestionsForStudent === 0) {
+    return ViewColors.RED;
+  } else if (numQuestionsForStudent > modeQuestionsForStudent) {
+    return ViewColors.BLUE;
+  } else if (numQuestionsForStudent === modeQuestionsForStudent) {
+    return ViewColors.GREEN;
+  } else {
+    // if (numQuestionsForStudent < modeQuestionsForStudent)
+    return ViewColors.YELLOW;
+  }
+}
+
+// studentOf maps a question's file path to its student.
+export function groupQuestions(
+  store: QuestionStore,
+  ids: QuestionId[],
+  studentOf: (filePath: string) => string
+): QuestionGroups {
+  const questionsByStudent: Record<string, QuestionId[]> = {};
+  for (const id of ids) {
+    const studentName = studentOf(store.filePath(id));
+    if (!questionsByStudent[studentName]) {
+      questionsByStudent[studentName] = [];
+    }
+    questionsByStudent[studentName].push(id);
+  }
+
+  const frequencyMap = new Map<number, number>();
+
+  const studentQuestionCounts = new Map<string, number>();
+  let maxQuestions = 0;
+  for (const studentName in questionsByStudent) {
+    const count = questionsByStudent[studentName].length;
+    studentQuestionCounts.set(studentName, count);
+    if (count > maxQuestions) {
+      maxQuestions = count;
+    }
+    frequencyMap.set(count, (frequencyMap.get(count) ?? 0) + 1);
+  }
+
+  // Compute the mode (most common question count)
+  let modeQuestions = -1;
+  let highestFrequency = 0;
+
+  for (const [count, freq] of frequencyMap.entries()) {
+    if (freq > highestFrequency || (freq === highestFrequency && count > modeQuestions)) {
+      highestFrequency = freq;
+      modeQuestions = count;
+    }
+  }
+  return { questionsByStudent, studentQuestionCounts, maxQuestions, modeQuestions };
+}
+
+export function labelQuestions(
+  questionsByStudent: Record<string, QuestionId[]>
+): LabeledQuestions {
+  const questionLabels: Record<string, string> = {};
+
+  let studentCounter = 1;
+  let questionIndex = 0;
+  const sortedStudentNames = Object.keys(questionsByStudent).sort();
+  const startingCode = "a".charCodeAt(0);
+
+  for (const studentName of sortedStudentNames) {
+    const questions = questionsByStudent[studentName];
+    questions.forEach((_, qIndex) => {
+      questionLabels[questionIndex] = `${studentCounter}${String.fromCharCode(startingCode + qIndex)}`;
+      questionIndex++;
+    });
+    studentCounter++;
+  }
+
+  const order: QuestionId[] = [];
+  for (const studentName of sortedStudentNames) {
+    order.push(...questionsByStudent[studentName]);
+  }
+  return { questionLabels, order };
+}
+
+// The (initially hidden) table showing how many questions each student has.
+// Students in allStudentNames with no questions are included.
+export function summaryTableHTML(groups: QuestionGroups, allStudentNames: string[]) {
+  const allStudents: string[] = Array.from(new Set<string>([
+    ...Object.keys(groups.questionsByStudent),
+    ...allStudentNames
+  ])).sort();
+
+  const summaryRows = allStudents.map(student => {
+    const count = groups.studentQuestionCounts.get(student) || 0;
+    const hasQuestions = count > 0;
+    const color = chooseQuestionColor(count, groups.modeQuestions);
+    return `
+              <tr style="background-color: ${color}">
+                  <td>${student}</td>
+                  <td>${count}</td>
+                  <td>${hasQuestions ? '✓' : '✗'}</td>
+              </tr>
+          `;
+  }).join('');
+
+  return `
+          <div id="summaryTableContainer" style="display: none; max-height: 300px; overflow-y: auto; margin-top: 20px;">
+              <h2>Student Question Summary</h2>
+              <table style="width: 100%; border-collapse: collapse;">
+                  <thead>
+                      <tr>
+                          <th>Student Name</th>
+                          <th>Question Count</th>
+                          <th>Has Questions</th>
+                      </tr>
+                  </thead>
+                  <tbody>
+                      ${summaryRows}
+                  </tbody>
+              </table>
+          </div>
+      `;
+}
+
+function truncateCharacters(text: string, charLimit: number) {
+  return text.length > charLimit ? text.slice(0, charLimit) + '...' : text;
+}
+
+// The file path as shown in the view (e.g., ".../student/folder/file.py")
+export function shortenFilePath(filePath: string) {
+  const filePathParts = filePath.split('/');
+  const shortenedFilePath = filePathParts.length > 2
+    ? `.../${filePathParts.slice(-3).join('/')}`
+    : filePath;
+  return truncateCharacters(shortenedFilePath, 30);
+}
+
+// One table row per question (e.g., one page of a QuestionPage). Each row
+// carries the question's id and the question as loaded (in its data-
+// attributes), which is what Revert restores. Rows are numbered by their
+// position in the label order, so a row keeps its number on every page.
+export function questionRowsHTML(rows: QuestionRow[]) {
+  return rows.map((question) => {
+    const { position, label } = question;
+    const highlightedCode = escapeHtmlAttr(question.code);
+    const questionText = escapeHtmlAttr(question.question);
+
+    return `
+          <tr id="row-${position}" data-id="${question.id}" data-label="${label}" data-file="${question.shortFilePath}" data-code="${highlightedCode || 'No highlighted code'}" data-question="${questionText || 'No question'}" data-excluded="${question.excluded}">
+              <td style="background-color: ${question.labelColor}">${label}</td>
+              <td title="${question.filePath}">${question.shortFilePath}</td>
+              <td>
+                  <textarea class="code-area" id="code-${position}">${highlightedCode || 'No highlighted code'}</textarea>
+              </td>
+              <td>
+                  <textarea class="question-area" id="question-${position}">${questionText || 'No question'}</textarea>
+              </td>
+              <td>
+                  <button onclick="saveChanges(this)">Save</button>
+                  <button onclick="revertChanges(this)" style="background-color: orange; color: white;">Revert</button>
+                  <button onclick="editQuestion(this)" style="background-color: green; color: white;">Edit</button>
+                  <button onclick="copyQuestionText(this)" style="background-color: #2196F3; color: white;">Copy</button>
+                  <br>
+                  <input type="checkbox" class="exclude-box" id="exclude-${position}" ${question.excluded ? 'checked' : ''} onchange="toggleExclude(this)">
+                  <label for="exclude-${position}">Exclude from Quiz</label>
+              </td>
+          </tr>
+      `;
+  }).join('');
+}
+
+// The data rendered into quizQuestions.mustache.html: the first page of
+// questions and the summary table. commandStartedAt (Date.now() when the
+// command began) is the origin of the view's time-to-first-row.
+export function questionViewData(
+  page: QuestionPage,
+  query: QuestionQuery,
+  studentNames: string[],
+  summaryTable: string,
+  commandStartedAt = Date.now()
+) {
+  return {
+    commandStartedAt,
+    version: page.version,
+    totalQuestions: page.total,
+    matches: page.matches,
+    pageCount: page.pageCount,
+    pageSize: query.pageSize,
+    pageSizes: [10, 15, 25, 50, 100].map((size) => ({ size, selected: size === query.pageSize })),
+    sortKeys: sortKeys.map((key) => ({ key, name: sortKeyNames[key], selected: key === query.sort })),
+    students: studentNames.map((name) => ({ name })),
+    summaryTable,
+    questionsTable: questionRowsHTML(page.rows),
+  };
+}
@@ -0,0 +1,171 @@
+/************************************************************************************
+ *
+ * questionViewHub.ts
+ *
+ * Answer the open quiz question views' queries, and keep every view up to
+ * date with the questions.
+ *
+ * All views share one QuestionTable (see questionQuery.ts), which the hub
+ * rebuilds only when questions are added. Each view has a session that
+ * remembers the view's current query and the questions on its current page.
+ *
+ * The hub subscribes to the QuestionQueue once (no matter how many views are
+ * open) and passes each batch of changes on to the sessions. A session sends
+ * its view only what the view needs:
+ *   - If the change can't affect which questions are on the view's page (or
+ *     their order), only the changed rows on the page are sent.
+ *   - Otherwise (e.g., questions were added, or the view is searching and a
+ *     question's text changed), the query is run again and, if the page is
+ *     different, the new page is sent.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { QuestionId } from "./questionStore";
+import { QuestionChangeEvent, QuestionQueue } from "./questionQueue";
+import {
+  QuestionPage,
+  QuestionQuery,
+  QuestionRow,
+  QuestionTable,
+  defaultQuery,
+  editsAffect,
+} from "./questionQuery";
+import { MemoryEntry, fieldBytes } from "./memoryReport";
+
+// The messages a session sends to its view. queryId is the id of the view's
+// query that the page answers.
+export type ViewMessage =
+  | ({ type: "page"; queryId: number } & QuestionPage)
+  // version is the store version the rows are current as of.
+  | { type: "rowsChanged"; version: number; rows: QuestionRow[] };
+
+export class QuestionViewHub {
+  private readonly sessions = new Set<QuestionViewSession>();
+  private subscription: { dispose(): void } | null = null;
+  private currentTable: QuestionTable | null = null;
+
+  // makeTable builds a table of all the questions in queue.store.
+  constructor(
+    readonly queue: QuestionQueue,
+    private readonly makeTable: () => QuestionTable
+  ) {}
+
+  get size() {
+    return this.sessions.size;
+  }
+
+  table() {
+    if (!this.currentTable?.isCurrent()) {
+      this.currentTable = this.makeTable();
+    }
+    return this.currentTable;
+  }
+
+  // Forget the table (e.g., because the way students are identified changed).
+  reset() {
+    this.currentTable = null;
+  }
+
+  // Start a session for a view. post sends a message to the view.
+  open(post: (message: ViewMessage) => void, query = defaultQuery) {
+    const session = new QuestionViewSession(this, post, query);
+    this.sessions.add(session);
+    this.subscription ??= this.queue.subscribe((event) => this.broadcast(event));
+    return session;
+  }
+
+  close(session: QuestionViewSession) {
+    this.sessions.delete(session);
+    if (this.sessions.size === 0) {
+      this.subscription?.dispose();
+      this.subscription = null;
+      this.currentTable = null;
+    }
+  }
+
+  private broadcast(event: QuestionChangeEvent) {
+    for (const session of this.sessions) {
+      session.changed(event);
+    }
+  }
+
+  memory(): MemoryEntry[] {
+    let shown = 0;
+    for (const session of this.sessions) {
+      shown += session.pageSize;
+    }
+    return [
+      { structure: "open views", items: this.sessions.size, bytes: shown * fieldBytes },
+      ...(this.currentTable?.memory() ?? []),
+    ];
+  }
+}
+
+export class QuestionViewSession {
+  private queryId = 0;
+  // The questions on the view's current page, in order
+  private shown: QuestionId[] = [];
+  private matches = 0;
+
+  constructor(
+    private readonly hub: QuestionViewHub,
+    private readonly post: (message: ViewMessage) => void,
+    private query: QuestionQuery
+  ) {}
+
+  get pageSize() {
+    return this.shown.length;
+  }
+
+  // Answer the query (without sending the answer).
+  run(query: QuestionQuery): QuestionPage {
+    const page = this.hub.table().query(query);
+    // Remember the page that was actually returned (e.g., the last page
+    // if the query asked for a page past the end).
+    this.query = { ...query, page: page.page };
+    this.shown = page.rows.map((row) => row.id);
+    this.matches = page.matches;
+    return page;
+  }
+
+  // Answer a query from the view.
+  request(queryId: number, query: QuestionQuery) {
+    this.queryId = queryId;
+    this.post({ type: "page", queryId, ...this.run(query) });
+  }
+
+  changed(event: QuestionChangeEvent) {
+    if (event.added.length > 0 || (event.updated.length > 0 && editsAffect(this.query))) {
+      const before = this.shown;
+      const matchesBefore = this.matches;
+      const page = this.run(this.query);
+      const samePage =
+        page.matches === matchesBefore &&
+        before.length === this.shown.length &&
+        before.every((id, i) => id === this.shown[i]);
+      // Labels (and so the rows) change when questions are added.
+      if (!samePage || event.added.length > 0) {
+        this.post({ type: "page", queryId: this.queryId, ...page });
+        return;
+      }
+    }
+    const shown = new Set(this.shown);
+    const changed = event.updated.filter((id) => shown.has(id));
+    if (changed.length > 0) {
+      const table = this.hub.table();
+      this.post({
+        type: "rowsChanged",
+        version: event.version,
+        rows: changed.map((id) => table.row(id)),
+      });
+    }
+  }
+
+  dispose() {
+    this.hub.close(this);
+  }
+}
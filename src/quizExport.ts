@@ -0,0 +1,91 @@
+/************************************************************************************
+ *
+ * quizExport.ts
+ *
+ * The intermediate representation of a quiz shared by every output format,
+ * and the interface implemented by exporters for formats other than
+ * PrairieLearn (e.g., QTI and Moodle XML).
+ *
+ * Questions are grouped and labeled once (buildQuizIR). Every exporter then
+ * works from the same QuizIR, so generating several formats does not require
+ * re-grouping or re-reading the questions.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { ConfigData, PersonalizedQuestionsData } from "./types";
+import { OutputSink } from "./outputSink";
+
+export type QuizItem = {
+  // Label used in the question view (e.g., "3b")
+  label: string;
+  // Position of the question in the student's quiz (1-based)
+  number: number;
+  text: string;
+  code: string;
+  filePath: string;
+};
+
+export type StudentQuiz = {
+  student: string;
+  items: QuizItem[];
+};
+
+export type QuizIR = {
+  title: string;
+  topic: string;
+  language: string;
+  pointsPerQuestion: number;
+  students: StudentQuiz[];
+};
+
+export interface QuizExporter {
+  // The name used to select this exporter in the config's export_formats.
+  readonly format: string;
+  // Write every file of the exported quiz to the sink.
+  export(quiz: QuizIR, sink: OutputSink): Promise<void>;
+}
+
+export function buildQuizIR(
+  config: ConfigData,
+  questionsByStudent: [string, PersonalizedQuestionsData[]][]
+): QuizIR {
+  const startingCode = "a".charCodeAt(0);
+  return {
+    title: String(config.title),
+    topic: String(config.topic),
+    language: String(config.language),
+    pointsPerQuestion: Number(config.points_per_question),
+    students: questionsByStudent.map(([student, questions], studentIndex) => ({
+      student,
+      items: questions.map((question, index) => ({
+        label: `${studentIndex + 1}${String.fromCharCode(startingCode + index)}`,
+        number: index + 1,
+        text: question.text,
+        code: question.highlightedCode,
+        filePath: question.filePath,
+      })),
+    })),
+  };
+}
+
+export function escapeXml(str: string) {
+  return String(str)
+    .replace(/&/g, "&amp;") // must go first
+    .replace(/</g, "&lt;")
+    .replace(/>/g, "&gt;")
+    .replace(/"/g, "&quot;")
+    .replace(/'/g, "&apos;");
+}
+
+// The HTML for an item's prompt: its text followed by its code (if any).
+export function itemHTML(item: QuizItem) {
+  const paragraphs = (item.text || "No question text provided")
+    .split(/\n\s*\n/)
+    .map((paragraph) => `<p>${escapeXml(paragraph)}</p>`);
+  const code = item.code ? [`<pre><code>${escapeXml(item.code)}</code></pre>`] : [];
+  return [...paragraphs, ...code].join("\n");
+}
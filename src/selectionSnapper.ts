@@ -0,0 +1,143 @@
+/************************************************************************************
+ *
+ * selectionSnapper.ts
+ *
+ * Snap a selection to the nearest enclosing statement, block, or function,
+ * so that a question's highlightedCode doesn't begin mid-token or cut a
+ * block in half.
+ *
+ * The syntax comes from the selection range provider of the document's
+ * language extension (the parser behind "Expand Selection"), when there is
+ * one. Otherwise, the selection snaps to the indentation structure of the
+ * file (see codeStructure.ts). Both are cached per document version, so
+ * snapping the same document again (e.g., after adjusting the selection)
+ * does not re-query the provider or re-scan the file.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+
+import { context } from "./gvQLC";
+import { CodeStructure, analyzeStructure, snapToBlock } from "./codeStructure";
+
+type CachedDocument = {
+  version: number;
+  structure?: CodeStructure;
+  // Selection ranges by position ("line:character")
+  selectionRanges: Map<string, Promise<vscode.SelectionRange | undefined>>;
+};
+
+const cache = new Map<string, CachedDocument>();
+let listening = false;
+
+function cachedDocument(document: vscode.TextDocument) {
+  if (!listening) {
+    // Forget documents once they are closed.
+    context().subscriptions.push(
+      vscode.workspace.onDidCloseTextDocument((closed) =>
+        cache.delete(closed.uri.toString())
+      )
+    );
+    listening = true;
+  }
+  const key = document.uri.toString();
+  let cached = cache.get(key);
+  if (!cached || cached.version !== document.version) {
+    cached = { version: document.version, selectionRanges: new Map() };
+    cache.set(key, cached);
+  }
+  return cached;
+}
+
+function selectionRangeAt(
+  document: vscode.TextDocument,
+  position: vscode.Position
+) {
+  const cached = cachedDocument(document);
+  const key = `${position.line}:${position.character}`;
+  let ranges = cached.selectionRanges.get(key);
+  if (!ranges) {
+    ranges = Promise.resolve(
+      vscode.commands.executeCommand<vscode.SelectionRange[] | undefined>(
+        "vscode.executeSelectionRangeProvider",
+        document.uri,
+        [position]
+      )
+    ).then(
+      (result) => result?.[0],
+      () => undefined
+    );
+    cached.selectionRanges.set(key, ranges);
+  }
+  return ranges;
+}
+
+function structureOf(document: vscode.TextDocument) {
+  const cached = cachedDocument(document);
+  if (!cached.structure) {
+    cached.structure = analyzeStructure(document.getText());
+  }
+  return cached.structure;
+}
+
+// Does the range cover whole lines (ignoring indentation and trailing space)?
+function isWholeLines(document: vscode.TextDocument, range: vscode.Range) {
+  const first = document.lineAt(range.start.line);
+  const last = document.lineAt(range.end.line);
+  return (
+    range.start.character <= first.firstNonWhitespaceCharacterIndex &&
+    range.end.character >= last.text.trimEnd().length
+  );
+}
+
+// The smallest statement, block, or function containing the selection.
+export async function snapSelection(
+  document: vscode.TextDocument,
+  selection: vscode.Range
+): Promise<vscode.Range> {
+  // The provider's ranges grow outward from the position (token, expression,
+  // statement, block, ...). Take the first that spans whole lines (but not
+  // the whole document, which is where providers without a parser end up).
+  for (
+    let candidate = await selectionRangeAt(document, selection.start);
+    candidate;
+    candidate = candidate.parent
+  ) {
+    if (
+      candidate.range.contains(selection) &&
+      isWholeLines(document, candidate.range) &&
+      !(candidate.range.start.line === 0 && candidate.range.end.line >= document.lineCount - 1)
+    ) {
+      const start = candidate.range.start.line;
+      const end = candidate.range.end.line;
+      return new vscode.Range(
+        start,
+        document.lineAt(start).firstNonWhitespaceCharacterIndex,
+        end,
+        document.lineAt(end).text.trimEnd().length
+      );
+    }
+  }
+
+  // A selection that ends at the start of a line doesn't include that line.
+  const endLine =
+    selection.end.character === 0 && selection.end.line > selection.start.line
+      ? selection.end.line - 1
+      : selection.end.line;
+  const snapped = snapToBlock(structureOf(document), selection.start.line, endLine);
+  return new vscode.Range(
+    snapped.startLine,
+    snapped.startCharacter,
+    snapped.endLine,
+    snapped.endCharacter
+  );
+}
+
+// Whether addQuizQuestion should snap the selection (the
+// gvqlc.snapSelectionOnAdd setting; off by default).
+export function snapSelectionOnAdd() {
+  return vscode.workspace
+    .getConfiguration("gvqlc")
+    .get<boolean>("snapSelectionOnAdd", false);
+}
@@ -13,6 +13,13 @@
 export const GVQLC = 'gvQLC';
 export const quizQuestionsFileName = 'gvQLC.quizQuestions.json';
 export const configFileName = 'gvQLC.config.json';
+export const plManifestFileName = 'gvQLC.plManifest.json';
+export const plCourseIndexFileName = 'plCourseIndex.json';
+export const templateOverrideFolderName = 'gvQLC.templates';
+// The default export_root
+export const exportFolderName = 'gvQLC-export';
+export const submissionIndexFileName = 'submissionIndex.json';
+export const hotspotCacheFileName = 'hotspots.json';
 
 export enum ViewColors {
     RED = 'rgba(255, 184, 181, 1)',   // '#ffb8b5'
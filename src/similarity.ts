@@ -0,0 +1,432 @@
+/************************************************************************************
+ *
+ * similarity.ts
+ *
+ * Find code in other students' submissions that is similar to a snippet
+ * (e.g., the same loop in each student's version of an assignment).
+ *
+ * Each file is reduced to a set of fingerprints by winnowing the hashes of
+ * its token k-grams (as MOSS does). Each file is then divided into
+ * overlapping windows of several sizes (in lines). Each window gets a MinHash
+ * signature, and the signatures are bucketed by band (locality-sensitive
+ * hashing). A query only examines the windows that share a bucket with the
+ * snippet, then picks the densest matching region in each candidate file.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+export type Fingerprint = {
+  hash: number;
+  // Lines (0-based) of the first and last tokens of the k-gram
+  startLine: number;
+  endLine: number;
+};
+
+export type SimilarMatch = {
+  fileId: string;
+  startLine: number;
+  endLine: number;
+  // The fraction of the snippet's fingerprints found in the region
+  score: number;
+};
+
+// Length of the token k-grams and of the winnowing window. Any match of
+// at least kgramSize + winnowSize - 1 tokens is guaranteed to be found.
+const kgramSize = 4;
+const winnowSize = 3;
+
+// Window sizes (in lines) indexed. Each window overlaps the next by half.
+const windowSizes = [2, 4, 8, 16, 32];
+
+// MinHash signatures have bands * rows values. Windows that agree on every
+// row of any band land in the same bucket. (With 16 bands of 2 rows,
+// windows with a Jaccard similarity of about 0.25 or more are likely to
+// share a bucket.)
+const bands = 16;
+const rows = 2;
+
+/////////////////////////////////////////////////////////////
+//
+// Fingerprints
+//
+/////////////////////////////////////////////////////////////
+
+const tokenPattern =
+  /[A-Za-z_]\w*|\d+(?:\.\d+)?|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|\S/g;
+
+export function tokenize(text: string): { text: string; line: number }[] {
+  const tokens: { text: string; line: number }[] = [];
+  for (const [line, lineText] of text.split("\n").entries()) {
+    for (const match of lineText.matchAll(tokenPattern)) {
+      tokens.push({ text: match[0], line });
+    }
+  }
+  return tokens;
+}
+
+// 32-bit FNV-1a
+function hashString(str: string) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < str.length; i++) {
+    hash ^= str.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+// The finalizer from MurmurHash3 (a cheap, well-mixed 32-bit permutation)
+function mix(value: number) {
+  let h = value >>> 0;
+  h ^= h >>> 16;
+  h = Math.imul(h, 0x85ebca6b);
+  h ^= h >>> 13;
+  h = Math.imul(h, 0xc2b2ae35);
+  h ^= h >>> 16;
+  return h >>> 0;
+}
+
+// Select fingerprints from the k-gram hashes by winnowing: In each window
+// of winnowSize consecutive hashes, keep the (rightmost) minimum.
+export function fingerprint(text: string): Fingerprint[] {
+  const tokens = tokenize(text);
+  const grams: Fingerprint[] = [];
+  for (let i = 0; i + kgramSize <= tokens.length; i++) {
+    const gram = tokens.slice(i, i + kgramSize);
+    grams.push({
+      hash: hashString(gram.map((token) => token.text).join("\u0000")),
+      startLine: gram[0].line,
+      endLine: gram[kgramSize - 1].line,
+    });
+  }
+  if (grams.length <= winnowSize) {
+    return grams;
+  }
+
+  const fingerprints: Fingerprint[] = [];
+  let selected = -1;
+  for (let start = 0; start + winnowSize <= grams.length; start++) {
+    let min = start;
+    for (let i = start + 1; i < start + winnowSize; i++) {
+      if (grams[i].hash <= grams[min].hash) {
+        min = i;
+      }
+    }
+    if (min !== selected) {
+      fingerprints.push(grams[min]);
+      selected = min;
+    }
+  }
+  return fingerprints;
+}
+
+/////////////////////////////////////////////////////////////
+//
+// MinHash / LSH
+//
+/////////////////////////////////////////////////////////////
+
+const seeds = Array.from({ length: bands * rows }, (_, i) =>
+  mix(0x9e3779b9 * (i + 1))
+);
+
+function minHash(hashes: Iterable<number>): number[] | undefined {
+  const signature = seeds.map(() => 0xffffffff);
+  let empty = true;
+  for (const hash of hashes) {
+    empty = false;
+    for (let i = 0; i < seeds.length; i++) {
+      const value = mix(hash ^ seeds[i]);
+      if (value < signature[i]) {
+        signature[i] = value;
+      }
+    }
+  }
+  return empty ? undefined : signature;
+}
+
+// Each fingerprint's hash mixed with every seed (seeds.length values per
+// fingerprint), computed once per file rather than once per window.
+function mixedHashes(fingerprints: Fingerprint[]) {
+  const mixed = new Uint32Array(fingerprints.length * seeds.length);
+  for (let f = 0; f < fingerprints.length; f++) {
+    for (let i = 0; i < seeds.length; i++) {
+      mixed[f * seeds.length + i] = mix(fingerprints[f].hash ^ seeds[i]);
+    }
+  }
+  return mixed;
+}
+
+// The MinHash signature of fingerprints [from, to).
+function minHashRange(mixed: Uint32Array, from: number, to: number) {
+  if (from >= to) {
+    return undefined;
+  }
+  const signature = seeds.map(() => 0xffffffff);
+  for (let f = from; f < to; f++) {
+    for (let i = 0; i < seeds.length; i++) {
+      const value = mixed[f * seeds.length + i];
+      if (value < signature[i]) {
+        signature[i] = value;
+      }
+    }
+  }
+  return signature;
+}
+
+// Bucket keys are hashes of (window size, band, band's rows). A collision
+// only adds a candidate, which is then scored like any other.
+function bucketKeys(size: number, signature: number[]) {
+  const keys: number[] = [];
+  for (let band = 0; band < bands; band++) {
+    let key = mix(Math.imul(size, 0x9e3779b9) ^ band);
+    for (let row = band * rows; row < (band + 1) * rows; row++) {
+      key = mix(key ^ signature[row]);
+    }
+    keys.push(key);
+  }
+  return keys;
+}
+
+type IndexedFile = {
+  fileId: string;
+  // Sorted by startLine
+  fingerprints: Fingerprint[];
+};
+
+// The LSH buckets: a multimap from bucket key to window id. Indexing a
+// course produces millions of (key, window) pairs, most in buckets of
+// their own, so rather than a Map (whose per-entry overhead dominates,
+// and which V8 limits to 2^24 entries) the pairs are kept in typed arrays
+// sorted by key. New pairs are appended, then sorted in before the next
+// lookup.
+class BucketTable {
+  private keys = new Uint32Array(0);
+  private windowIds = new Uint32Array(0);
+  private size = 0;
+  private sorted = 0;
+
+  add(key: number, windowId: number) {
+    if (this.size === this.keys.length) {
+      const capacity = Math.max(1024, this.size * 2);
+      const keys = new Uint32Array(capacity);
+      const windowIds = new Uint32Array(capacity);
+      keys.set(this.keys);
+      windowIds.set(this.windowIds);
+      this.keys = keys;
+      this.windowIds = windowIds;
+    }
+    this.keys[this.size] = key;
+    this.windowIds[this.size] = windowId;
+    this.size++;
+  }
+
+  windowsIn(key: number): Uint32Array {
+    if (this.sorted < this.size) {
+      this.sort();
+    }
+    let low = 0;
+    let high = this.size;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (this.keys[mid] < key) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+    let end = low;
+    while (end < this.size && this.keys[end] === key) {
+      end++;
+    }
+    return this.windowIds.subarray(low, end);
+  }
+
+  // LSD radix sort (two 16-bit digits) of every pair by key.
+  private sort() {
+    let keys = this.keys.subarray(0, this.size);
+    let windowIds = this.windowIds.subarray(0, this.size);
+    let keysOut = new Uint32Array(this.size);
+    let windowIdsOut = new Uint32Array(this.size);
+    for (const shift of [0, 16]) {
+      const counts = new Uint32Array(0x10001);
+      for (let i = 0; i < keys.length; i++) {
+        counts[((keys[i] >>> shift) & 0xffff) + 1]++;
+      }
+      for (let digit = 0; digit < 0x10000; digit++) {
+        counts[digit + 1] += counts[digit];
+      }
+      for (let i = 0; i < keys.length; i++) {
+        const to = counts[(keys[i] >>> shift) & 0xffff]++;
+        keysOut[to] = keys[i];
+        windowIdsOut[to] = windowIds[i];
+      }
+      [keys, keysOut] = [keysOut, keys];
+      [windowIds, windowIdsOut] = [windowIdsOut, windowIds];
+    }
+    // After an even number of passes, the result is back in the original arrays.
+    this.sorted = this.size;
+  }
+}
+
+type Window = {
+  file: IndexedFile;
+  startLine: number;
+  endLine: number;
+};
+
+export class SimilarityIndex {
+  private readonly files: IndexedFile[] = [];
+  private readonly windows: Window[] = [];
+  private readonly buckets = new BucketTable();
+
+  addFile(fileId: string, fingerprints: Fingerprint[]) {
+    const file: IndexedFile = {
+      fileId,
+      fingerprints: [...fingerprints].sort((a, b) => a.startLine - b.startLine),
+    };
+    this.files.push(file);
+    if (file.fingerprints.length === 0) {
+      return;
+    }
+    const mixed = mixedHashes(file.fingerprints);
+    const lastLine = file.fingerprints[file.fingerprints.length - 1].startLine;
+    for (const size of windowSizes) {
+      const stride = Math.max(1, size / 2);
+      for (let startLine = 0; startLine <= lastLine; startLine += stride) {
+        const endLine = startLine + size - 1;
+        const signature = minHashRange(
+          mixed,
+          firstStartingAt(file.fingerprints, startLine),
+          firstStartingAt(file.fingerprints, endLine + 1)
+        );
+        if (!signature) {
+          continue;
+        }
+        const windowId = this.windows.length;
+        this.windows.push({ file, startLine, endLine });
+        for (const key of bucketKeys(size, signature)) {
+          this.buckets.add(key, windowId);
+        }
+      }
+    }
+  }
+
+  get fileCount() {
+    return this.files.length;
+  }
+
+  // Find the region in each file (other than the excluded ones) most
+  // similar to the snippet. Results are sorted by decreasing score.
+  query(
+    snippet: string,
+    options: { minScore?: number; exclude?: (fileId: string) => boolean } = {}
+  ): SimilarMatch[] {
+    const minScore = options.minScore ?? 0.5;
+    const queryHashes = new Set(fingerprint(snippet).map((fp) => fp.hash));
+    const signature = minHash(queryHashes);
+    if (!signature) {
+      return [];
+    }
+
+    // Look in the buckets for windows about the size of the snippet.
+    const lineCount = snippet.split("\n").length;
+    const closest = windowSizes.findIndex((size) => size >= lineCount);
+    const sizes =
+      closest < 0
+        ? windowSizes.slice(-1)
+        : windowSizes.slice(closest, closest + 2);
+    const candidates = new Set<number>();
+    for (const size of sizes) {
+      for (const key of bucketKeys(size, signature)) {
+        for (const windowId of this.buckets.windowsIn(key)) {
+          candidates.add(windowId);
+        }
+      }
+    }
+
+    const best = new Map<string, SimilarMatch>();
+    for (const windowId of candidates) {
+      const window = this.windows[windowId];
+      if (options.exclude?.(window.file.fileId)) {
+        continue;
+      }
+      // A snippet may straddle two windows, so look a little beyond the window.
+      const margin = window.endLine - window.startLine;
+      const match = densestRegion(
+        linesBetween(
+          window.file.fingerprints,
+          window.startLine - margin,
+          window.endLine + margin
+        ),
+        queryHashes,
+        lineCount
+      );
+      const previous = best.get(window.file.fileId);
+      if (match && match.score >= minScore && (!previous || match.score > previous.score)) {
+        best.set(window.file.fileId, { fileId: window.file.fileId, ...match });
+      }
+    }
+    return Array.from(best.values()).sort((a, b) => b.score - a.score);
+  }
+}
+
+// The fingerprints (sorted by startLine) that start between
+// startLine and endLine (inclusive).
+function linesBetween(
+  fingerprints: Fingerprint[],
+  startLine: number,
+  endLine: number
+) {
+  return fingerprints.slice(
+    firstStartingAt(fingerprints, startLine),
+    firstStartingAt(fingerprints, endLine + 1)
+  );
+}
+
+// The index of the first fingerprint (sorted by startLine) that starts
+// on or after line.
+function firstStartingAt(fingerprints: Fingerprint[], line: number) {
+  let low = 0;
+  let high = fingerprints.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (fingerprints[mid].startLine < line) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+// The span of (at most about) lineCount lines containing the most distinct
+// query fingerprints.
+function densestRegion(
+  fingerprints: Fingerprint[],
+  queryHashes: ReadonlySet<number>,
+  lineCount: number
+) {
+  const matched = fingerprints.filter((fp) => queryHashes.has(fp.hash));
+  let best: Omit<SimilarMatch, "fileId"> | undefined;
+  for (let first = 0; first < matched.length; first++) {
+    const distinct = new Set<number>();
+    let endLine = matched[first].endLine;
+    for (
+      let last = first;
+      last < matched.length &&
+      matched[last].startLine < matched[first].startLine + lineCount;
+      last++
+    ) {
+      distinct.add(matched[last].hash);
+      endLine = Math.max(endLine, matched[last].endLine);
+    }
+    const score = distinct.size / queryHashes.size;
+    if (!best || score > best.score) {
+      best = { startLine: matched[first].startLine, endLine, score };
+    }
+  }
+  return best;
+}
@@ -0,0 +1,37 @@
+/************************************************************************************
+ *
+ * streamWriter.ts
+ *
+ * Write generated output through a write stream one chunk at a time, so large
+ * files (e.g., the instructor's combined question page) never need to be
+ * assembled in memory.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import { once } from "events";
+
+// Write each chunk to filePath, respecting back-pressure from the stream.
+// Resolves once the file has been completely flushed and closed.
+export async function writeChunks(
+  filePath: string,
+  chunks: Iterable<string>
+): Promise<void> {
+  const stream = fs.createWriteStream(filePath, { encoding: "utf8" });
+  try {
+    for (const chunk of chunks) {
+      if (!stream.write(chunk)) {
+        await once(stream, "drain");
+      }
+    }
+  } catch (err) {
+    stream.destroy();
+    throw err;
+  }
+  stream.end();
+  await once(stream, "finish");
+}
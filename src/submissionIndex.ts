@@ -0,0 +1,325 @@
+/************************************************************************************
+ *
+ * submissionIndex.ts
+ *
+ * An index of the files each student submitted: For every student folder
+ * under the submission root, the size, modification time, and content hash
+ * of each file.
+ *
+ * scanSubmissions walks the submission tree (in parallel). Given the index
+ * from a previous scan, it re-hashes only files whose size or modification
+ * time has changed. The hashing itself is done by a FileHasher, so that it can
+ * be moved off the calling thread (see workerPool.ts). updateSubmissionPath and
+ * removeSubmissionPath keep an index current as individual files change.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+import { createHash } from "crypto";
+
+import { makeLimiter, Limiter } from "./limiter";
+import { GVQLC } from "./sharedConstants";
+
+export type SubmissionFile = {
+  size: number;
+  mtimeMs: number;
+  // sha1 of the file's content
+  hash: string;
+};
+
+// The result of hashing one file.
+export type FileHash =
+  | { filePath: string; size: number; mtimeMs: number; hash: string }
+  | { filePath: string; error: string };
+
+export type HashOptions = {
+  signal?: AbortSignal;
+  // Called with each batch of results as they become available.
+  onBatch?: (results: FileHash[]) => void;
+};
+
+// Hash a list of files. The results may be in any order.
+export type FileHasher = (
+  filePaths: string[],
+  options?: HashOptions
+) => Promise<FileHash[]>;
+
+export type SubmissionIndex = {
+  root: string;
+  // student -> ('/'-separated path relative to the student's folder -> file)
+  students: Record<string, Record<string, SubmissionFile>>;
+};
+
+// Maximum number of file system operations in flight at once.
+const maxConcurrency = 32;
+
+// Hidden files and folders (.git, .DS_Store, etc.) are not part of a submission.
+function isIndexed(name: string) {
+  return !name.startsWith(".");
+}
+
+// gvQLC's own folders in the submission root (exported quizzes, template
+// overrides, etc.) are named gvQLC-something. They aren't students either.
+export function isStudentFolder(name: string) {
+  return isIndexed(name) && !name.startsWith(GVQLC);
+}
+
+export function emptySubmissionIndex(root: string): SubmissionIndex {
+  return { root, students: {} };
+}
+
+export async function hashFile(filePath: string) {
+  const hash = createHash("sha1");
+  for await (const chunk of fs.createReadStream(filePath)) {
+    hash.update(chunk);
+  }
+  return hash.digest("hex");
+}
+
+export async function hashOneFile(filePath: string): Promise<FileHash> {
+  try {
+    const stats = await fs.promises.stat(filePath);
+    return {
+      filePath,
+      size: stats.size,
+      mtimeMs: stats.mtimeMs,
+      hash: await hashFile(filePath),
+    };
+  } catch (e) {
+    return { filePath, error: String(e) };
+  }
+}
+
+// Hash the files on the calling thread (at most maxConcurrency at a time).
+export const hashFilesInline: FileHasher = async (filePaths, options = {}) => {
+  const limit = makeLimiter(maxConcurrency);
+  return Promise.all(
+    filePaths.map((filePath) =>
+      limit(async () => {
+        options.signal?.throwIfAborted();
+        const result = await hashOneFile(filePath);
+        options.onBatch?.([result]);
+        return result;
+      })
+    )
+  );
+};
+
+// A file whose hash is needed, and where to put it once it is known.
+type HashNeeded = {
+  filePath: string;
+  files: Record<string, SubmissionFile>;
+  relative: string;
+};
+
+// Index every file below the student's folder. Files that have not changed
+// keep their cached entry. Files that must be (re-)hashed are added to needed.
+async function indexStudent(
+  studentFolder: string,
+  cached: Record<string, SubmissionFile>,
+  limit: Limiter,
+  needed: HashNeeded[],
+  signal?: AbortSignal
+) {
+  const files: Record<string, SubmissionFile> = {};
+  async function walk(relative: string): Promise<void> {
+    signal?.throwIfAborted();
+    const folder = path.join(studentFolder, ...relative.split("/"));
+    const dirents = await limit(() =>
+      fs.promises.readdir(folder, { withFileTypes: true })
+    );
+    await Promise.all(
+      dirents
+        .filter((dirent) => isIndexed(dirent.name))
+        .map(async (dirent) => {
+          const child = relative ? `${relative}/${dirent.name}` : dirent.name;
+          if (dirent.isDirectory()) {
+            await walk(child);
+          } else if (dirent.isFile()) {
+            const filePath = path.join(folder, dirent.name);
+            const stats = await limit(() => fs.promises.stat(filePath));
+            const previous = cached[child];
+            if (
+              previous &&
+              previous.size === stats.size &&
+              previous.mtimeMs === stats.mtimeMs
+            ) {
+              files[child] = previous;
+            } else {
+              needed.push({ filePath, files, relative: child });
+            }
+          }
+        })
+    );
+  }
+  await walk("");
+  return files;
+}
+
+// Fill in the hashes of the files that need them. (Files that could
+// not be read, e.g., because they were deleted, are left out.)
+async function hashNeeded(
+  needed: HashNeeded[],
+  hashFiles: FileHasher,
+  signal?: AbortSignal
+) {
+  if (needed.length === 0) {
+    return;
+  }
+  const byPath = new Map(needed.map((entry) => [entry.filePath, entry]));
+  const results = await hashFiles(Array.from(byPath.keys()), { signal });
+  for (const result of results) {
+    const entry = byPath.get(result.filePath);
+    if (entry && !("error" in result)) {
+      entry.files[entry.relative] = {
+        size: result.size,
+        mtimeMs: result.mtimeMs,
+        hash: result.hash,
+      };
+    }
+  }
+}
+
+export type ScanOptions = {
+  // Defaults to hashing on the calling thread.
+  hashFiles?: FileHasher;
+  signal?: AbortSignal;
+};
+
+// Scan the submissions below root. If previous is an index of the same root,
+// files whose size and modification time have not changed are not re-read.
+export async function scanSubmissions(
+  root: string,
+  previous?: SubmissionIndex,
+  options: ScanOptions = {}
+): Promise<SubmissionIndex> {
+  const cache =
+    previous && previous.root === root
+      ? previous
+      : emptySubmissionIndex(root);
+  const index = emptySubmissionIndex(root);
+  const limit = makeLimiter(maxConcurrency);
+  const needed: HashNeeded[] = [];
+
+  const dirents = await fs.promises.readdir(root, { withFileTypes: true });
+  await Promise.all(
+    dirents
+      .filter((dirent) => dirent.isDirectory() && isStudentFolder(dirent.name))
+      .map(async (dirent) => {
+        index.students[dirent.name] = await indexStudent(
+          path.join(root, dirent.name),
+          cache.students[dirent.name] ?? {},
+          limit,
+          needed,
+          options.signal
+        );
+      })
+  );
+  await hashNeeded(needed, options.hashFiles ?? hashFilesInline, options.signal);
+  return index;
+}
+
+export function studentNames(index: SubmissionIndex): string[] {
+  return Object.keys(index.students).sort();
+}
+
+// Split an absolute path into the student and the path within the student's
+// folder. Returns undefined for paths outside of any student's folder and for
+// paths that are not indexed.
+function locate(index: SubmissionIndex, filePath: string) {
+  const parts = path.relative(index.root, filePath).split(path.sep);
+  if (
+    parts.length === 0 ||
+    parts[0] === "" ||
+    parts[0] === ".." ||
+    path.isAbsolute(parts[0]) ||
+    !isStudentFolder(parts[0]) ||
+    !parts.every(isIndexed)
+  ) {
+    return undefined;
+  }
+  return { student: parts[0], relative: parts.slice(1).join("/") };
+}
+
+// Bring the index up to date after the file or folder at filePath
+// was created or changed. Returns true if the index changed.
+export async function updateSubmissionPath(
+  index: SubmissionIndex,
+  filePath: string,
+  hashFiles: FileHasher = hashFilesInline
+): Promise<boolean> {
+  const location = locate(index, filePath);
+  if (!location) {
+    return false;
+  }
+  let stats: fs.Stats;
+  try {
+    stats = await fs.promises.stat(filePath);
+  } catch {
+    return removeSubmissionPath(index, filePath);
+  }
+  const { student, relative } = location;
+  const files = index.students[student] ?? {};
+  if (stats.isDirectory()) {
+    // A new (or renamed) folder: Re-index the whole student folder. Unchanged
+    // files are not re-read.
+    const needed: HashNeeded[] = [];
+    const studentFiles = await indexStudent(
+      path.join(index.root, student),
+      files,
+      makeLimiter(maxConcurrency),
+      needed
+    );
+    await hashNeeded(needed, hashFiles);
+    index.students[student] = studentFiles;
+    return true;
+  }
+  if (!stats.isFile() || relative === "") {
+    return false;
+  }
+  const cached = files[relative];
+  if (
+    cached &&
+    cached.size === stats.size &&
+    cached.mtimeMs === stats.mtimeMs
+  ) {
+    return false;
+  }
+  index.students[student] = files;
+  await hashNeeded([{ filePath, files, relative }], hashFiles);
+  return true;
+}
+
+// Remove the file or folder at filePath (and, for a folder, everything
+// in it) from the index. Returns true if the index changed.
+export function removeSubmissionPath(
+  index: SubmissionIndex,
+  filePath: string
+): boolean {
+  const location = locate(index, filePath);
+  if (!location) {
+    return false;
+  }
+  const { student, relative } = location;
+  const files = index.students[student];
+  if (!files) {
+    return false;
+  }
+  if (relative === "") {
+    delete index.students[student];
+    return true;
+  }
+  let changed = false;
+  for (const entry of Object.keys(files)) {
+    if (entry === relative || entry.startsWith(`${relative}/`)) {
+      delete files[entry];
+      changed = true;
+    }
+  }
+  return changed;
+}
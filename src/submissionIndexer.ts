@@ -0,0 +1,162 @@
+/************************************************************************************
+ *
+ * submissionIndexer.ts
+ *
+ * Maintain the index of student submissions (see submissionIndex.ts) for the
+ * open workspace.
+ *
+ * The submission tree is walked once per session (re-hashing only files that
+ * changed since the index was last saved in the extension's storage). After
+ * that, a FileSystemWatcher keeps the index current, so anything that needs
+ * the list of students or their files can read it without touching the disk.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+import * as path from "path";
+
+import * as gvQLC from "./gvQLC";
+import * as Util from "./utilities";
+import { ConfigData } from "./types";
+import { submissionIndexFileName } from "./sharedConstants";
+import { log } from "./fileLogger";
+import { fieldBytes, objectHeaderBytes, registerMemoryReporter, stringBytes } from "./memoryReport";
+import {
+  SubmissionIndex,
+  isStudentFolder,
+  scanSubmissions,
+  studentNames,
+  updateSubmissionPath,
+  removeSubmissionPath,
+} from "./submissionIndex";
+
+// Wait this long after the last change before saving the index.
+const saveDelayMs = 2000;
+
+let indexPromise: Promise<SubmissionIndex> | null = null;
+let indexedRoot: string | null = null;
+let watcher: vscode.FileSystemWatcher | null = null;
+let saveTimer: NodeJS.Timeout | undefined;
+// Cancels the scan in progress (if any) when the index is replaced.
+let scanController: AbortController | null = null;
+// The most recently built index (for the memory report)
+let builtIndex: SubmissionIndex | null = null;
+
+registerMemoryReporter("Submissions", () => {
+  let files = 0;
+  let bytes = 0;
+  for (const studentFiles of Object.values(builtIndex?.students ?? {})) {
+    for (const [relativePath, file] of Object.entries(studentFiles)) {
+      files++;
+      bytes += stringBytes(relativePath) + stringBytes(file.hash) + objectHeaderBytes + 4 * fieldBytes;
+    }
+  }
+  return [{ structure: "submission index", items: files, bytes }];
+});
+
+function submissionDirectory(config: ConfigData) {
+  let directory = gvQLC.workspaceRoot().uri;
+  if (config.submissionRoot) {
+    directory = vscode.Uri.joinPath(directory, config.submissionRoot);
+  }
+  return directory;
+}
+
+function scheduleSave(index: SubmissionIndex) {
+  clearTimeout(saveTimer);
+  saveTimer = setTimeout(() => {
+    Util.saveCache(submissionIndexFileName, index).catch((e) =>
+      log.warn(`Unable to save the submission index: ${e}`)
+    );
+  }, saveDelayMs);
+}
+
+function watch(directory: vscode.Uri, index: SubmissionIndex) {
+  watcher = vscode.workspace.createFileSystemWatcher(
+    new vscode.RelativePattern(directory, "**/*")
+  );
+  // Events are applied one at a time, in order.
+  let pending = Promise.resolve();
+  const apply = (update: () => Promise<boolean> | boolean) => {
+    pending = pending
+      .then(async () => {
+        if (await update()) {
+          scheduleSave(index);
+        }
+      })
+      .catch((e) => log.warn(`Unable to update the submission index: ${e}`));
+  };
+  const update = (uri: vscode.Uri) =>
+    apply(() =>
+      updateSubmissionPath(index, uri.fsPath, gvQLC.workerPool().hashFiles)
+    );
+  watcher.onDidCreate(update);
+  watcher.onDidChange(update);
+  watcher.onDidDelete((uri) => apply(() => removeSubmissionPath(index, uri.fsPath)));
+  gvQLC.context().subscriptions.push(watcher);
+}
+
+// Files are hashed by the worker pool, off the extension host's thread.
+async function buildIndex(directory: vscode.Uri, signal: AbortSignal) {
+  const index = await scanSubmissions(
+    directory.fsPath,
+    Util.loadCache<SubmissionIndex>(submissionIndexFileName),
+    { hashFiles: gvQLC.workerPool().hashFiles, signal }
+  );
+  await Util.saveCache(submissionIndexFileName, index);
+  return index;
+}
+
+// The index of the submissions in the workspace. The first call builds the
+// index; later calls share it (unless submissionRoot has changed).
+export function submissionIndex(config: ConfigData): Promise<SubmissionIndex> {
+  const directory = submissionDirectory(config);
+  const root = path.normalize(directory.fsPath);
+  if (!indexPromise || indexedRoot !== root) {
+    watcher?.dispose();
+    watcher = null;
+    scanController?.abort();
+    scanController = new AbortController();
+    indexedRoot = root;
+    const promise = buildIndex(directory, scanController.signal);
+    indexPromise = promise;
+    promise.then(
+      (index) => {
+        // Don't watch an index that has already been replaced.
+        if (indexPromise === promise) {
+          builtIndex = index;
+          watch(directory, index);
+        }
+      },
+      () => {
+        // Try again next time.
+        if (indexPromise === promise) {
+          indexPromise = null;
+        }
+      }
+    );
+  }
+  return indexPromise;
+}
+
+// The names of all students with a folder in the submission root. Doesn't
+// wait for the index: Once the index is built, the names come from it.
+// Until then, they come from a listing of the submission root (and the index
+// is built in the background).
+export async function getAllStudentNames(config: ConfigData) {
+  const directory = submissionDirectory(config);
+  if (builtIndex && path.normalize(builtIndex.root) === path.normalize(directory.fsPath)) {
+    return studentNames(builtIndex);
+  }
+  submissionIndex(config).catch((e) =>
+    log.warn(`Unable to index the submissions: ${e}`)
+  );
+  const allStudents: string[] = [];
+  for (const [name, type] of await vscode.workspace.fs.readDirectory(directory)) {
+    if (type === vscode.FileType.Directory && isStudentFolder(name)) {
+      allStudents.push(name);
+    }
+  }
+  return allStudents.sort();
+}
@@ -0,0 +1,85 @@
+/************************************************************************************
+ *
+ * templateRegistry.ts
+ *
+ * Load, parse, and cache the Mustache templates used to render webviews and
+ * generated PL files.
+ *
+ * Each template is read and parsed once, then rendered from the cached parse
+ * tree. A template in the override folder (e.g., the workspace's
+ * gvQLC.templates/pl/question.mustache.html) takes precedence over the
+ * built-in template with the same name (views/pl/question.mustache.html).
+ * Whoever watches the override folder calls invalidate() when it changes.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+import * as Mustache from "mustache";
+
+// The views folder that ships with the extension (this file is
+// compiled to out/src/templateRegistry.js).
+export const builtinTemplateFolder = path.join(__dirname, "..", "..", "views");
+
+export class TemplateRegistry {
+  // The writer keeps its own cache of parse trees, keyed by template source.
+  private readonly writer = new Mustache.Writer();
+  private readonly sources = new Map<string, string>();
+
+  constructor(
+    readonly builtinFolder: string,
+    readonly overrideFolder?: string
+  ) {}
+
+  // The path of the file the named template is loaded from.
+  templatePath(name: string) {
+    const parts = name.split("/");
+    if (this.overrideFolder) {
+      const overridePath = path.join(this.overrideFolder, ...parts);
+      if (fs.existsSync(overridePath)) {
+        return overridePath;
+      }
+    }
+    return path.join(this.builtinFolder, ...parts);
+  }
+
+  // The source of the named template ('/'-separated path relative to the views folder).
+  template(name: string): string {
+    let source = this.sources.get(name);
+    if (source === undefined) {
+      source = fs.readFileSync(this.templatePath(name), "utf8");
+      this.writer.parse(source);
+      this.sources.set(name, source);
+    }
+    return source;
+  }
+
+  render(name: string, view: object): string {
+    return this.writer.render(this.template(name), view);
+  }
+
+  // Forget the named template (or every template) so that it
+  // is re-read the next time it is rendered.
+  invalidate(name?: string) {
+    if (name === undefined) {
+      this.sources.clear();
+    } else {
+      this.sources.delete(name);
+    }
+    this.writer.clearCache();
+  }
+}
+
+let builtinRegistry: TemplateRegistry | undefined;
+
+// A registry of the built-in templates only (for use outside of the extension).
+export function builtinTemplates(): TemplateRegistry {
+  if (!builtinRegistry) {
+    builtinRegistry = new TemplateRegistry(builtinTemplateFolder);
+  }
+  return builtinRegistry;
+}
@@ -0,0 +1,248 @@
+/************************************************************************************
+ *
+ * tracing.ts
+ *
+ * Lightweight timing of the phases of each command (load, group, label,
+ * render, post, write, ...).
+ *
+ * A command's handler is wrapped with tracedCommand. Each call is a "run",
+ * and the phases timed (with traced, tracedSync, or startSpan) while it
+ * runs are recorded as spans of that run, even across awaits. Timing
+ * outside a run costs (almost) nothing, so vscode-free code can be
+ * instrumented too. The most recent runs are kept in memory and can be
+ * exported in the Chrome trace-event format (chromeTrace; open the file in
+ * chrome://tracing or https://ui.perfetto.dev) or summarized
+ * (describeRuns).
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { AsyncLocalStorage } from "async_hooks";
+import { performance } from "perf_hooks";
+
+export type Span = {
+  name: string;
+  // milliseconds (performance.now())
+  start: number;
+  duration: number;
+  // 0 for the phases of the command itself; 1 for phases within those; ...
+  depth: number;
+  args?: Record<string, unknown>;
+};
+
+export type Run = {
+  id: number;
+  name: string;
+  // Wall-clock time the run started (for display)
+  startedAt: number;
+  start: number;
+  // undefined until the run finishes
+  duration?: number;
+  failed?: boolean;
+  spans: Span[];
+};
+
+// Keep this many of the most recent runs.
+const maxRuns = 50;
+
+const runs: Run[] = [];
+let nextRunId = 1;
+const context = new AsyncLocalStorage<{ run: Run; depth: number }>();
+
+function record(
+  run: Run,
+  name: string,
+  depth: number,
+  start: number,
+  args?: Record<string, unknown>
+) {
+  run.spans.push({ name, start, duration: performance.now() - start, depth, args });
+}
+
+// Time a run of the named command.
+export async function traceRun<T>(name: string, fn: () => T | Promise<T>): Promise<T> {
+  const run: Run = {
+    id: nextRunId++,
+    name,
+    startedAt: Date.now(),
+    start: performance.now(),
+    spans: [],
+  };
+  runs.push(run);
+  if (runs.length > maxRuns) {
+    runs.shift();
+  }
+  try {
+    return await context.run({ run, depth: 0 }, fn);
+  } catch (e) {
+    run.failed = true;
+    throw e;
+  } finally {
+    run.duration = performance.now() - run.start;
+  }
+}
+
+// Wrap a command handler so that each call is traced as a run.
+export function tracedCommand<A extends unknown[], T>(
+  name: string,
+  handler: (...args: A) => T | Promise<T>
+) {
+  return (...args: A) => traceRun(name, () => handler(...args));
+}
+
+// Time one phase of the current run.
+export async function traced<T>(
+  name: string,
+  fn: () => T | Promise<T>,
+  args?: Record<string, unknown>
+): Promise<T> {
+  const current = context.getStore();
+  if (!current) {
+    return fn();
+  }
+  const start = performance.now();
+  try {
+    return await context.run({ run: current.run, depth: current.depth + 1 }, fn);
+  } finally {
+    record(current.run, name, current.depth, start, args);
+  }
+}
+
+export function tracedSync<T>(
+  name: string,
+  fn: () => T,
+  args?: Record<string, unknown>
+): T {
+  const current = context.getStore();
+  if (!current) {
+    return fn();
+  }
+  const start = performance.now();
+  try {
+    return context.run({ run: current.run, depth: current.depth + 1 }, fn);
+  } finally {
+    record(current.run, name, current.depth, start, args);
+  }
+}
+
+// Start timing a phase that ends in a callback (e.g., when a webview
+// reports that it has loaded). Call the returned function when it ends.
+export function startSpan(name: string, args?: Record<string, unknown>) {
+  const current = context.getStore();
+  if (!current) {
+    return () => {};
+  }
+  const start = performance.now();
+  let ended = false;
+  return () => {
+    if (!ended) {
+      ended = true;
+      record(current.run, name, current.depth, start, args);
+    }
+  };
+}
+
+// Oldest first
+export function recentRuns(): Run[] {
+  return [...runs];
+}
+
+// The runs in the Chrome trace-event format. Each run is shown as its own
+// thread, so overlapping runs don't overlap in the display.
+export function chromeTrace(traceRuns = recentRuns()) {
+  const microseconds = (ms: number) => Math.round(ms * 1000);
+  const traceEvents: Record<string, unknown>[] = [];
+  for (const run of traceRuns) {
+    traceEvents.push({
+      name: "thread_name",
+      ph: "M",
+      pid: 1,
+      tid: run.id,
+      args: { name: `${run.name} #${run.id}` },
+    });
+    traceEvents.push({
+      name: run.name,
+      cat: "command",
+      ph: "X",
+      pid: 1,
+      tid: run.id,
+      ts: microseconds(run.start),
+      dur: microseconds(run.duration ?? performance.now() - run.start),
+      args: { startedAt: new Date(run.startedAt).toISOString(), failed: !!run.failed },
+    });
+    for (const span of run.spans) {
+      traceEvents.push({
+        name: span.name,
+        cat: "phase",
+        ph: "X",
+        pid: 1,
+        tid: run.id,
+        ts: microseconds(span.start),
+        dur: microseconds(span.duration),
+        args: span.args ?? {},
+      });
+    }
+  }
+  return { traceEvents, displayTimeUnit: "ms" };
+}
+
+function ms(value: number) {
+  return value.toFixed(1);
+}
+
+// A Markdown summary of the runs (most recent first): for each run, the
+// time spent in each phase; then, for each command, its typical time.
+export function describeRuns(traceRuns = recentRuns()): string {
+  const lines = ["# gvQLC Performance Report", ""];
+  if (traceRuns.length === 0) {
+    lines.push("No commands have been run yet.");
+    return lines.join("\n");
+  }
+
+  const byCommand = new Map<string, number[]>();
+  for (const run of traceRuns) {
+    if (run.duration !== undefined) {
+      byCommand.set(run.name, [...(byCommand.get(run.name) ?? []), run.duration]);
+    }
+  }
+  lines.push("| Command | Runs | Median (ms) | Max (ms) |", "|---|---:|---:|---:|");
+  for (const [name, durations] of byCommand) {
+    const sorted = [...durations].sort((a, b) => a - b);
+    lines.push(
+      `| ${name} | ${sorted.length} | ${ms(sorted[Math.floor(sorted.length / 2)])} | ${ms(sorted[sorted.length - 1])} |`
+    );
+  }
+  lines.push("");
+
+  for (const run of [...traceRuns].reverse()) {
+    const total = run.duration === undefined ? "(running)" : `${ms(run.duration)} ms`;
+    lines.push(
+      `## ${run.name} #${run.id}: ${total}${run.failed ? " (failed)" : ""}`,
+      "",
+      new Date(run.startedAt).toLocaleString(),
+      ""
+    );
+    if (run.spans.length === 0) {
+      continue;
+    }
+    // Phases in the order they started; repeated phases are combined.
+    const phases = new Map<string, { calls: number; total: number; max: number }>();
+    for (const span of [...run.spans].sort((a, b) => a.start - b.start)) {
+      const name = `${"&nbsp;&nbsp;".repeat(span.depth)}${span.name}`;
+      const phase = phases.get(name) ?? { calls: 0, total: 0, max: 0 };
+      phase.calls++;
+      phase.total += span.duration;
+      phase.max = Math.max(phase.max, span.duration);
+      phases.set(name, phase);
+    }
+    lines.push("| Phase | Calls | Total (ms) | Max (ms) |", "|---|---:|---:|---:|");
+    for (const [name, phase] of phases) {
+      lines.push(`| ${name} | ${phase.calls} | ${ms(phase.total)} | ${ms(phase.max)} |`);
+    }
+    lines.push("");
+  }
+  return lines.join("\n");
+}
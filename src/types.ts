@@ -33,5 +33,5 @@ export interface ConfigData {
   pl_assessment_root: string;
   pl_quiz_folder: string;
 
-  [key: string]: string | number | boolean | null | Record<string, string>;
+  [key: string]: string | number | boolean | null | string[] | Record<string, string>;
 }
\ No newline at end of file
@@ -10,30 +10,18 @@
 import * as vscode from "vscode";
 import * as path from "path";
 import * as fs from "fs";
-import * as Mustache from "mustache";
 
 import * as gvQLC from "./gvQLC";
 import {
   GVQLC,
-  ViewColors,
   configFileName,
   quizQuestionsFileName,
 } from "./sharedConstants";
-import { ConfigData } from "./types";
 
 import { logToFile } from "./fileLogger";
 
-export function escapeHtmlAttr(str: string) {
-  console.log("In: ", str);
-  const ans= String(str)
-    .replace(/&/g, "&amp;") // must go first
-    .replace(/"/g, "&quot;") // double quotes
-    .replace(/'/g, "&#39;") // single quotes
-    .replace(/</g, "&lt;") // optional
-    .replace(/>/g, "&gt;"); // optional
-  console.log("Out: ", ans);
-  return ans;
-};
+export { escapeHtmlAttr } from "./htmlEscape";
+export { chooseQuestionColor } from "./questionView";
 
 function _primaryFolderPath() {
   return vscode.workspace.workspaceFolders![0].uri.fsPath;
@@ -69,6 +57,26 @@ function verifyAndSetWorkspaceRoot() {
   return true;
 }
 
+// Ask a question in a modal message. Modal messages don't play nice with the
+// automated tester, so, when testing, the question is shown as a notification
+// (marked "(modal)") instead.
+function showModal(
+  show: (message: string, options: vscode.MessageOptions, ...items: string[]) => Thenable<string | undefined>,
+  message: string,
+  items: string[]
+) {
+  const isTestEnv = process.env.VSCODE_TEST_ZK === "true";
+  return show(isTestEnv ? `${message} (modal)` : message, { modal: !isTestEnv }, ...items);
+}
+
+export function showModalWarning(message: string, ...items: string[]) {
+  return showModal(vscode.window.showWarningMessage, message, items);
+}
+
+export function showModalInformation(message: string, ...items: string[]) {
+  return showModal(vscode.window.showInformationMessage, message, items);
+}
+
 // Helper function to get the workspace directory
 export function getWorkspaceDirectory() {
   if (vscode.workspace.workspaceFolders) {
@@ -138,12 +146,55 @@ export function ensureGitignoreForQuizQuestionsFile() {
   }
 }
 
+// Student names resolved so far (keyed by filePath). The names depend
+// on submissionRoot, so the cache is cleared when submissionRoot changes.
+const studentNameCache = new Map<string, string>();
+let studentNameCacheRoot: string | null = null;
+
+// Determine which student a (workspace-relative) file belongs to.
+// Each filePath is resolved only once per submissionRoot.
+export function extractStudentName(
+  filePath: string,
+  submissionRoot: string | null
+): string {
+  if (submissionRoot !== studentNameCacheRoot) {
+    studentNameCache.clear();
+    studentNameCacheRoot = submissionRoot;
+  }
+  let studentName = studentNameCache.get(filePath);
+  if (studentName === undefined) {
+    studentName = resolveStudentName(filePath, submissionRoot);
+    studentNameCache.set(filePath, studentName);
+  }
+  return studentName;
+}
+
+// The common layout: submissions directly in the workspace root, and a
+// plain relative path like "student/file.py". Returns undefined for
+// paths that need to be normalized first.
+function leadingFolder(filePath: string) {
+  // (path.normalize only treats '\\' as a separator on Windows.)
+  const end =
+    path.sep === "/" ? filePath.indexOf("/") : filePath.search(/[\\/]/);
+  if (end <= 0 || filePath.includes("..")) {
+    return undefined;
+  }
+  const first = filePath.slice(0, end);
+  return first === "." ? undefined : first;
+}
+
 // TODO Still need to handle error cases (empty filePath,
 // file path does not contain submissionRoot, etc.)
-export function extractStudentName(
+function resolveStudentName(
   filePath: string,
   submissionRoot: string | null
 ): string {
+  if (!submissionRoot || submissionRoot === ".") {
+    const studentName = leadingFolder(filePath);
+    if (studentName !== undefined) {
+      return studentName;
+    }
+  }
   const normalizedPath = path.normalize(filePath);
   const parts = normalizedPath
     .split(path.sep)
@@ -206,9 +257,7 @@ export function loadPersistedData() {
   if (verifyAndSetWorkspaceRoot()) {
     state.commentsData.push(...loadDataFromFile("commentsData.json"));   // zk Not presently used
     state.questionsData.push(...loadDataFromFile("questionsData.json")); // zk Not presently used
-    state.personalizedQuestionsData.push(
-      ...loadDataFromFile(quizQuestionsFileName)
-    );
+    state.questions.addAll(loadDataFromFile(quizQuestionsFileName));
 
     // Ensure quizQuestionsFileName is in .gitignore
     // I forgot why I thought I needed this.  It _is_ necessary if the project root is 
@@ -221,33 +270,8 @@ export function loadPersistedData() {
   return false;
 }
 
-export async function getAllStudentNames(config: ConfigData) {
-  const allStudents = new Set<string>();
-  let submissionDirectory = gvQLC.workspaceRoot().uri;
-  if (config.submissionRoot) {
-    submissionDirectory = vscode.Uri.joinPath(
-      submissionDirectory,
-      config.submissionRoot
-    );
-  }
-  const files = await vscode.workspace.fs.readDirectory(submissionDirectory);
-  for (const [name, type] of files) {
-    if (type === vscode.FileType.Directory && !name.startsWith(".")) {
-      allStudents.add(name);
-    }
-  }
-  return Array.from(allStudents).sort();
-}
-
 export function renderMustache(filename: string, data: any): string {
-  const templatePath = path.join(
-    gvQLC.context().extensionPath,
-    "views",
-    filename
-  );
-  const template = fs.readFileSync(templatePath, "utf8");
-  const rendered = Mustache.render(template, data);
-  return rendered;
+  return gvQLC.templates().render(filename, data);
 }
 
 export async function saveDataToFile(
@@ -275,18 +299,25 @@ export async function saveDataToFile(
   await vscode.workspace.fs.writeFile(uri, Buffer.from(output));
 }
 
-export function chooseQuestionColor(
-  numQuestionsForStudent: number,
-  modeQuestionsForStudent: number
-) {
-  if (numQuestionsForStudent === 0) {
-    return ViewColors.RED;
-  } else if (numQuestionsForStudent > modeQuestionsForStudent) {
-    return ViewColors.BLUE;
-  } else if (numQuestionsForStudent === modeQuestionsForStudent) {
-    return ViewColors.GREEN;
-  } else {
-    // if (numQuestionsForStudent < modeQuestionsForStudent)
-    return ViewColors.YELLOW;
+// Caches are kept in the extension's (workspace-specific) storage area
+// rather than in the workspace itself. A missing or unreadable cache
+// simply means starting from scratch.
+function cachePath(fileName: string) {
+  const context = gvQLC.context();
+  const storageUri = context.storageUri ?? context.globalStorageUri;
+  return path.join(storageUri.fsPath, fileName);
+}
+
+export function loadCache<T>(fileName: string): T | undefined {
+  try {
+    return JSON.parse(fs.readFileSync(cachePath(fileName), "utf-8")) as T;
+  } catch {
+    return undefined;
   }
 }
+
+export async function saveCache(fileName: string, data: unknown) {
+  const filePath = cachePath(fileName);
+  await fs.promises.mkdir(path.dirname(filePath), { recursive: true });
+  await fs.promises.writeFile(filePath, JSON.stringify(data));
+}
@@ -0,0 +1,86 @@
+/************************************************************************************
+ *
+ * warmup.ts
+ *
+ * Optionally (see the gvqlc.warmup setting), do the work the first command
+ * would otherwise do (loading the questions and config, indexing the
+ * submissions, parsing the templates, loading the view code) while the
+ * editor is idle after activation.
+ *
+ * Each step runs in its own slice, yielding to the extension host between
+ * slices. The steps use the same memoized loaders the commands use, so a
+ * command that runs during the warmup shares any step already in progress
+ * (and simply does any step not yet started itself) rather than waiting
+ * for the warmup.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as vscode from "vscode";
+import * as fs from "fs";
+import * as path from "path";
+
+import * as gvQLC from "./gvQLC";
+import * as Util from "./utilities";
+import { configFileName, quizQuestionsFileName } from "./sharedConstants";
+import { log } from "./fileLogger";
+import { submissionIndex } from "./submissionIndexer";
+import { traceRun, traced } from "./tracing";
+
+const viewTemplates = ["quizQuestions.mustache.html"];
+const plTemplates = [
+  "pl/question.mustache.html",
+  "pl/combinedHeader.mustache.html",
+  "pl/combinedStudent.mustache.html",
+  "pl/combinedQuestion.mustache.html",
+];
+
+function nextSlice() {
+  return new Promise<void>((resolve) => setImmediate(resolve));
+}
+
+export async function warmUp() {
+  const folders = vscode.workspace.workspaceFolders;
+  if (!folders || folders.length !== 1) {
+    return;
+  }
+  // Only warm up a workspace that already has gvQLC data. (In particular,
+  // never create a config file.)
+  const root = folders[0].uri.fsPath;
+  if (!fs.existsSync(path.join(root, quizQuestionsFileName))) {
+    return;
+  }
+  const hasConfig = fs.existsSync(path.join(root, configFileName));
+
+  const steps: [string, () => unknown][] = [
+    ["load", () => Util.loadPersistedData()],
+    ["modules", () => require("./commands/viewQuizQuestions")],
+    ["templates", () => viewTemplates.forEach((name) => gvQLC.templates().template(name))],
+  ];
+  if (hasConfig) {
+    steps.push(
+      ["config", () => gvQLC.config()],
+      ["submissionIndex", async () => submissionIndex(await gvQLC.config())],
+      [
+        "plTemplates",
+        async () => {
+          if ((await gvQLC.config()).pl_ready) {
+            plTemplates.forEach((name) => gvQLC.templates().template(name));
+          }
+        },
+      ]
+    );
+  }
+
+  await traceRun("warmup", async () => {
+    for (const [name, step] of steps) {
+      await nextSlice();
+      try {
+        await traced(name, step);
+      } catch (e) {
+        // The command that needs this step will report the problem.
+        log.warn(`Warmup step ${name} failed: ${e}`);
+      }
+    }
+  });
+}
@@ -0,0 +1,242 @@
+/************************************************************************************
+ *
+ * workerPool.ts
+ *
+ * A pool of worker threads for CPU-heavy jobs that touch every student file
+ * (currently hashing), so that they don't tie up the extension host's thread.
+ *
+ * Each job is split into small tasks that idle workers take in turn, so the
+ * work stays balanced even when file sizes vary widely. Results are streamed
+ * back in batches as they are produced. A job can be cancelled with an
+ * AbortSignal: Queued tasks are dropped, and workers stop between files.
+ * The total number of files being read at once (across all workers) is capped.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as os from "os";
+import * as path from "path";
+import { Worker } from "worker_threads";
+
+import { FileHash, FileHasher, HashOptions } from "./submissionIndex";
+
+// Messages between the pool and hashWorker.ts
+export type HashRequest =
+  | { taskId: number; filePaths: string[] }
+  | { cancel: number };
+
+export type HashResponse = {
+  taskId: number;
+  results: FileHash[];
+  done: boolean;
+};
+
+export type WorkerData = {
+  // Maximum number of files this worker reads at once.
+  maxReads: number;
+  // Number of results a worker collects before sending them.
+  batchSize: number;
+};
+
+export type WorkerPoolOptions = {
+  size?: number;
+  // Maximum number of files read at once by the whole pool.
+  maxReads?: number;
+  // Number of files in each task.
+  taskSize?: number;
+  batchSize?: number;
+  // The compiled worker (defaults to hashWorker.js next to this file).
+  script?: string;
+};
+
+type Job = {
+  results: FileHash[];
+  remainingTasks: number;
+  cancelled: boolean;
+  onBatch?: (results: FileHash[]) => void;
+  resolve: (results: FileHash[]) => void;
+  reject: (error: unknown) => void;
+};
+
+type Task = {
+  id: number;
+  filePaths: string[];
+  job: Job;
+};
+
+type PoolWorker = {
+  worker: Worker;
+  task?: Task;
+};
+
+export class WorkerPool {
+  private readonly size: number;
+  private readonly taskSize: number;
+  private readonly workerData: WorkerData;
+  private readonly script: string;
+  private readonly workers: PoolWorker[] = [];
+  private readonly queue: Task[] = [];
+  private nextTaskId = 1;
+  private closed = false;
+
+  constructor(options: WorkerPoolOptions = {}) {
+    // Leave a core for the extension host.
+    this.size = Math.max(
+      1,
+      options.size ?? Math.min(4, os.availableParallelism() - 1)
+    );
+    this.taskSize = options.taskSize ?? 64;
+    this.workerData = {
+      maxReads: Math.max(1, Math.floor((options.maxReads ?? 32) / this.size)),
+      batchSize: options.batchSize ?? 64,
+    };
+    this.script = options.script ?? path.join(__dirname, "hashWorker.js");
+  }
+
+  // Hash the files using the pool's workers. (A FileHasher)
+  hashFiles: FileHasher = (filePaths: string[], options: HashOptions = {}) => {
+    return new Promise<FileHash[]>((resolve, reject) => {
+      if (this.closed) {
+        reject(new Error("The worker pool has been closed."));
+        return;
+      }
+      if (filePaths.length === 0) {
+        resolve([]);
+        return;
+      }
+      const job: Job = {
+        results: [],
+        remainingTasks: 0,
+        cancelled: false,
+        onBatch: options.onBatch,
+        resolve,
+        reject,
+      };
+      for (let i = 0; i < filePaths.length; i += this.taskSize) {
+        this.queue.push({
+          id: this.nextTaskId++,
+          filePaths: filePaths.slice(i, i + this.taskSize),
+          job,
+        });
+        job.remainingTasks++;
+      }
+
+      const signal = options.signal;
+      if (signal) {
+        if (signal.aborted) {
+          this.cancel(job, signal.reason);
+          return;
+        }
+        signal.addEventListener("abort", () => this.cancel(job, signal.reason), {
+          once: true,
+        });
+      }
+      this.dispatch();
+    });
+  };
+
+  private cancel(job: Job, reason: unknown) {
+    if (job.cancelled || job.remainingTasks === 0) {
+      return;
+    }
+    job.cancelled = true;
+    for (let i = this.queue.length - 1; i >= 0; i--) {
+      if (this.queue[i].job === job) {
+        this.queue.splice(i, 1);
+      }
+    }
+    for (const poolWorker of this.workers) {
+      if (poolWorker.task?.job === job) {
+        const request: HashRequest = { cancel: poolWorker.task.id };
+        poolWorker.worker.postMessage(request);
+      }
+    }
+    job.reject(reason ?? new Error("Cancelled"));
+  }
+
+  // Give queued tasks to idle workers (starting workers as needed).
+  private dispatch() {
+    while (this.queue.length > 0) {
+      let poolWorker = this.workers.find((w) => !w.task);
+      if (!poolWorker) {
+        if (this.workers.length >= this.size) {
+          return;
+        }
+        poolWorker = this.startWorker();
+      }
+      const task = this.queue.shift()!;
+      poolWorker.task = task;
+      const request: HashRequest = { taskId: task.id, filePaths: task.filePaths };
+      poolWorker.worker.postMessage(request);
+    }
+  }
+
+  private startWorker(): PoolWorker {
+    const worker = new Worker(this.script, { workerData: this.workerData });
+    const poolWorker: PoolWorker = { worker };
+    this.workers.push(poolWorker);
+
+    worker.on("message", (response: HashResponse) => {
+      const task = poolWorker.task;
+      if (!task || task.id !== response.taskId) {
+        return;
+      }
+      const job = task.job;
+      if (!job.cancelled && response.results.length > 0) {
+        job.results.push(...response.results);
+        job.onBatch?.(response.results);
+      }
+      if (response.done) {
+        poolWorker.task = undefined;
+        job.remainingTasks--;
+        if (!job.cancelled && job.remainingTasks === 0) {
+          job.resolve(job.results);
+        }
+        this.dispatch();
+      }
+    });
+
+    const fail = (error: unknown) => {
+      const index = this.workers.indexOf(poolWorker);
+      if (index < 0) {
+        return;
+      }
+      this.workers.splice(index, 1);
+      const task = poolWorker.task;
+      if (task && !task.job.cancelled) {
+        this.cancel(task.job, error);
+      }
+      if (!this.closed) {
+        this.dispatch();
+      }
+    };
+    worker.on("error", fail);
+    worker.on("exit", (code) =>
+      fail(new Error(`Hash worker exited with code ${code}`))
+    );
+    return poolWorker;
+  }
+
+  async close() {
+    this.closed = true;
+    // Every unfinished job (whether its tasks are queued or running) fails,
+    // since the workers' exits are ignored once they have been removed.
+    const jobs = new Set<Job>();
+    for (const task of this.queue) {
+      jobs.add(task.job);
+    }
+    for (const { task } of this.workers) {
+      if (task) {
+        jobs.add(task.job);
+      }
+    }
+    for (const job of jobs) {
+      this.cancel(job, new Error("The worker pool has been closed."));
+    }
+    const workers = this.workers.splice(0);
+    await Promise.all(workers.map(({ worker }) => worker.terminate()));
+  }
+}
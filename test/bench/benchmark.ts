@@ -0,0 +1,222 @@
+/************************************************************************************
+ *
+ * benchmark.ts
+ *
+ * Headless benchmarks of the work done by the extension's commands: building
+ * the question view's table, its first page, and answering its queries,
+ * indexing and searching the submissions for similar code, and emitting a
+ * PrairieLearn quiz. Runs with
+ * plain node (no VS Code, no Selenium) against synthetic courses.
+ *
+ *     npm run bench                  # the small and medium tiers
+ *     npm run bench -- small large   # chosen tiers
+ *
+ * Each tier runs in its own child process so that its peak memory (max RSS)
+ * is not affected by the other tiers.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as os from "os";
+import * as path from "path";
+import { fork } from "child_process";
+import { performance } from "perf_hooks";
+
+import { PersonalizedQuestionsData, ConfigData } from "../../src/types";
+import { quizQuestionsFileName } from "../../src/sharedConstants";
+import { QuestionStore } from "../../src/questionStore";
+import { questionViewData, summaryTableHTML } from "../../src/questionView";
+import { QuestionQuery, QuestionTable, defaultQuery } from "../../src/questionQuery";
+import { builtinTemplates } from "../../src/templateRegistry";
+import { SimilarityIndex, fingerprint } from "../../src/similarity";
+import { buildQuizIR } from "../../src/quizExport";
+import { selectQuizQuestions, planPLQuiz, writePLPlanToSink } from "../../src/plGenerator";
+import { FolderSink } from "../../src/outputSink";
+import {
+  courseTiers,
+  synthesizeCourse,
+  syntheticConfig,
+  writeSyntheticCourse,
+} from "../helpers/syntheticCourse";
+
+type StageResult = {
+  stage: string;
+  ms: number;
+  // Number of things (questions, files, etc.) processed
+  count: number;
+  unit: string;
+};
+
+type TierResult = {
+  tier: string;
+  students: number;
+  files: number;
+  questions: number;
+  stages: StageResult[];
+  // Peak resident set size of the tier's process (in bytes)
+  maxRSS: number;
+};
+
+const defaultTiers = ["small", "medium"];
+
+// The maximum number of similarity queries timed per tier.
+const maxQueries = 500;
+
+// The view queries timed per tier (each is also run in descending order).
+const viewQueries: Partial<QuestionQuery>[] = [
+  { sort: "student" },
+  { sort: "file" },
+  { sort: "questionLength" },
+  { search: "what" },
+  { excluded: "included", page: 3 },
+];
+
+async function stage<T>(
+  results: StageResult[],
+  name: string,
+  count: number,
+  unit: string,
+  fn: () => T | Promise<T>
+): Promise<T> {
+  const start = performance.now();
+  const value = await fn();
+  results.push({ stage: name, ms: performance.now() - start, count, unit });
+  return value;
+}
+
+async function runTier(tier: string): Promise<TierResult> {
+  const shape = courseTiers[tier];
+  const root = fs.mkdtempSync(path.join(os.tmpdir(), `gvqlc-bench-${tier}-`));
+  const stages: StageResult[] = [];
+  try {
+    const course = synthesizeCourse(shape);
+    writeSyntheticCourse(root, course);
+    const questionCount = course.questions.length;
+
+    const store = new QuestionStore();
+    await stage(stages, "load", questionCount, "questions", () =>
+      store.addAll(JSON.parse(fs.readFileSync(path.join(root, quizQuestionsFileName), "utf-8")).data)
+    );
+
+    // Submissions are directly in the workspace root.
+    const studentOf = (filePath: string) => filePath.split("/")[0];
+    const table = await stage(stages, "table", questionCount, "questions", () =>
+      new QuestionTable(store, studentOf)
+    );
+    await stage(stages, "html", questionCount, "questions", () => {
+      const page = table.query(defaultQuery);
+      const summary = summaryTableHTML(table.groups, course.students);
+      return builtinTemplates().render(
+        "quizQuestions.mustache.html",
+        questionViewData(page, defaultQuery, course.students, summary)
+      );
+    });
+    await stage(stages, "query", 2 * viewQueries.length, "queries", () => {
+      for (const query of viewQueries) {
+        table.query({ ...defaultQuery, ...query });
+        table.query({ ...defaultQuery, ...query, descending: true });
+      }
+    });
+
+    const index = new SimilarityIndex();
+    await stage(stages, "index", course.files.length, "files", () => {
+      for (const file of course.files) {
+        index.addFile(file.filePath, fingerprint(file.content));
+      }
+    });
+    const queries = store.ids().slice(0, maxQueries);
+    await stage(stages, "search", queries.length, "queries", () => {
+      for (const id of queries) {
+        index.query(store.code(id), {
+          exclude: (fileId) => fileId === store.filePath(id),
+        });
+      }
+    });
+
+    const config = syntheticConfig(path.join(root, "pl")) as ConfigData;
+    await stage(stages, "pl", questionCount, "questions", async () => {
+      const questionsByStudent: Record<string, PersonalizedQuestionsData[]> = {};
+      for (const question of selectQuizQuestions(store.all())) {
+        (questionsByStudent[studentOf(question.filePath)] ??= []).push(question);
+      }
+      const quiz = buildQuizIR(config, Object.entries(questionsByStudent));
+      const plan = planPLQuiz(config, quiz);
+      const sink = new FolderSink(config.pl_root);
+      await writePLPlanToSink(plan, sink);
+      await sink.close();
+    });
+
+    return {
+      tier,
+      students: course.students.length,
+      files: course.files.length,
+      questions: questionCount,
+      stages,
+      // resourceUsage reports kilobytes.
+      maxRSS: process.resourceUsage().maxRSS * 1024,
+    };
+  } finally {
+    fs.rmSync(root, { recursive: true, force: true });
+  }
+}
+
+function runTierInChild(tier: string): Promise<TierResult> {
+  return new Promise((resolve, reject) => {
+    const child = fork(__filename, ["--child", tier]);
+    let result: TierResult | undefined;
+    child.on("message", (message) => {
+      result = message as TierResult;
+    });
+    child.on("error", reject);
+    child.on("exit", (code) => {
+      if (result) {
+        resolve(result);
+      } else {
+        reject(new Error(`Tier ${tier} failed (exit code ${code})`));
+      }
+    });
+  });
+}
+
+function describeTier(result: TierResult) {
+  const mib = (bytes: number) => (bytes / (1024 * 1024)).toFixed(1);
+  const lines = [
+    `${result.tier}: ${result.students} students, ${result.files} files, ` +
+      `${result.questions} questions; peak RSS ${mib(result.maxRSS)} MiB`,
+  ];
+  for (const { stage, ms, count, unit } of result.stages) {
+    const perSecond = ms > 0 ? Math.round((count * 1000) / ms) : Infinity;
+    lines.push(
+      `  ${stage.padEnd(8)} ${ms.toFixed(1).padStart(10)} ms ` +
+        `${String(perSecond).padStart(10)} ${unit}/s`
+    );
+  }
+  return lines.join("\n");
+}
+
+async function main(args: string[]) {
+  if (args[0] === "--child") {
+    const result = await runTier(args[1]);
+    process.send!(result);
+    return;
+  }
+
+  const tiers = args.length > 0 ? args : defaultTiers;
+  const unknown = tiers.filter((tier) => !(tier in courseTiers));
+  if (unknown.length > 0) {
+    console.error(
+      `Unknown tier(s): ${unknown.join(", ")}. (Available tiers: ${Object.keys(courseTiers).join(", ")})`
+    );
+    process.exitCode = 1;
+    return;
+  }
+  for (const tier of tiers) {
+    console.log(describeTier(await runTierInChild(tier)));
+  }
+}
+
+main(process.argv.slice(2)).catch((e) => {
+  console.error(e);
+  process.exitCode = 1;
+});
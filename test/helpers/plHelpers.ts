@@ -22,6 +22,17 @@ export async function setPLRoot(configFilePath: string, plPath: string) {
   fs.writeFileSync(configFilePath, JSON.stringify(data, null, 2));
 }
 
+// Set an arbitrary field of the config file under test.
+export function setConfigField(
+  configFilePath: string,
+  field: string,
+  value: unknown
+) {
+  const data = JSON.parse(fs.readFileSync(configFilePath, "utf8"));
+  data[field] = value;
+  fs.writeFileSync(configFilePath, JSON.stringify(data, null, 2));
+}
+
 export function verifyDirectoryExists(parts: string[]) {
   const testPath = path.join(...parts);
   expect(fs.existsSync(testPath), `${testPath} does not exist`).to.be.true;
@@ -18,8 +18,16 @@ export async function setUpQuizQuestionWebView(folder: string, expectedQuestionT
     view: WebView;
     summaryContainer: WebElement;
 }> {
-    const driver = VSBrowser.instance.driver;
     await openWorkspace(folder);
+    return showQuizQuestionWebView(expectedQuestionTotal);
+}
+
+// Run viewQuizQuestions in the open workspace and switch to the view's frame.
+export async function showQuizQuestionWebView(expectedQuestionTotal: string): Promise<{
+    view: WebView;
+    summaryContainer: WebElement;
+}> {
+    const driver = VSBrowser.instance.driver;
 
     // Run the command
     await (new Workbench()).executeCommand('gvQLC: View Quiz Questions');
@@ -113,4 +121,42 @@ export async function searchFor(term: string | null = null) {
         await searchBox.sendKeys(term);
     }
     await searchBox.sendKeys(Key.RETURN);
-}
\ No newline at end of file
+    await waitForViewUpdate();
+}
+
+// Wait until the extension has answered all of the view's queries (i.e.,
+// the view is showing the page for its current search, sort, and filters).
+// The driver must already be in the view's frame.
+export async function waitForViewUpdate() {
+    const driver = VSBrowser.instance.driver;
+    await driver.wait(
+        async () => (await driver.executeScript<number>('return window.gvqlcPendingQueries();')) === 0,
+        30_000,
+        'The view never received the page it asked for'
+    );
+}
+
+// Clear the view's named timing (see recordTiming in quizQuestions.mustache.html),
+// perform the action, then wait for the view to report the new timing (in ms).
+// The driver must already be in the view's frame.
+export async function measureViewTiming(name: string, action: () => Promise<void> = async () => {}): Promise<number> {
+    const driver = VSBrowser.instance.driver;
+    await driver.executeScript('delete window.gvqlcTimings[arguments[0]];', name);
+    await action();
+    return waitForViewTiming(name);
+}
+
+// Wait for the view to report the named timing (without clearing it first).
+export async function waitForViewTiming(name: string): Promise<number> {
+    const driver = VSBrowser.instance.driver;
+    // (Wrapped in an array so that a timing of 0 doesn't look like "not yet".)
+    const [ms] = await driver.wait(
+        async () => driver.executeScript<number[] | null>(
+            'const ms = window.gvqlcTimings && window.gvqlcTimings[arguments[0]]; return ms === undefined ? null : [ms];',
+            name
+        ),
+        30_000,
+        `The view never reported a "${name}" timing`
+    );
+    return ms;
+}
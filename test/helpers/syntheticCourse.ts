@@ -0,0 +1,315 @@
+/************************************************************************************
+ *
+ * syntheticCourse.ts
+ *
+ * Generate synthetic courses (student submissions, quiz questions, and a config
+ * file) shaped like the cis371_server fixture, but of any size. Used by the
+ * benchmarks and by tests that need more data than the hand-made fixtures.
+ *
+ * Generation is deterministic: the same CourseShape (including the seed)
+ * always produces the same course.
+ *
+ * This code is also used outside of the extension, so don't include any packages
+ * that require the vscode framework (e.g., vscode)
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+
+import { PersonalizedQuestionsData } from "../../src/types";
+import { configFileName, quizQuestionsFileName } from "../../src/sharedConstants";
+
+export type CourseShape = {
+  students: number;
+  filesPerStudent: number;
+  questionsPerStudent: number;
+  // Approximate number of lines in each generated file
+  linesPerFile: number;
+  // Snippet lengths (in lines) are drawn from a geometric distribution
+  // with this mean, clamped to [1, maxSnippetLines]. (Most questions in
+  // real courses are about one or two lines.)
+  meanSnippetLines: number;
+  maxSnippetLines: number;
+  seed: number;
+};
+
+export const courseTiers: Record<string, CourseShape> = {
+  small: {
+    students: 15,
+    filesPerStudent: 2,
+    questionsPerStudent: 2,
+    linesPerFile: 200,
+    meanSnippetLines: 2,
+    maxSnippetLines: 12,
+    seed: 371,
+  },
+  medium: {
+    students: 120,
+    filesPerStudent: 4,
+    questionsPerStudent: 5,
+    linesPerFile: 250,
+    meanSnippetLines: 2,
+    maxSnippetLines: 12,
+    seed: 371,
+  },
+  large: {
+    students: 400,
+    filesPerStudent: 5,
+    questionsPerStudent: 8,
+    linesPerFile: 300,
+    meanSnippetLines: 2,
+    maxSnippetLines: 16,
+    seed: 371,
+  },
+};
+
+export type SyntheticFile = {
+  // Workspace-relative, '/'-separated (e.g., "student_0007/my_http_server.py")
+  filePath: string;
+  content: string;
+};
+
+export type SyntheticCourse = {
+  students: string[];
+  files: SyntheticFile[];
+  questions: PersonalizedQuestionsData[];
+};
+
+// mulberry32: small, fast, and good enough for generating test data.
+function random(seed: number) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+type Random = ReturnType<typeof random>;
+
+function pick<T>(rand: Random, items: readonly T[]): T {
+  return items[Math.floor(rand() * items.length)];
+}
+
+const fileNames = [
+  "my_http_server",
+  "http_socket",
+  "request_parser",
+  "mime_types",
+  "directory_listing",
+  "response_builder",
+  "client",
+  "utilities",
+];
+
+const nouns = [
+  "request", "response", "header", "line", "path", "socket", "file",
+  "payload", "status", "buffer", "block", "extension", "listing", "client",
+];
+
+const verbs = [
+  "read", "send", "parse", "handle", "build", "open", "close", "find",
+  "format", "write", "check", "split",
+];
+
+const questionTemplates = [
+  "What does `{}` do?",
+  "Why is `{}` needed here?",
+  "Explain the purpose of `{}`.",
+  "What would happen if `{}` were removed?",
+  "Is there a simpler way to write `{}`?",
+  "What is the type of `{}`?",
+];
+
+function identifier(rand: Random) {
+  return `${pick(rand, nouns)}_${pick(rand, nouns)}`;
+}
+
+// Statements a student might write inside a function body.
+function statement(rand: Random, indent: string): string[] {
+  const a = identifier(rand);
+  const b = identifier(rand);
+  switch (Math.floor(rand() * 9)) {
+    case 0:
+      return [`${indent}${a} = ${b}.${pick(rand, verbs)}()`];
+    case 1:
+      return [`${indent}${a} = ${b}.split(CR_LF)[${Math.floor(rand() * 4)}]`];
+    case 2:
+      return [`${indent}socket.send_text_line(f"{${a}}: {${b}}")`];
+    case 3:
+      return [
+        `${indent}if ${a} is None:`,
+        `${indent}    return ${Math.floor(rand() * 500)}`,
+      ];
+    case 4:
+      return [
+        `${indent}while ${a} := file.readline():`,
+        `${indent}    socket.send_text_line(${a})`,
+      ];
+    case 5:
+      return [
+        `${indent}for ${a} in ${b}:`,
+        `${indent}    if ${a}.endswith(".${pick(rand, ["html", "png", "jpg", "pdf"])}"):`,
+        `${indent}        ${b}.append(${a})`,
+      ];
+    case 6:
+      return [`${indent}print(f"${pick(rand, verbs)} {${a}}")`];
+    case 7:
+      return [
+        `${indent}try:`,
+        `${indent}    ${a} = open(${b}, "rb")`,
+        `${indent}except FileNotFoundError:`,
+        `${indent}    return 404`,
+      ];
+    default:
+      return [`${indent}${a} += len(${b})`];
+  }
+}
+
+function functionLines(rand: Random): string[] {
+  const name = `${pick(rand, verbs)}_${pick(rand, nouns)}`;
+  const lines = [`def ${name}(socket, ${pick(rand, nouns)}):`];
+  const bodyLength = 3 + Math.floor(rand() * 12);
+  while (lines.length <= bodyLength) {
+    lines.push(...statement(rand, "    "));
+  }
+  lines.push(`    return ${identifier(rand)}`, "");
+  return lines;
+}
+
+function sourceFile(rand: Random, fileName: string, lineCount: number) {
+  const lines = [
+    '"""',
+    `${fileName}.py`,
+    "",
+    "This is a very simple HTTP server.",
+    "",
+    "GVSU CIS 371 2025",
+    '"""',
+    "",
+    "import os",
+    "import socket",
+    "import http_socket",
+    "",
+    "BLOCK_SIZE = 1024",
+    "CR_LF = b'\\r\\n'",
+    "",
+  ];
+  while (lines.length < lineCount) {
+    lines.push(...functionLines(rand));
+  }
+  return lines.join("\n");
+}
+
+// Geometric distribution with the given mean, clamped to [1, max].
+function snippetLength(rand: Random, shape: CourseShape) {
+  const p = 1 / Math.max(1, shape.meanSnippetLines);
+  let length = 1;
+  while (rand() > p && length < shape.maxSnippetLines) {
+    length++;
+  }
+  return length;
+}
+
+function question(
+  rand: Random,
+  shape: CourseShape,
+  file: SyntheticFile,
+  lines: string[]
+): PersonalizedQuestionsData {
+  const length = snippetLength(rand, shape);
+  const startLine = Math.floor(rand() * Math.max(1, lines.length - length));
+  const endLine = Math.min(lines.length - 1, startLine + length - 1);
+  const highlightedCode = lines.slice(startLine, endLine + 1).join("\n");
+  const words = highlightedCode.match(/[A-Za-z_]\w*/g) ?? ["this code"];
+  return {
+    filePath: file.filePath,
+    range: {
+      start: { line: startLine, character: 0 },
+      end: { line: endLine, character: lines[endLine].length },
+    },
+    text: pick(rand, questionTemplates).replace("{}", pick(rand, words)),
+    highlightedCode,
+    excludeFromQuiz: rand() < 0.05,
+  };
+}
+
+export function synthesizeCourse(shape: CourseShape): SyntheticCourse {
+  const rand = random(shape.seed);
+  const students: string[] = [];
+  const files: SyntheticFile[] = [];
+  const questions: PersonalizedQuestionsData[] = [];
+  const digits = String(shape.students).length;
+
+  for (let s = 0; s < shape.students; s++) {
+    const student = `student_${String(s).padStart(digits, "0")}`;
+    students.push(student);
+    const studentFiles: { file: SyntheticFile; lines: string[] }[] = [];
+    for (let f = 0; f < shape.filesPerStudent; f++) {
+      const baseName = fileNames[f % fileNames.length];
+      const fileName = f < fileNames.length ? baseName : `${baseName}_${f}`;
+      const content = sourceFile(rand, fileName, shape.linesPerFile);
+      const file = { filePath: `${student}/${fileName}.py`, content };
+      files.push(file);
+      studentFiles.push({ file, lines: content.split("\n") });
+    }
+    for (let q = 0; q < shape.questionsPerStudent; q++) {
+      const { file, lines } = pick(rand, studentFiles);
+      questions.push(question(rand, shape, file, lines));
+    }
+  }
+  return { students, files, questions };
+}
+
+// Write the course into root (which is created if necessary) as a workspace
+// that the extension can open. pl_root is placed inside root.
+export function writeSyntheticCourse(root: string, course: SyntheticCourse) {
+  for (const file of course.files) {
+    const filePath = path.join(root, ...file.filePath.split("/"));
+    fs.mkdirSync(path.dirname(filePath), { recursive: true });
+    fs.writeFileSync(filePath, file.content);
+  }
+  fs.writeFileSync(
+    path.join(root, quizQuestionsFileName),
+    JSON.stringify(
+      {
+        data: course.questions,
+        timestamp: new Date().toISOString(),
+        uniqID: 0,
+      },
+      null,
+      2
+    )
+  );
+  fs.writeFileSync(
+    path.join(root, configFileName),
+    JSON.stringify(syntheticConfig(path.join(root, "pl")), null, 2)
+  );
+}
+
+export function syntheticConfig(plRoot: string) {
+  return {
+    title: "Synthetic Quiz",
+    topic: "synthetic",
+    pl_ready: true,
+    pl_root: plRoot,
+    pl_question_root: "gvQLCQuiz",
+    pl_assessment_root: "courseInstances/SectionA/assessments",
+    pl_quiz_folder: "synthetic1",
+    set: "QA Quizzes",
+    number: "1",
+    points_per_question: 25,
+    startDate: "2025-04-19T10:30:00",
+    endDate: "2025-04-19T16:30:40",
+    timeLimitMin: 45,
+    daysForGrading: 14,
+    reviewEndDate: "2025-05-23T23:59:59",
+    language: "python",
+    submissionRoot: null,
+    studentNameMapping: {},
+  };
+}
@@ -20,6 +20,8 @@ import { expect } from "chai";
 import * as path from "path";
 import * as fs from "fs-extra";
 
+import { SyntheticCourse, writeSyntheticCourse } from "./syntheticCourse";
+
 export async function pause(time: number) {
   await new Promise((res) => setTimeout(res, time));
 }
@@ -64,6 +66,17 @@ export async function makeTempCopy(folder: string) {
   return tempWorkspaceDir;
 }
 
+// Generate a synthetic course (see syntheticCourse.ts) in a temporary
+// folder and open it.
+export async function openSyntheticWorkspace(name: string, course: SyntheticCourse) {
+  const tempWorkspaceDir = await fs.mkdtemp(
+    path.resolve(path.join(process.cwd(), "test-fixtures-tmp", name + "-"))
+  );
+  writeSyntheticCourse(tempWorkspaceDir, course);
+  await openWorkspaceFromPath(tempWorkspaceDir);
+  return tempWorkspaceDir;
+}
+
 export async function openTempWorkspace(folder: string) {
   const tempWorkspaceDir = await makeTempCopy(folder);
   await openWorkspaceFromPath(tempWorkspaceDir);
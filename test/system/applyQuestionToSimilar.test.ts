@@ -0,0 +1,62 @@
+/************************************************************************************
+ *
+ * applyQuestionToSimilar.test.ts
+ *
+ * Test the applyQuestionToSimilarSnippets command.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { Workbench, InputBox, NotificationType } from "vscode-extension-tester";
+import {
+  openTempWorkspace,
+  waitForNotification,
+  dismissAllNotifications,
+} from "../helpers/systemHelpers";
+import { quizQuestionsFileName } from "../../src/sharedConstants";
+
+import { expect } from "chai";
+import * as path from "path";
+import * as fs from "fs";
+
+describe("applyQuestionToSimilar.test.ts", function () {
+  const APPLY_COMMAND = "gvQLC: Apply Question to Similar Code in Other Submissions";
+
+  this.timeout(150_000);
+
+  it("copies a question to the matching line in every other submission", async () => {
+    const tempDir = await openTempWorkspace("cis371_server_generate_pl_quiz");
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(APPLY_COMMAND);
+
+    // Choose the question, then accept every (pre-selected) match.
+    const input = await InputBox.create();
+    await input.selectQuickPick("What is `SO_REUSEADDR`?");
+    const matches = await InputBox.create();
+    await matches.confirm();
+
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Added the question to 12 submission(s).",
+      20_000
+    );
+
+    const data = JSON.parse(
+      fs.readFileSync(path.join(tempDir, quizQuestionsFileName), "utf-8")
+    ).data;
+    expect(data).to.have.length(26);
+    const added = data.find(
+      (question: any) => question.filePath === path.join("antonio", "my_http_server.py") &&
+        question.text === "What is `SO_REUSEADDR`?"
+    );
+    expect(added).to.not.be.undefined;
+    expect(added.range.start.line).to.equal(177);
+    expect(added.highlightedCode.trim()).to.equal(
+      "server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)"
+    );
+    expect(added.excludeFromQuiz).to.be.false;
+  });
+});
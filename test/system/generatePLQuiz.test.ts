@@ -15,6 +15,7 @@ import {
   WebView,
   NotificationType,
   Workbench,
+  TextEditor,
 } from "vscode-extension-tester";
 import { WebElement } from "selenium-webdriver";
 import {
@@ -29,11 +30,12 @@ import {
 
 import {
   setPLRoot,
+  setConfigField,
   verifyDirectoryContents,
   verifyExactDirectoryContents,
 } from "../helpers/plHelpers";
 
-import { configFileName, quizQuestionsFileName } from '../../src/sharedConstants';
+import { configFileName, quizQuestionsFileName, plManifestFileName, templateOverrideFolderName } from '../../src/sharedConstants';
 
 import * as path from "path";
 import * as fs from "fs";
@@ -340,6 +342,411 @@ describe("generatePLQuiz.test.ts", function () {
     }
   });
 
+  it("splits the instructor's combined questions into pages when requested", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    const configPath = path.join(tempWorkspaceDir, configFileName);
+    setPLRoot(configPath, tempPLDir);
+    setConfigField(configPath, "pl_instructor_page_size", 3);
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    // Eight students have questions, so there should be three pages.
+    const instructorParts = [tempPLDir, "questions", "gvQLCQuiz", "regression1", "instructor"];
+    verifyExactDirectoryContents(instructorParts, [
+      "combined_questions_1",
+      "combined_questions_2",
+      "combined_questions_3",
+    ]);
+    for (const page of ["1", "2", "3"]) {
+      verifyExactDirectoryContents(
+        [...instructorParts, `combined_questions_${page}`],
+        ["info.json", "question.html"]
+      );
+    }
+
+    const lastPage = fs.readFileSync(
+      path.join(...instructorParts, "combined_questions_3", "question.html"),
+      "utf8"
+    );
+    expect(lastPage.match(/## Student: /g)?.length).to.equal(2);
+
+    const instructorAssessment = JSON.parse(
+      fs.readFileSync(
+        path.join(
+          tempPLDir,
+          "courseInstances",
+          "SectionA",
+          "assessments",
+          "regression1",
+          "instructor",
+          "infoAssessment.json"
+        ),
+        "utf8"
+      )
+    );
+    expect(
+      instructorAssessment.zones[0].questions.map((q: { id: string }) => q.id)
+    ).to.deep.equal([
+      "gvQLCQuiz/regression1/instructor/combined_questions_1",
+      "gvQLCQuiz/regression1/instructor/combined_questions_2",
+      "gvQLCQuiz/regression1/instructor/combined_questions_3",
+    ]);
+  });
+
+  it("prunes files emitted by a previous run that are no longer generated", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    // Simulate a previous run that generated questions for larry (who no
+    // longer has any) and a fourth question for jim (who now has three).
+    const stale = [
+      "questions/gvQLCQuiz/regression1/larry/question1/info.json",
+      "questions/gvQLCQuiz/regression1/larry/question1/question.html",
+      "questions/gvQLCQuiz/regression1/jim/question4/info.json",
+      "questions/gvQLCQuiz/regression1/jim/question4/question.html",
+      "courseInstances/SectionA/assessments/regression1/larry/infoAssessment.json",
+    ];
+    for (const entry of stale) {
+      const filePath = path.join(tempPLDir, ...entry.split("/"));
+      fs.mkdirSync(path.dirname(filePath), { recursive: true });
+      fs.writeFileSync(filePath, "stale");
+    }
+
+    // A file that gvQLC did not emit must be left alone.
+    const handMade = path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "sam", "notes.md");
+    fs.mkdirSync(path.dirname(handMade), { recursive: true });
+    fs.writeFileSync(handMade, "Keep me");
+
+    fs.writeFileSync(
+      path.join(tempWorkspaceDir, plManifestFileName),
+      JSON.stringify({ data: { "questions/gvQLCQuiz/regression1": stale } })
+    );
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    verifyDirectoryContents(
+      [tempPLDir, "questions", "gvQLCQuiz", "regression1"],
+      ["jim", "sam"],
+      ["larry"]
+    );
+    verifyExactDirectoryContents(
+      [tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim"],
+      ["question1", "question2", "question3"]
+    );
+    verifyDirectoryContents(
+      [tempPLDir, "courseInstances", "SectionA", "assessments", "regression1"],
+      ["jim"],
+      ["larry"]
+    );
+    expect(fs.existsSync(handMade), `${handMade} should not be pruned`).to.be.true;
+
+    // The manifest now describes this run.
+    const manifest = JSON.parse(
+      fs.readFileSync(path.join(tempWorkspaceDir, plManifestFileName), "utf8")
+    ).data["questions/gvQLCQuiz/regression1"];
+    expect(manifest).to.include("questions/gvQLCQuiz/regression1/jim/question3/info.json");
+    expect(manifest).to.not.include("questions/gvQLCQuiz/regression1/jim/question4/info.json");
+  });
+
+  it("reuses existing UUIDs when a quiz is regenerated", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    const infoPath = path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim", "question2", "info.json");
+    const assessmentPath = path.join(tempPLDir, "courseInstances", "SectionA", "assessments", "regression1", "jim", "infoAssessment.json");
+    const uuids = () => [infoPath, assessmentPath].map((p) => JSON.parse(fs.readFileSync(p, "utf8")).uuid);
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+    const firstUuids = uuids();
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+    expect(uuids()).to.deep.equal(firstUuids);
+  });
+
+  it("omits questions that are excluded from the quiz", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    // Exclude one of jim's three questions and neptune_man's only question.
+    const questionsPath = path.join(tempWorkspaceDir, quizQuestionsFileName);
+    const questions = JSON.parse(fs.readFileSync(questionsPath, "utf8"));
+    const jimQuestions = questions.data.filter((q: { filePath: string }) => q.filePath.startsWith("jim/"));
+    jimQuestions[1].excludeFromQuiz = true;
+    for (const q of questions.data.filter((q: { filePath: string }) => q.filePath.startsWith("neptune_man/"))) {
+      q.excludeFromQuiz = true;
+    }
+    fs.writeFileSync(questionsPath, JSON.stringify(questions, null, 2));
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    verifyDirectoryContents(
+      [tempPLDir, "questions", "gvQLCQuiz", "regression1"],
+      ["jim", "instructor"],
+      ["neptune_man"]
+    );
+    verifyExactDirectoryContents(
+      [tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim"],
+      ["question1", "question2"]
+    );
+    verifyInfoAssessment(
+      path.join(tempPLDir, "courseInstances", "SectionA", "assessments", "regression1", "jim", "infoAssessment.json"),
+      "jim",
+      2
+    );
+
+    const question2 = fs.readFileSync(
+      path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim", "question2", "question.html"),
+      "utf8"
+    );
+    expect(question2).to.include(jimQuestions[2].text);
+  });
+
+  it("exports the quiz in each format listed in export_formats", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    const configFilePath = path.join(tempWorkspaceDir, configFileName);
+    setPLRoot(configFilePath, tempPLDir);
+    setConfigField(configFilePath, "export_formats", ["qti", "moodle"]);
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    // The PL quiz is still generated.
+    verifyInfoAssessment(
+      path.join(tempPLDir, "courseInstances", "SectionA", "assessments", "regression1", "jim", "infoAssessment.json"),
+      "jim",
+      3
+    );
+
+    const exportRoot = path.join(tempWorkspaceDir, "gvQLC-export");
+    verifyExactDirectoryContents(
+      [exportRoot, "regression1-qti", "items", "jim"],
+      ["question1.xml", "question2.xml", "question3.xml"]
+    );
+    const manifest = fs.readFileSync(path.join(exportRoot, "regression1-qti", "imsmanifest.xml"), "utf8");
+    expect(manifest).to.include('href="tests/jim.xml"');
+    expect(manifest).to.include('href="items/jim/question3.xml"');
+
+    const moodle = fs.readFileSync(path.join(exportRoot, "regression1-moodle", "quiz.moodle.xml"), "utf8");
+    expect(moodle.match(/<question type="essay">/g)).to.have.length(
+      JSON.parse(fs.readFileSync(path.join(tempWorkspaceDir, quizQuestionsFileName), "utf8")).data.length
+    );
+    expect(moodle).to.include("$course$/Regression Quiz 1/jim");
+  });
+
+  it("renders question.html with the workspace's template override", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    const overrideDir = path.join(tempWorkspaceDir, templateOverrideFolderName, "pl");
+    fs.mkdirSync(overrideDir, { recursive: true });
+    fs.writeFileSync(
+      path.join(overrideDir, "question.mustache.html"),
+      "<pl-question-panel>\n<p>Custom template</p>\n{{{text}}}\n</pl-question-panel>\n"
+    );
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    const question = fs.readFileSync(
+      path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim", "question1", "question.html"),
+      "utf8"
+    );
+    expect(question).to.include("<p>Custom template</p>");
+    expect(question).to.not.include("<pl-code");
+
+    // Templates that are not overridden still come from the extension.
+    const combined = fs.readFileSync(
+      path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "instructor", "combined_questions", "question.html"),
+      "utf8"
+    );
+    expect(combined).to.include("<pl-code");
+  });
+
+  it("writes each distinct code snippet once when pl_code_files is \"course\"", async () => {
+    const workspaceName = "cis371_server_generate_pl_quiz";
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace(workspaceName);
+    const configFilePath = path.join(tempWorkspaceDir, configFileName);
+    setPLRoot(configFilePath, tempPLDir);
+    setConfigField(configFilePath, "pl_code_files", "course");
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+
+    const questions = JSON.parse(
+      fs.readFileSync(path.join(tempWorkspaceDir, quizQuestionsFileName), "utf8")
+    ).data as { highlightedCode: string }[];
+    const distinctSnippets = new Set(questions.map((q) => q.highlightedCode).filter((code) => code));
+
+    const sharedDir = path.join(tempPLDir, "serverFilesCourse", "gvQLCQuiz", "regression1");
+    const snippetFiles = fs.readdirSync(sharedDir);
+    expect(snippetFiles).to.have.length(distinctSnippets.size);
+    const snippets = snippetFiles.map((name) => fs.readFileSync(path.join(sharedDir, name), "utf8"));
+    expect(new Set(snippets)).to.deep.equal(distinctSnippets);
+
+    const question = fs.readFileSync(
+      path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim", "question1", "question.html"),
+      "utf8"
+    );
+    expect(question).to.match(
+      /<pl-code language="java" source-file-name="gvQLCQuiz\/regression1\/snippet-[0-9a-f]{12}\.java" directory="serverFilesCourse"><\/pl-code>/
+    );
+  });
+
+  // Generate the quiz in a fresh copy of the workspace with pl_archive set,
+  // and return the path of the archive.
+  async function generateArchive(tempPLDir: string) {
+    const tempWorkspaceDir = await openTempWorkspace("cis371_server_generate_pl_quiz");
+    const configFilePath = path.join(tempWorkspaceDir, configFileName);
+    setPLRoot(configFilePath, tempPLDir);
+    setConfigField(configFilePath, "pl_archive", "regression1.tar");
+    await generateAgain();
+    return path.join(tempWorkspaceDir, "regression1.tar");
+  }
+
+  // Run the command again in the open workspace.
+  async function generateAgain() {
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === "Successfully generated PrairieLearn Quiz."
+    );
+  }
+
+  it("writes the quiz into an archive when pl_archive is set", async () => {
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const archivePath = await generateArchive(tempPLDir);
+
+    // Nothing is written into the PL course itself.
+    expect(fs.existsSync(path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1"))).to.be.false;
+
+    // tar archives are not compressed, so the paths and content appear as is.
+    const archive = fs.readFileSync(archivePath, "utf8");
+    expect(archive).to.include("questions/gvQLCQuiz/regression1/jim/question3/info.json");
+    expect(archive).to.include("courseInstances/SectionA/assessments/regression1/jim/infoAssessment.json");
+    expect(archive).to.include("questions/gvQLCQuiz/regression1/instructor/combined_questions/question.html");
+    expect(archive).to.include('"uids": [\n        "jim"\n      ]');
+  });
+
+  it("writes an identical archive when an unchanged quiz is generated again", async () => {
+    const archivePath = await generateArchive(await makeTempCopy("pl-no-quizzes"));
+    const first = fs.readFileSync(archivePath);
+
+    await generateAgain();
+    expect(fs.readFileSync(archivePath).equals(first)).to.be.true;
+  });
+
+  it("asks before generating a quiz whose UUIDs are already used in the course", async () => {
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace("cis371_server_generate_pl_quiz");
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    // The quiz's question (whose UUID is reused) and an unrelated question
+    // that has the same UUID.
+    const uuid = "8b4891d6-64d1-4e89-b72d-ad2133f25ce1";
+    const quizQuestion = path.join(tempPLDir, "questions", "gvQLCQuiz", "regression1", "jim", "question1");
+    const otherQuestion = path.join(tempPLDir, "questions", "borrowed");
+    for (const dir of [quizQuestion, otherQuestion]) {
+      fs.mkdirSync(dir, { recursive: true });
+      fs.writeFileSync(path.join(dir, "info.json"), JSON.stringify({ uuid, title: "Borrowed" }));
+    }
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand(GENERATE_PL_QUIZ_COMMAND);
+    const message = await waitForNotification(
+      NotificationType.Warning,
+      (message) => message.startsWith("The quiz collides with 1 existing item(s) in the PrairieLearn course.")
+    );
+    expect(message).to.have.string("(modal)");
+
+    // Declining leaves the course as it was.
+    await dismissAllNotifications();
+    await new Promise((res) => setTimeout(res, 2000));
+    expect(fs.existsSync(path.join(quizQuestion, "question.html"))).to.be.false;
+    expect(fs.existsSync(path.join(tempWorkspaceDir, plManifestFileName))).to.be.false;
+    expect(JSON.parse(fs.readFileSync(path.join(quizQuestion, "info.json"), "utf8")).title).to.equal("Borrowed");
+  });
+
+  it("previews the plan without writing anything", async () => {
+    const tempPLDir = await makeTempCopy("pl-no-quizzes");
+    const tempWorkspaceDir = await openTempWorkspace("cis371_server_generate_pl_quiz");
+    setPLRoot(path.join(tempWorkspaceDir, configFileName), tempPLDir);
+
+    await dismissAllNotifications();
+    await new Workbench().executeCommand("gvQLC: Preview PrairieLearn Quiz");
+    await waitForNotification(
+      NotificationType.Info,
+      (message) => message === `Apply this plan to ${tempPLDir}? (modal)`,
+      10_000
+    );
+
+    const plan = await new TextEditor().getText();
+    expect(plan).to.match(/^# PrairieLearn quiz plan/);
+    expect(plan).to.have.string(`PrairieLearn course: \`${tempPLDir}\``);
+    expect(plan).to.match(/\* [1-9]\d* files to create/);
+    expect(plan).to.have.string("* 0 collisions with existing content");
+    expect(plan).to.have.string("questions/gvQLCQuiz/regression1/jim/question1/info.json");
+
+    // Declining the plan writes nothing.
+    await dismissAllNotifications();
+    await new Promise((res) => setTimeout(res, 2000));
+    expect(fs.existsSync(path.join(tempPLDir, "questions", "gvQLCQuiz"))).to.be.false;
+    expect(fs.existsSync(path.join(tempWorkspaceDir, plManifestFileName))).to.be.false;
+    await new Workbench().executeCommand("View: Revert and Close Editor");
+  });
+
   function verifyInfoAssessment(
     fileName: string,
     studentId: string,
@@ -0,0 +1,42 @@
+/************************************************************************************
+ *
+ * performanceReport.test.ts
+ *
+ * Test the showPerformanceReport command.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { Workbench, VSBrowser, TextEditor } from "vscode-extension-tester";
+import { setUpQuizQuestionWebView } from "../helpers/questionViewHelpers";
+
+import { expect } from "chai";
+
+describe("performanceReport.test.ts", function () {
+  this.timeout(150_000);
+
+  it("reports the phases of the most recent View Quiz Questions", async () => {
+    const { view } = await setUpQuizQuestionWebView("cis371_server", "14");
+    await view.switchBack();
+
+    await new Workbench().executeCommand("gvQLC: Show Performance Report");
+    let report = "";
+    await VSBrowser.instance.driver.wait(async () => {
+      try {
+        report = await new TextEditor().getText();
+        return report.startsWith("# gvQLC Performance Report");
+      } catch {
+        return false;
+      }
+    }, 10_000);
+
+    expect(report).to.have.string("## gvqlc.viewQuizQuestions #");
+    // (There is also a "table" phase, but only when the questions' table is rebuilt.)
+    for (const phase of ["load", "config", "createPanel", "studentNames", "query", "render", "post", "webview"]) {
+      expect(report).to.match(new RegExp(`\\| ${phase} \\| \\d+ \\|`));
+    }
+  });
+});
@@ -0,0 +1,220 @@
+/************************************************************************************
+ *
+ * questionQuery.test.ts
+ *
+ * Test sorting, filtering, and paging the quiz questions (questionQuery.ts), and
+ * what the hub sends an open view when the questions change (questionViewHub.ts).
+ *
+ * These tests don't use VS Code.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+import { expect } from "chai";
+
+import { quizQuestionsFileName } from "../../src/sharedConstants";
+import { PersonalizedQuestionsData } from "../../src/types";
+import { QuestionStore } from "../../src/questionStore";
+import { QuestionQueue } from "../../src/questionQueue";
+import { QuestionQuery, QuestionTable, defaultQuery, parseQuery } from "../../src/questionQuery";
+import { QuestionViewHub, ViewMessage } from "../../src/questionViewHub";
+
+// Submissions are directly in the workspace root.
+const studentOf = (filePath: string) => filePath.split("/")[0];
+
+function loadFixture(): PersonalizedQuestionsData[] {
+  const file = path.join(process.cwd(), "test-fixtures", "cis371_server", quizQuestionsFileName);
+  return JSON.parse(fs.readFileSync(file, "utf-8")).data;
+}
+
+describe("questionQuery.test.ts", function () {
+  let store: QuestionStore;
+  let table: QuestionTable;
+
+  beforeEach(() => {
+    store = new QuestionStore();
+    store.addAll(loadFixture());
+    table = new QuestionTable(store, studentOf);
+  });
+
+  function labels(query: Partial<QuestionQuery>) {
+    return table.query({ ...defaultQuery, ...query }).rows.map((row) => row.label);
+  }
+
+  /////////////////////////
+  //
+  // parseQuery
+  //
+  /////////////////////////
+
+  it("replaces anything missing or invalid in a view's query with the default", () => {
+    expect(parseQuery(undefined)).to.deep.equal(defaultQuery);
+    expect(parseQuery({ sort: "bogus", descending: "yes", search: 7, excluded: "some", page: 0 }))
+      .to.deep.equal(defaultQuery);
+    expect(parseQuery({ page: -2, pageSize: 2.5 })).to.deep.equal(defaultQuery);
+  });
+
+  it("limits the page size", () => {
+    expect(parseQuery({ pageSize: 1000 }).pageSize).to.equal(100);
+    expect(parseQuery({ pageSize: 25 }).pageSize).to.equal(25);
+  });
+
+  it("keeps a valid query", () => {
+    const query: QuestionQuery = {
+      sort: "questionLength",
+      descending: true,
+      search: "socket",
+      student: "jim",
+      excluded: "included",
+      page: 3,
+      pageSize: 10,
+    };
+    expect(parseQuery(query)).to.deep.equal(query);
+  });
+
+  /////////////////////////
+  //
+  // Sorting
+  //
+  /////////////////////////
+
+  it("sorts by label (and, equivalently, by student)", () => {
+    const byLabel = ["1a", "1b", "2a", "2b", "3a", "4a", "4b", "5a", "6a", "6b", "6c", "7a", "8a", "8b"];
+    expect(labels({})).to.deep.equal(byLabel);
+    expect(labels({ sort: "student" })).to.deep.equal(byLabel);
+    expect(labels({ sort: "file", descending: true })).to.deep.equal([...byLabel].reverse());
+  });
+
+  it("sorts by question length (ties in label order)", () => {
+    expect(labels({ sort: "questionLength" })).to.deep.equal(
+      ["5a", "2b", "4b", "1b", "2a", "3a", "4a", "8a", "1a", "6b", "7a", "6c", "6a", "8b"]
+    );
+    expect(labels({ sort: "questionLength", descending: true, pageSize: 3 })).to.deep.equal(["8b", "6a", "6c"]);
+  });
+
+  it("sorts in the order the questions were added", () => {
+    expect(labels({ sort: "created" })).to.deep.equal(
+      ["1a", "2a", "2b", "3a", "5a", "4a", "8a", "6a", "6b", "7a", "8b", "1b", "6c", "4b"]
+    );
+  });
+
+  it("sorts excluded questions last, and re-sorts when they change", () => {
+    expect(labels({ sort: "excluded", pageSize: 3 })).to.deep.equal(["1a", "1b", "2a"]);
+    store.update(0, { excludeFromQuiz: true }); // 1a
+    expect(labels({ sort: "excluded" }).slice(-2)).to.deep.equal(["8b", "1a"]);
+  });
+
+  /////////////////////////
+  //
+  // Filtering and paging
+  //
+  /////////////////////////
+
+  it("filters by student", () => {
+    expect(labels({ student: "jim" })).to.deep.equal(["6a", "6b", "6c"]);
+    expect(labels({ student: "jim", search: "BIND" })).to.deep.equal(["6c"]);
+    expect(labels({ student: "nobody" })).to.deep.equal([]);
+  });
+
+  it("filters by excluded", () => {
+    store.update(3, { excludeFromQuiz: true }); // 3a
+    store.update(8, { excludeFromQuiz: true }); // 6b
+    expect(labels({ excluded: "excluded" })).to.deep.equal(["3a", "6b"]);
+    const included = table.query({ ...defaultQuery, excluded: "included" });
+    expect(included.matches).to.equal(12);
+    expect(included.rows.map((row) => row.label)).to.not.include("3a");
+  });
+
+  it("searches the labels, files, code, and questions, ignoring case", () => {
+    expect(table.query({ ...defaultQuery, search: "AWESOME" }).matches).to.equal(2);
+    expect(table.query({ ...defaultQuery, search: "wh" }).matches).to.equal(13);
+    expect(labels({ search: "need" })).to.deep.equal(["1b"]);
+  });
+
+  it("returns only the requested page", () => {
+    const page = table.query({ ...defaultQuery, page: 2, pageSize: 10 });
+    expect(page.pageCount).to.equal(2);
+    expect(page.rows.map((row) => row.position)).to.deep.equal([10, 11, 12, 13]);
+    expect(page.total).to.equal(14);
+  });
+
+  it("returns the last page when asked for a page past the end", () => {
+    const page = table.query({ ...defaultQuery, page: 99, pageSize: 10 });
+    expect(page.page).to.equal(2);
+    expect(page.rows).to.have.length(4);
+  });
+
+  /////////////////////////
+  //
+  // Keeping a view up to date
+  //
+  /////////////////////////
+
+  describe("an open view", function () {
+    let queue: QuestionQueue;
+    let hub: QuestionViewHub;
+    let messages: ViewMessage[];
+
+    beforeEach(() => {
+      queue = new QuestionQueue(store, async () => {});
+      hub = new QuestionViewHub(queue, () => new QuestionTable(store, studentOf));
+      messages = [];
+    });
+
+    function open(query: Partial<QuestionQuery>) {
+      const session = hub.open((message) => messages.push(message));
+      session.request(1, { ...defaultQuery, ...query });
+      messages.length = 0;
+      return session;
+    }
+
+    it("receives only the changed rows when the page can't change", async () => {
+      open({ pageSize: 5 });
+      await queue.update(1, { text: "Edited" }); // 2a (on the page)
+      const version = store.version;
+      await queue.update(12, { text: "Edited" }); // 6c (not on the page)
+      expect(messages).to.have.length(1);
+      const message = messages[0];
+      expect(message.type).to.equal("rowsChanged");
+      if (message.type === "rowsChanged") {
+        expect(message.rows.map((row) => row.label)).to.deep.equal(["2a"]);
+        expect(message.rows[0].question).to.equal("Edited");
+        expect(message.version).to.equal(version);
+      }
+    });
+
+    it("receives a new page when an edit changes which questions match", async () => {
+      open({ search: "happens" });
+      await queue.update(8, { text: "Edited" }); // 6b no longer matches
+      expect(messages).to.have.length(1);
+      const message = messages[0];
+      expect(message.type).to.equal("page");
+      if (message.type === "page") {
+        expect(message.queryId).to.equal(1);
+        expect(message.matches).to.equal(0);
+      }
+    });
+
+    it("receives a new page (with new labels) when a question is added", async () => {
+      open({});
+      await queue.add([{ ...loadFixture()[0], filePath: "aaron/my_http_server.py" }]);
+      expect(messages).to.have.length(1);
+      const message = messages[0];
+      expect(message.type).to.equal("page");
+      if (message.type === "page") {
+        expect(message.total).to.equal(15);
+        expect(message.rows[0].label).to.equal("1a");
+        expect(message.rows[0].student).to.equal("aaron");
+      }
+    });
+
+    it("stops receiving changes once closed", async () => {
+      open({}).dispose();
+      await queue.update(0, { text: "Edited" });
+      expect(messages).to.have.length(0);
+      expect(hub.size).to.equal(0);
+    });
+  });
+});
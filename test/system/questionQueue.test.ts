@@ -0,0 +1,132 @@
+/************************************************************************************
+ *
+ * questionQueue.test.ts
+ *
+ * Test the QuestionQueue's contract: changes are applied in order and saved once
+ * per batch, stale edits are rebased or rejected, and a malformed change doesn't
+ * stop the queue.
+ *
+ * These tests don't use VS Code.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { expect } from "chai";
+
+import { PersonalizedQuestionsData } from "../../src/types";
+import { QuestionStore } from "../../src/questionStore";
+import { QuestionChangeEvent, QuestionQueue } from "../../src/questionQueue";
+
+function question(filePath: string, text: string): PersonalizedQuestionsData {
+  return {
+    filePath,
+    text,
+    range: { start: { line: 3, character: 0 }, end: { line: 4, character: 10 } },
+    highlightedCode: "while line := file.readline():",
+    excludeFromQuiz: false,
+  };
+}
+
+describe("questionQueue.test.ts", function () {
+  let store: QuestionStore;
+  let queue: QuestionQueue;
+  // What was saved (the questions, each time they were saved)
+  let saved: PersonalizedQuestionsData[][];
+  let events: QuestionChangeEvent[];
+
+  beforeEach(() => {
+    store = new QuestionStore();
+    store.addAll([question("antonio/server.py", "What does `:=` do?"), question("jim/server.py", "Why close the socket?")]);
+    saved = [];
+    events = [];
+    queue = new QuestionQueue(store, async (questions) => {
+      saved.push(questions);
+    });
+    queue.subscribe((event) => events.push(event));
+  });
+
+  it("applies an edit made at an old version if its fields haven't changed since", async () => {
+    const readAt = store.version;
+    await queue.update(0, { excludeFromQuiz: true });
+
+    const result = await queue.update(0, { text: "What does the walrus operator do?" }, readAt);
+    expect(result.status).to.equal("applied");
+    expect(store.text(0)).to.equal("What does the walrus operator do?");
+    // The newer change is kept.
+    expect(store.isExcluded(0)).to.be.true;
+  });
+
+  it("rejects an edit made at an old version if one of its fields has changed since", async () => {
+    const readAt = store.version;
+    await queue.update(0, { text: "Edited elsewhere" });
+
+    const result = await queue.update(0, { text: "Edited in the view" }, readAt);
+    expect(result.status).to.equal("rejected");
+    expect(store.text(0)).to.equal("Edited elsewhere");
+    expect(saved).to.have.length(1);
+  });
+
+  it("saves and reports the changes submitted together once", async () => {
+    const results = await Promise.all([
+      queue.update(0, { text: "First" }),
+      queue.update(1, { excludeFromQuiz: true }),
+      queue.add([question("sam/server.py", "Added")]),
+    ]);
+    expect(results.map((result) => result.status)).to.deep.equal(["applied", "applied", "applied"]);
+    expect(saved).to.have.length(1);
+    expect(events).to.have.length(1);
+    expect(events[0].updated).to.deep.equal([0, 1]);
+    expect(events[0].added).to.deep.equal([2]);
+    expect(events[0].version).to.equal(store.version);
+  });
+
+  it("keeps a question added while a view is open when the view saves", async () => {
+    // The view is opened (and reads the questions) ...
+    const viewReadAt = store.version;
+    // ... a question is added elsewhere ...
+    await queue.add([question("sam/server.py", "Added while the view was open")]);
+    // ... then the view saves its edit.
+    const result = await queue.update(1, { text: "Saved from the view" }, viewReadAt);
+
+    expect(result.status).to.equal("applied");
+    const last = saved[saved.length - 1];
+    expect(last.map((q) => q.text)).to.deep.equal([
+      "What does `:=` do?",
+      "Saved from the view",
+      "Added while the view was open",
+    ]);
+  });
+
+  it("rejects a malformed change without stopping the queue", async () => {
+    const malformed = { filePath: "bad.py", text: "No range" } as unknown as PersonalizedQuestionsData;
+    const [bad, good] = await Promise.allSettled([
+      queue.add([question("sam/server.py", "Fine"), malformed]),
+      queue.update(0, { text: "Still saved" }),
+    ]);
+    expect(bad.status).to.equal("rejected");
+    expect(good.status).to.equal("fulfilled");
+    // None of the malformed add's questions were added.
+    expect(store.size).to.equal(2);
+    expect(store.text(0)).to.equal("Still saved");
+
+    // Later changes are still applied.
+    const result = await queue.update(1, { text: "Later" });
+    expect(result.status).to.equal("applied");
+    expect(store.text(1)).to.equal("Later");
+  });
+
+  it("keeps going after the questions can't be saved", async () => {
+    let fail = true;
+    queue = new QuestionQueue(store, async () => {
+      if (fail) {
+        throw new Error("Disk full");
+      }
+    });
+    const error = await queue.update(0, { text: "Not saved" }).catch((e: Error) => e);
+    expect((error as Error).message).to.equal("Disk full");
+
+    fail = false;
+    const result = await queue.update(0, { text: "Saved" });
+    expect(result.status).to.equal("applied");
+  });
+});
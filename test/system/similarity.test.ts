@@ -0,0 +1,125 @@
+/************************************************************************************
+ *
+ * similarity.test.ts
+ *
+ * Check that the similarity index finds the expected matches in the students'
+ * servers in the cis371_server fixture, and that it finds the same matches no
+ * matter when its files are added.
+ *
+ * These tests don't use VS Code.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from "fs";
+import * as path from "path";
+import { expect } from "chai";
+
+import { quizQuestionsFileName } from "../../src/sharedConstants";
+import { PersonalizedQuestionsData } from "../../src/types";
+import { SimilarityIndex, fingerprint } from "../../src/similarity";
+
+const fixture = path.join(process.cwd(), "test-fixtures", "cis371_server");
+
+// Each student's my_http_server.py
+function serverFiles() {
+  return fs
+    .readdirSync(fixture)
+    .sort()
+    .map((student) => `${student}/my_http_server.py`)
+    .filter((filePath) => fs.existsSync(path.join(fixture, filePath)))
+    .map((filePath) => ({
+      filePath,
+      content: fs.readFileSync(path.join(fixture, filePath), "utf-8"),
+    }));
+}
+
+function buildIndex(files: { filePath: string; content: string }[]) {
+  const index = new SimilarityIndex();
+  for (const file of files) {
+    index.addFile(file.filePath, fingerprint(file.content));
+  }
+  return index;
+}
+
+describe("similarity.test.ts", function () {
+  const files = serverFiles();
+  const questions: PersonalizedQuestionsData[] = JSON.parse(
+    fs.readFileSync(path.join(fixture, quizQuestionsFileName), "utf-8")
+  ).data;
+
+  // Query the index with the question's code, as applyQuestionToSimilar does.
+  function similarTo(index: SimilarityIndex, question: PersonalizedQuestionsData) {
+    return index.query(question.highlightedCode, {
+      exclude: (fileId) => fileId === question.filePath,
+    });
+  }
+
+  it("finds the loop copied (or commented out) in other servers", () => {
+    // 1a: antonio's walrus loop
+    expect(similarTo(buildIndex(files), questions[0])).to.deep.equal([
+      { fileId: "neptune_man/my_http_server.py", startLine: 134, endLine: 135, score: 1 },
+      { fileId: "taylor/my_http_server.py", startLine: 82, endLine: 83, score: 1 },
+      { fileId: "larry/my_http_server.py", startLine: 111, endLine: 112, score: 6 / 7 },
+    ]);
+  });
+
+  it("finds the same lines in every server, best matches first", () => {
+    // 6c: jim's bind and listen
+    const matches = similarTo(buildIndex(files), questions[12]);
+    expect(matches).to.have.length(12);
+    expect(matches.slice(0, 3)).to.deep.equal([
+      { fileId: "antonio/my_http_server.py", startLine: 178, endLine: 179, score: 1 },
+      { fileId: "caleb2/my_http_server.py", startLine: 152, endLine: 153, score: 1 },
+      { fileId: "cooper/my_http_server.py", startLine: 153, endLine: 154, score: 1 },
+    ]);
+    // awesome's server binds to PORT rather than port.
+    expect(matches[11]).to.deep.equal(
+      { fileId: "awesome/my_http_server.py", startLine: 140, endLine: 141, score: 0.6 }
+    );
+  });
+
+  it("finds nothing when no other server has similar code", () => {
+    // 3a: caleb2's redirect
+    expect(similarTo(buildIndex(files), questions[3])).to.deep.equal([]);
+  });
+
+  it("finds the same matches when files are added between queries", () => {
+    // Each query sorts the buckets added since the previous one.
+    const all = buildIndex(files);
+    const index = new SimilarityIndex();
+    files.forEach((file, i) => {
+      index.addFile(file.filePath, fingerprint(file.content));
+      similarTo(index, questions[i % questions.length]);
+    });
+    for (const question of questions) {
+      expect(similarTo(index, question), question.highlightedCode).to.deep.equal(
+        similarTo(all, question)
+      );
+    }
+  });
+
+  it("finds a snippet copied into several files where it was pasted", () => {
+    const snippet = questions[0].highlightedCode;
+    // (None of these servers has the loop already.)
+    const copies = files
+      .filter((file) => !file.content.includes("readline"))
+      .slice(0, 5)
+      .map((file, i) => ({
+        filePath: `copy_${i}/my_http_server.py`,
+        content: `${file.content}\n${snippet}\n`,
+        // The snippet starts on the line after the file's last line.
+        line: file.content.split("\n").length,
+      }));
+    const matches = similarTo(buildIndex([...files, ...copies]), questions[0]);
+    for (const copy of copies) {
+      const match = matches.find((m) => m.fileId === copy.filePath);
+      expect(match, copy.filePath).to.deep.equal({
+        fileId: copy.filePath,
+        startLine: copy.line,
+        endLine: copy.line + 1,
+        score: 1,
+      });
+    }
+  });
+});
@@ -0,0 +1,36 @@
+/************************************************************************************
+ *
+ * snapSelection.test.ts
+ *
+ * Test the snapSelection command.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { Workbench, VSBrowser } from "vscode-extension-tester";
+import { openFile, openWorkspace } from "../helpers/systemHelpers";
+
+import { expect } from "chai";
+
+describe("snapSelection.test.ts", function () {
+  this.timeout(150_000);
+
+  it("expands a partial selection to the enclosing block", async () => {
+    await openWorkspace("cis371_server_generate_pl_quiz");
+    const editor = await openFile("antonio/my_http_server.py");
+    await editor.selectText("file.readline");
+    await new Workbench().executeCommand("gvQLC: Snap Selection to Enclosing Statement or Block");
+
+    let selected = "";
+    await VSBrowser.instance.driver.wait(async () => {
+      selected = await editor.getSelectedText();
+      return selected !== "file.readline";
+    }, 10_000);
+    expect(selected.replace(/\r\n/g, "\n")).to.equal(
+      "while line := file.readline():\n                    socket.send_text_line(line)"
+    );
+  });
+});
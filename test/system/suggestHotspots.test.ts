@@ -0,0 +1,48 @@
+/************************************************************************************
+ *
+ * suggestHotspots.test.ts
+ *
+ * Test the suggestHotspots command.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import {
+  Workbench,
+  SideBarView,
+  VSBrowser,
+  ViewSection,
+  TreeItem,
+} from "vscode-extension-tester";
+import { openTempWorkspace } from "../helpers/systemHelpers";
+
+import { expect } from "chai";
+
+describe("suggestHotspots.test.ts", function () {
+  this.timeout(150_000);
+
+  it("lists each student's hotspots, most interesting first", async () => {
+    await openTempWorkspace("cis371_server_generate_pl_quiz");
+    await new Workbench().executeCommand("gvQLC: Suggest Hotspots");
+
+    let section: ViewSection | undefined;
+    await VSBrowser.instance.driver.wait(async () => {
+      try {
+        section = await new SideBarView().getContent().getSection("gvQLC Hotspots");
+        return true;
+      } catch {
+        return false;
+      }
+    }, 20_000);
+
+    const items = (await section!.openItem("antonio")) as TreeItem[];
+    expect(items.length).to.be.greaterThan(0);
+    expect(await items[0].getLabel()).to.have.string(
+      "Assignment expression (walrus operator)"
+    );
+    expect(await items[0].getDescription()).to.match(/my_http_server\.py:68$/);
+  });
+});
@@ -12,7 +12,7 @@
 
 import { WebDriver, WebView, VSBrowser } from 'vscode-extension-tester';
 import { By, until, WebElement } from 'selenium-webdriver';
-import { verifyQuestionDisplayed, verifySummaryDisplayed, setUpQuizQuestionWebView, searchFor } from '../helpers/questionViewHelpers';
+import { verifyQuestionDisplayed, verifySummaryDisplayed, setUpQuizQuestionWebView, searchFor, waitForViewUpdate } from '../helpers/questionViewHelpers';
 import {ViewColors} from '../../src/sharedConstants';
 
 import { expect } from 'chai';
@@ -75,6 +75,7 @@ describe('viewQuizQuestions pagination', function () {
         await rowsSelect.click();
         const option10 = await rowsSelect.findElement(By.css('option[value="10"]'));
         await option10.click();
+        await waitForViewUpdate();
     });
 
     it('shows there are now two pages', async () => {
@@ -132,32 +133,27 @@ describe('viewQuizQuestions pagination', function () {
         });
      });
 
+    // Only the current page's rows are sent to the view.
     it('Does not display the 11th row', async () => {
-        const row = await view.findWebElement(By.css(`#row-10`));
-        const cells = await row.findElements(By.css('td'));
-        expect(await row.isDisplayed()).to.be.false;
+        await verifyRowNotPresent(10);
     });
 
     it('Does not display the 12th row', async () => {
-        const row = await view.findWebElement(By.css(`#row-11`));
-        expect(await row.isDisplayed()).to.be.false;
+        await verifyRowNotPresent(11);
     });
 
     it('Does not display the 14th row', async () => {
-        const row = await view.findWebElement(By.css(`#row-13`));
-        expect(await row.isDisplayed()).to.be.false;
+        await verifyRowNotPresent(13);
     });
 
     it('Advances to page 2 by number button', async () => {
         // Finds: <button class="page-ban">2</button>
         const button2 = await VSBrowser.instance.driver.findElement(By.xpath("//button[normalize-space()='2']"));
         await button2.click();
+        await waitForViewUpdate();
 
-        const row0 = await view.findWebElement(By.css(`#row-0`));
-        expect(await row0.isDisplayed()).to.be.false;
-
-        const row9 = await view.findWebElement(By.css(`#row-9`));
-        expect(await row9.isDisplayed()).to.be.false;
+        await verifyRowNotPresent(0);
+        await verifyRowNotPresent(9);
 
         const row10 = await view.findWebElement(By.css(`#row-10`));
         expect(await row10.isDisplayed()).to.be.true;
@@ -232,6 +228,7 @@ describe('viewQuizQuestions pagination', function () {
         await rowsSelect.click();
         const option10 = await rowsSelect.findElement(By.css('option[value="10"]'));
         await option10.click();
+        await waitForViewUpdate();
 
         await verifyTotalPages(2);
 
@@ -244,6 +241,11 @@ describe('viewQuizQuestions pagination', function () {
         await verifyTotalPages(2);
     });
 
+    async function verifyRowNotPresent(rowIndex: number) {
+        const rows = await view.findWebElements(By.css(`#row-${rowIndex}`));
+        expect(rows.length).to.equal(0);
+    }
+
     async function verifyTotalPages(expectedTotalPages: number) {
        const element = await view.findWebElement(By.css('#totalPagesDisplay'));
         expect(await element.getText()).to.equal(`${expectedTotalPages}`);
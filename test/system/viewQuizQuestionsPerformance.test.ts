@@ -0,0 +1,141 @@
+/************************************************************************************
+ *
+ * viewQuizQuestionsPerformance.test.ts
+ *
+ * Time the quiz question view on a large synthetic course: time to first row,
+ * paging, searching, and the save round trip. The view measures each one itself
+ * (see recordTiming in quizQuestions.mustache.html). The test fails if a timing
+ * is much worse than the one recorded in viewQuizQuestionsPerformance.baseline.json.
+ *
+ * Timings depend on the machine, so the baseline must be recorded on the machine
+ * that runs the tests: run the tests there with GVQLC_UPDATE_PERF_BASELINE=true
+ * and check in the result. (recordedOn says where and when the baseline was
+ * recorded.) Until a baseline has been recorded, the comparison is advisory: the
+ * timings are logged and the test is skipped.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+
+import { WebView, VSBrowser } from 'vscode-extension-tester';
+import { By } from 'selenium-webdriver';
+import { measureViewTiming, showQuizQuestionWebView, waitForViewTiming, waitForViewUpdate } from '../helpers/questionViewHelpers';
+import { openSyntheticWorkspace } from '../helpers/systemHelpers';
+import { courseTiers, synthesizeCourse } from '../helpers/syntheticCourse';
+
+import { expect } from 'chai';
+
+type Baseline = {
+    // A timing fails if it exceeds baseline * tolerance + slackMs.
+    tolerance: number;
+    slackMs: number;
+    // The machine and date the timings were recorded on (null if they
+    // haven't been)
+    recordedOn: string | null;
+    timings: Record<string, number>;
+};
+
+const baselinePath = path.join(process.cwd(), 'test', 'system', 'viewQuizQuestionsPerformance.baseline.json');
+const updateBaseline = process.env.GVQLC_UPDATE_PERF_BASELINE === 'true';
+
+// Each measurement (other than the first row) is repeated this many times
+// and the median is compared, to smooth out noise.
+const repetitions = 5;
+
+function median(values: number[]) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.floor(sorted.length / 2)];
+}
+
+async function setSearchTerm(term: string) {
+    // Set the whole term at once so that the view filters only once.
+    await VSBrowser.instance.driver.executeScript(
+        "const box = document.getElementById('searchInput'); box.value = arguments[0]; box.dispatchEvent(new Event('input'));",
+        term
+    );
+}
+
+describe('viewQuizQuestions performance', function () {
+    let view: WebView;
+    const course = synthesizeCourse({ ...courseTiers.medium, students: 200 });
+    const timings: Record<string, number> = {};
+
+    this.timeout(300_000);
+
+    after(async function () {
+        await VSBrowser.instance.driver.switchTo().defaultContent();
+    });
+
+    it('opens a large course', async () => {
+        await openSyntheticWorkspace('viewPerformance', course);
+        ({ view } = await showQuizQuestionWebView(String(course.questions.length)));
+        timings.firstRow = await waitForViewTiming('firstRow');
+    });
+
+    it('pages', async () => {
+        const times: number[] = [];
+        for (let i = 0; i < repetitions; i++) {
+            times.push(await measureViewTiming('page', async () => {
+                const nextButton = await view.findWebElement(By.css('#nextPageBtn'));
+                await nextButton.click();
+            }));
+        }
+        timings.page = median(times);
+    });
+
+    it('searches', async () => {
+        const terms = ['socket', 'request_', 'What does', 'student_01', 'return 4'];
+        const times: number[] = [];
+        for (const term of terms.slice(0, repetitions)) {
+            times.push(await measureViewTiming('search', () => setSearchTerm(term)));
+        }
+        timings.search = median(times);
+        await setSearchTerm('');
+        await waitForViewUpdate();
+    });
+
+    it('saves', async () => {
+        const times: number[] = [];
+        for (let i = 0; i < repetitions; i++) {
+            times.push(await measureViewTiming('save', async () => {
+                const saveButton = await view.findWebElement(By.css(`#row-${i} button`));
+                await saveButton.click();
+            }));
+        }
+        timings.save = median(times);
+    });
+
+    it('has not slowed down', async function () {
+        console.log('View timings (ms):', timings);
+        const baseline: Baseline = JSON.parse(fs.readFileSync(baselinePath, 'utf-8'));
+        if (updateBaseline) {
+            baseline.recordedOn = `${os.hostname()} (${os.platform()} ${os.arch()}, ` +
+                `${os.cpus()[0]?.model ?? 'unknown CPU'}) on ${new Date().toISOString().slice(0, 10)}`;
+            baseline.timings = Object.fromEntries(
+                Object.entries(timings).map(([name, ms]) => [name, Math.round(ms)])
+            );
+            fs.writeFileSync(baselinePath, JSON.stringify(baseline, null, 2) + '\n');
+            return;
+        }
+        if (!baseline.recordedOn) {
+            console.log('No baseline has been recorded, so the timings are advisory. ' +
+                '(Run with GVQLC_UPDATE_PERF_BASELINE=true to record one.)');
+            this.skip();
+        }
+        console.log(`Baseline recorded on ${baseline.recordedOn}`);
+        for (const [name, ms] of Object.entries(timings)) {
+            if (baseline.timings[name] === undefined) {
+                console.log(`No baseline for ${name}; its timing is advisory.`);
+                continue;
+            }
+            const limit = baseline.timings[name] * baseline.tolerance + baseline.slackMs;
+            expect(ms, `${name} took ${ms.toFixed(1)} ms (baseline ${baseline.timings[name]} ms)`).to.be.at.most(limit);
+        }
+    });
+});
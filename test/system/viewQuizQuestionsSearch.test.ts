@@ -12,7 +12,7 @@
 
 import { WebDriver, WebView, VSBrowser, VSCODE_VERSION_MAX } from 'vscode-extension-tester';
 import { By, until, WebElement, Key } from 'selenium-webdriver';
-import { verifyQuestionDisplayed, verifyVisibility, searchFor, setUpQuizQuestionWebView } from '../helpers/questionViewHelpers';
+import { verifyQuestionDisplayed, verifyVisibility, searchFor, setUpQuizQuestionWebView, waitForViewUpdate } from '../helpers/questionViewHelpers';
 import { ViewColors } from '../../src/sharedConstants';
 
 import { expect } from 'chai';
@@ -133,6 +133,7 @@ describe('viewQuizQuestions search', function () {
         const searchBox = await VSBrowser.instance.driver.findElement(By.id("searchInput"));
         const selectAllKey = process.platform === "darwin" ? Key.META : Key.CONTROL;
         await searchBox.sendKeys(Key.chord(selectAllKey, "a"), Key.BACK_SPACE);
+        await waitForViewUpdate();
 
         // Verify filter count is not displayed
         const element = await view.findWebElement(By.css('#filterCount'));
@@ -0,0 +1,110 @@
+/************************************************************************************
+ *
+ * viewQuizQuestionsSortFilter.test.ts
+ *
+ * Test sorting and filtering (by student and by excluded) in the viewQuizQuestions command.
+ *
+ * IMPORTANT: Remember: VSCode and the extension are _not_ re-set between tests.
+ * these tests must run in order.
+ *
+ * These tests run in a temporary copy of the workspace, because excluding a
+ * question changes the quiz questions file.
+ *
+ * (C) 2025 Zachary Kurmas
+ * *********************************************************************************/
+
+import { WebView, VSBrowser } from 'vscode-extension-tester';
+import { By } from 'selenium-webdriver';
+import { showQuizQuestionWebView, waitForViewUpdate } from '../helpers/questionViewHelpers';
+import { openTempWorkspace } from '../helpers/systemHelpers';
+
+import { expect } from 'chai';
+
+describe('viewQuizQuestions sort and filter', function () {
+    let view: WebView;
+
+    this.timeout(150_000);
+
+    after(async function () {
+        await VSBrowser.instance.driver.switchTo().defaultContent();
+    });
+
+    it('opens the folder and runs the command', async () => {
+        await openTempWorkspace('cis371_server');
+        ({ view } = await showQuizQuestionWebView('14'));
+    });
+
+    it('sorts by question length', async () => {
+        await select('sortBy', 'questionLength');
+        const labels = await rowLabels();
+        expect(labels.slice(0, 3)).to.deep.equal(['5a', '2b', '4b']);
+        expect(labels[labels.length - 1]).to.equal('8b');
+    });
+
+    it('sorts by question length, descending', async () => {
+        await VSBrowser.instance.driver.findElement(By.id('sortDescending')).click();
+        await waitForViewUpdate();
+        const labels = await rowLabels();
+        expect(labels.slice(0, 3)).to.deep.equal(['8b', '6a', '6c']);
+
+        // Put things back for the next tests.
+        await VSBrowser.instance.driver.findElement(By.id('sortDescending')).click();
+        await select('sortBy', 'label');
+    });
+
+    it('filters by student', async () => {
+        await select('studentFilter', 'jim');
+        expect(await rowLabels()).to.deep.equal(['6a', '6b', '6c']);
+        await verifyFilterCount('3 matches');
+    });
+
+    it('filters by excluded', async () => {
+        // Exclude 6b (the second of jim's questions)
+        await view.findWebElement(By.css('#row-1 .exclude-box')).then((box) => box.click());
+        await select('studentFilter', '');
+
+        await select('excludedFilter', 'excluded');
+        await waitForLabels(['6b']);
+        await verifyFilterCount('1 matches');
+
+        await select('excludedFilter', 'included');
+        const labels = await rowLabels();
+        expect(labels).to.have.length(13);
+        expect(labels).to.not.include('6b');
+    });
+
+    it('shows all questions when the filters are cleared', async () => {
+        await select('excludedFilter', 'all');
+        expect(await rowLabels()).to.have.length(14);
+        const element = await view.findWebElement(By.css('#filterCount'));
+        expect(await element.getText()).to.be.empty;
+    });
+
+    async function select(id: string, value: string) {
+        const selectBox = await VSBrowser.instance.driver.findElement(By.id(id));
+        await selectBox.click();
+        const option = await selectBox.findElement(By.css(`option[value="${value}"]`));
+        await option.click();
+        await waitForViewUpdate();
+    }
+
+    async function rowLabels() {
+        const rows = await view.findWebElements(By.css('#questionsTableBody tr'));
+        return Promise.all(rows.map((row) => row.getAttribute('data-label')));
+    }
+
+    // The view is told about an exclusion after the extension saves it, so the
+    // page may still be changing after the view's query is answered.
+    async function waitForLabels(expected: string[]) {
+        await VSBrowser.instance.driver.wait(
+            async () => JSON.stringify(await rowLabels()) === JSON.stringify(expected),
+            10_000,
+            `Expected the rows ${expected.join(', ')}`
+        );
+    }
+
+    async function verifyFilterCount(expected: string) {
+        const element = await view.findWebElement(By.css('#filterCount'));
+        expect(await element.getText()).to.equal(expected);
+    }
+});